@@ -24,10 +24,9 @@ REQUIREMENTS = [
     "qiskit-terra>=0.11",
     "numpy>=1.13",
     "scipy>=1.0",
-    "cython >=0.27.1",
+    "cython>=0.29.31",
     'matplotlib>=3.0',
     'ipywidgets>=7.3.0',
-    "seaborn>=0.9.0",
     "plotly>=4.1",
     "ipyvuetify>=1.1",
     "pyperclip>=1.7"
@@ -39,7 +38,7 @@ with open(VERSION_PATH, 'r') as fd:
     VERSION = fd.read().rstrip()
 
 # Add Cython extensions here
-CYTHON_EXTS = ['permute', 'loco']
+CYTHON_EXTS = ['permute', 'loco', 'graph', 'refine', 'multilevel', 'exact', 'spy']
 CYTHON_MODULE = 'theia.cython'
 CYTHON_SOURCE_DIR = 'theia/cython'
 
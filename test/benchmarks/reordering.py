@@ -0,0 +1,650 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=missing-docstring,invalid-name,attribute-defined-outside-init
+
+"""Benchmarks for the local ordering routines."""
+
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import scipy.sparse as sp
+from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.converters import circuit_to_dag
+from theia.reordering import (local_ordering, local_ordering_batch, OrderingCache,
+                              permute_circuit, windowed_ordering)
+from theia.cython.loco import (sparse_bandwidth, weighted_profile, ordering_metrics,
+                               OrderingWorkspace,
+                               reverse_cuthill_mckee,
+                               weighted_reverse_cuthill_mckee,
+                               bucket_reverse_cuthill_mckee,
+                               weighted_bucket_reverse_cuthill_mckee)
+from theia.cython.permute import sparse_permute
+from theia.cython.refine import refine_ordering
+from theia.reordering.graph import entangling_graph
+from theia.reordering.qasm import qasm_entangling_graph
+from theia.reordering.windowed import layered_gates, window_graphs, window_starts
+from theia.cython.graph import clique_csr
+from theia.reordering.spectral import spectral_ordering
+from theia.reordering.multilevel import multilevel_ordering
+from theia.reordering.exact import exact_ordering, _EXACT_CACHE
+from theia.reordering.mapping import coupling_distances, map_graph, mapping_cost
+
+
+def random_circuit(num_qubits, num_gates, seed=None):
+    """A random circuit where half of the gates are CX gates."""
+    rng = np.random.RandomState(seed)
+    circ = QuantumCircuit(num_qubits)
+    for _ in range(num_gates):
+        if rng.rand() < 0.5:
+            ctrl, tgt = rng.choice(num_qubits, 2, replace=False)
+            circ.cx(int(ctrl), int(tgt))
+        else:
+            circ.h(int(rng.randint(num_qubits)))
+    return circ
+
+
+def random_graph(num_nodes, num_edges, seed=None):
+    """A random symmetric graph with integer edge weights."""
+    rng = np.random.RandomState(seed)
+    rows = rng.randint(num_nodes, size=num_edges)
+    cols = rng.randint(num_nodes, size=num_edges)
+    keep = rows != cols
+    graph = sp.coo_matrix((np.ones(keep.sum(), dtype=np.int32),
+                           (rows[keep], cols[keep])),
+                          shape=(num_nodes, num_nodes)).tocsr()
+    return graph + graph.T
+
+
+def grid_graph(rows, cols, leaf=False, seed=None):
+    """A randomly labelled 2D grid graph, optionally with a leaf node
+    attached to the center of the grid."""
+    num_nodes = rows*cols + int(leaf)
+    idx = np.arange(rows*cols).reshape(rows, cols)
+    edges = [np.stack([idx[:, :-1].ravel(), idx[:, 1:].ravel()]),
+             np.stack([idx[:-1, :].ravel(), idx[1:, :].ravel()])]
+    if leaf:
+        edges.append(np.array([[rows*cols], [idx[rows//2, cols//2]]]))
+    edges = np.hstack(edges)
+    labels = np.random.RandomState(seed).permutation(num_nodes)
+    graph = sp.coo_matrix((np.ones(edges.shape[1], dtype=np.int32),
+                           (labels[edges[0]], labels[edges[1]])),
+                          shape=(num_nodes, num_nodes)).tocsr()
+    return graph + graph.T
+
+
+def clustered_graph(num_clusters, cluster_size, seed=None):
+    """A randomly labelled chain of dense random clusters, each joined to
+    the previous one by a single edge."""
+    rng = np.random.RandomState(seed)
+    num_nodes = num_clusters*cluster_size
+    rows = []
+    cols = []
+    for clust in range(num_clusters):
+        offset = clust*cluster_size
+        for _ in range(3*cluster_size):
+            aa, bb = rng.choice(cluster_size, 2, replace=False)
+            rows.append(offset+aa)
+            cols.append(offset+bb)
+        if clust:
+            rows.append(offset-1-rng.randint(cluster_size))
+            cols.append(offset+rng.randint(cluster_size))
+    labels = rng.permutation(num_nodes)
+    graph = sp.coo_matrix((np.ones(len(rows), dtype=np.int32),
+                           (labels[rows], labels[cols])),
+                          shape=(num_nodes, num_nodes)).tocsr()
+    return graph + graph.T
+
+
+def ordering_quality(graph, perm):
+    """Upper bandwidth and weighted profile of a permuted graph."""
+    data, ind, ptr = sparse_permute(graph.data, graph.indices, graph.indptr,
+                                    graph.shape[0], graph.shape[1], perm, perm, 0)
+    return (sparse_bandwidth(ind, ptr, graph.shape[0])[2],
+            weighted_profile(data, ind, ptr, graph.shape[0]))
+
+
+def grid_coupling_map(rows, cols):
+    """Coupling map of a rows x cols grid of qubits."""
+    cmap = []
+    for row in range(rows):
+        for col in range(cols):
+            qubit = row*cols+col
+            if col+1 < cols:
+                cmap.append([qubit, qubit+1])
+            if row+1 < rows:
+                cmap.append([qubit, qubit+cols])
+    return cmap
+
+
+def coo_entangling_graph(circuit):
+    """The list + COO + transpose graph build that entangling_graph replaces."""
+    rows = []
+    cols = []
+    data = []
+    num_qubits = circuit.n_qubits
+    for item in circuit.data:
+        if item[0].name not in ['barrier', 'measure', 'snapshot']:
+            if len(item[1]) == 2:
+                rows.append(item[1][0].index)
+                cols.append(item[1][1].index)
+                data.append(1)
+    circ_graph = sp.coo_matrix((data, (rows, cols)), dtype=np.int32,
+                               shape=(num_qubits, num_qubits)).tocsr()
+    return circ_graph + circ_graph.T
+
+
+class EntanglingGraphBench:
+    params = ([20, 100], [1000, 100000])
+    param_names = ['num_qubits', 'num_gates']
+    timeout = 300
+
+    def setup(self, num_qubits, num_gates):
+        self.circuit = random_circuit(num_qubits, num_gates, seed=1234)
+        self.dag = circuit_to_dag(self.circuit)
+
+    def time_coo_graph(self, _, __):
+        coo_entangling_graph(self.circuit)
+
+    def time_entangling_graph(self, _, __):
+        entangling_graph(self.circuit)
+
+    def time_entangling_graph_dag(self, _, __):
+        entangling_graph(self.dag)
+
+
+class LocalOrderingBatchBench:
+    params = [1, 2, 4]
+    param_names = ['workers']
+    timeout = 300
+
+    def setup(self, _):
+        self.circuits = [random_circuit(50, 2000, seed=kk) for kk in range(200)]
+
+    def time_serial_local_ordering(self, _):
+        for circ in self.circuits:
+            local_ordering(circ)
+
+    def time_local_ordering_batch(self, workers):
+        local_ordering_batch(self.circuits, workers=workers)
+
+
+class ThreadedKernelsBench:
+    """Runs the GIL-free kernels on independent graphs from a thread pool.
+
+    With the GIL released the time per call should stay roughly flat
+    as the number of threads (and graphs) grows, up to the number of cores.
+    """
+    params = [1, 2, 4, 8]
+    param_names = ['threads']
+    timeout = 300
+
+    def setup(self, threads):
+        self.graphs = [random_graph(100000, 500000, seed=kk) for kk in range(threads)]
+        self.perms = [reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0])
+                      for G in self.graphs]
+
+    def _run(self, func, args):
+        with ThreadPoolExecutor(max_workers=len(args)) as executor:
+            list(executor.map(lambda arg: func(*arg), args))
+
+    def time_reverse_cuthill_mckee(self, _):
+        self._run(reverse_cuthill_mckee,
+                  [(G.indices, G.indptr, G.shape[0]) for G in self.graphs])
+
+    def time_weighted_reverse_cuthill_mckee(self, _):
+        self._run(weighted_reverse_cuthill_mckee,
+                  [(G.data, G.indices, G.indptr, G.shape[0]) for G in self.graphs])
+
+    def time_sparse_bandwidth(self, _):
+        self._run(sparse_bandwidth,
+                  [(G.indices, G.indptr, G.shape[0]) for G in self.graphs])
+
+    def time_weighted_profile(self, _):
+        self._run(weighted_profile,
+                  [(G.data, G.indices, G.indptr, G.shape[0]) for G in self.graphs])
+
+    def time_sparse_permute(self, _):
+        self._run(sparse_permute,
+                  [(G.data, G.indices, G.indptr, G.shape[0], G.shape[1], perm, perm, 0)
+                   for G, perm in zip(self.graphs, self.perms)])
+
+
+class BucketRCMBench:
+    params = [1000, 10000, 100000, 1000000]
+    param_names = ['num_nodes']
+    timeout = 300
+
+    def setup(self, num_nodes):
+        self.graph = random_graph(num_nodes, 2*num_nodes, seed=1234)
+
+    def time_reverse_cuthill_mckee(self, _):
+        G = self.graph
+        reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0])
+
+    def time_bucket_reverse_cuthill_mckee(self, _):
+        G = self.graph
+        bucket_reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0])
+
+    def time_weighted_reverse_cuthill_mckee(self, _):
+        G = self.graph
+        weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+
+    def time_weighted_bucket_reverse_cuthill_mckee(self, _):
+        G = self.graph
+        weighted_bucket_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+
+
+class PeripheralSeedBench:
+    """Ordering quality of the RCM kernels with and without
+    pseudo-peripheral seeds."""
+    params = (['grid_30x30', 'grid_5x100', 'grid_leaf_20x20', 'grid_leaf_40x40',
+               'random_200', 'random_1000', 'circuit_50', 'circuit_100'],
+              [False, True])
+    param_names = ['graph', 'peripheral']
+    timeout = 300
+
+    def setup(self, graph, _):
+        kind, size = graph.rsplit('_', 1)
+        if kind == 'random':
+            self.graph = random_graph(int(size), 2*int(size), seed=1234)
+        elif kind == 'circuit':
+            self.graph = entangling_graph(random_circuit(int(size), 10*int(size), seed=1234))
+        else:
+            rows, cols = [int(num) for num in size.split('x')]
+            self.graph = grid_graph(rows, cols, leaf=kind == 'grid_leaf', seed=1234)
+
+    def _perm(self, weighted, peripheral):
+        G = self.graph
+        if weighted:
+            return weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                                  G.shape[0], peripheral)
+        return reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0], peripheral)
+
+    def track_bandwidth(self, _, peripheral):
+        return ordering_quality(self.graph, self._perm(False, peripheral))[0]
+
+    def track_profile(self, _, peripheral):
+        return ordering_quality(self.graph, self._perm(False, peripheral))[1]
+
+    def track_weighted_bandwidth(self, _, peripheral):
+        return ordering_quality(self.graph, self._perm(True, peripheral))[0]
+
+    def track_weighted_profile(self, _, peripheral):
+        return ordering_quality(self.graph, self._perm(True, peripheral))[1]
+
+    def time_reverse_cuthill_mckee(self, _, peripheral):
+        self._perm(False, peripheral)
+
+    def time_weighted_reverse_cuthill_mckee(self, _, peripheral):
+        self._perm(True, peripheral)
+
+
+class OrderingMetricsBench:
+    params = [1000, 100000]
+    param_names = ['num_nodes']
+    timeout = 300
+
+    def setup(self, num_nodes):
+        self.graph = random_graph(num_nodes, 2*num_nodes, seed=1234)
+        rng = np.random.RandomState(1234)
+        self.perms = np.array([rng.permutation(num_nodes) for _ in range(16)],
+                              dtype=np.int32)
+
+    def time_separate_passes(self, _):
+        G = self.graph
+        for perm in self.perms:
+            ordering_quality(G, perm)
+
+    def time_ordering_metrics(self, _):
+        G = self.graph
+        for perm in self.perms:
+            ordering_metrics(G.data, G.indices, G.indptr, G.shape[0], perm)
+
+    def time_ordering_metrics_2d(self, _):
+        G = self.graph
+        ordering_metrics(G.data, G.indices, G.indptr, G.shape[0], self.perms)
+
+
+class RefineOrderingBench:
+    params = ([200, 2000, 20000], [1, 10])
+    param_names = ['num_nodes', 'max_passes']
+    timeout = 300
+
+    def setup(self, num_nodes, _):
+        G = random_graph(num_nodes, 2*num_nodes, seed=1234)
+        self.graph = G
+        self.perm = weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+
+    def _refine(self, max_passes):
+        G = self.graph
+        return refine_ordering(G.data, G.indices, G.indptr, G.shape[0],
+                               self.perm, max_passes)[0]
+
+    def time_refine_ordering(self, _, max_passes):
+        self._refine(max_passes)
+
+    def track_weighted_profile_reduction(self, _, max_passes):
+        old = ordering_quality(self.graph, self.perm)[1]
+        new = ordering_quality(self.graph, self._refine(max_passes))[1]
+        return 100*(old-new)/old
+
+
+class SpectralOrderingBench:
+    params = (['grid_30x30', 'random_1000', 'clusters_20x50', 'clusters_100x100'],
+              ['rcm', 'spectral', 'spectral_rcm'])
+    param_names = ['graph', 'method']
+    timeout = 300
+
+    def setup(self, graph, _):
+        kind, size = graph.split('_')
+        if kind == 'random':
+            self.graph = random_graph(int(size), 2*int(size), seed=1234)
+        else:
+            rows, cols = [int(num) for num in size.split('x')]
+            if kind == 'grid':
+                self.graph = grid_graph(rows, cols, seed=1234)
+            else:
+                self.graph = clustered_graph(rows, cols, seed=1234)
+
+    def _perm(self, method):
+        G = self.graph
+        if method == 'rcm':
+            return weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+        seeds = spectral_ordering(G, warm_start=False)
+        if method == 'spectral':
+            return seeds
+        return weighted_bucket_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                                     G.shape[0], seeds)
+
+    def time_ordering(self, _, method):
+        self._perm(method)
+
+    def track_bandwidth(self, _, method):
+        return ordering_quality(self.graph, self._perm(method))[0]
+
+    def track_weighted_profile(self, _, method):
+        return ordering_quality(self.graph, self._perm(method))[1]
+
+
+class CouplingOrderingBench:
+    params = [(4, 5), (10, 12)]
+    param_names = ['grid']
+    timeout = 300
+
+    def setup(self, grid):
+        num_physical = grid[0]*grid[1]
+        self.cmap = grid_coupling_map(*grid)
+        self.graph = entangling_graph(random_circuit(num_physical - 4,
+                                                     30*num_physical, seed=1234))
+        self.distances = coupling_distances(self.cmap, num_physical)
+
+    def time_coupling_distances_cached(self, grid):
+        coupling_distances(self.cmap, grid[0]*grid[1])
+
+    def time_map_graph(self, _):
+        map_graph(self.graph, self.distances)
+
+    def track_cost_reduction(self, _):
+        trivial = mapping_cost(self.graph, self.distances, np.arange(self.graph.shape[0]))
+        new = mapping_cost(self.graph, self.distances, map_graph(self.graph, self.distances))
+        return 100*(trivial-new)/trivial
+
+
+class FusedTypesBench:
+    params = ([100000, 1000000], ['int32', 'int64'], ['int32', 'float64'])
+    param_names = ['num_nodes', 'index_dtype', 'weight_dtype']
+    timeout = 300
+
+    def setup(self, num_nodes, index_dtype, weight_dtype):
+        G = random_graph(num_nodes, 2*num_nodes, seed=1234)
+        self.data = G.data.astype(weight_dtype)
+        self.ind = G.indices.astype(index_dtype)
+        self.ptr = G.indptr.astype(index_dtype)
+        self.num_nodes = num_nodes
+        self.perm = np.random.RandomState(1234).permutation(num_nodes)
+
+    def time_int32_conversion(self, *_):
+        # Copies that callers needed before the kernels took these types.
+        self.data.astype(np.int32)
+        self.ind.astype(np.int32)
+        self.ptr.astype(np.int32)
+
+    def time_weighted_reverse_cuthill_mckee(self, *_):
+        weighted_reverse_cuthill_mckee(self.data, self.ind, self.ptr, self.num_nodes)
+
+    def time_weighted_bucket_reverse_cuthill_mckee(self, *_):
+        weighted_bucket_reverse_cuthill_mckee(self.data, self.ind, self.ptr,
+                                              self.num_nodes)
+
+    def time_ordering_metrics(self, *_):
+        ordering_metrics(self.data, self.ind, self.ptr, self.num_nodes, self.perm)
+
+    def time_sparse_permute(self, *_):
+        sparse_permute(self.data, self.ind, self.ptr, self.num_nodes,
+                       self.num_nodes, self.perm, self.perm, 0)
+
+
+class MultilevelOrderingBench:
+    params = ([10000, 100000], ['grid', 'clustered', 'random'])
+    param_names = ['num_nodes', 'graph']
+    timeout = 300
+
+    def setup(self, num_nodes, graph):
+        if graph == 'grid':
+            side = int(np.sqrt(num_nodes))
+            self.graph = grid_graph(side, side, seed=1234)
+        elif graph == 'clustered':
+            self.graph = clustered_graph(num_nodes//40, 40, seed=1234)
+        else:
+            self.graph = random_graph(num_nodes, 2*num_nodes, seed=1234)
+
+    def time_weighted_reverse_cuthill_mckee(self, *_):
+        G = self.graph
+        weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+
+    def time_multilevel_ordering(self, *_):
+        multilevel_ordering(self.graph)
+
+    def track_weighted_profile_vs_rcm(self, *_):
+        G = self.graph
+        rcm = weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+        return (ordering_quality(G, multilevel_ordering(G))[1] /
+                ordering_quality(G, rcm)[1])
+
+
+class ExactOrderingBench:
+    params = [10, 15, 20]
+    param_names = ['num_nodes']
+    timeout = 300
+
+    def setup(self, num_nodes):
+        self.graphs = [random_graph(num_nodes, 2*num_nodes, seed=seed)
+                       for seed in range(10)]
+
+    def time_weighted_reverse_cuthill_mckee(self, _):
+        for G in self.graphs:
+            weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+
+    def time_exact_ordering(self, _):
+        _EXACT_CACHE.clear()
+        for G in self.graphs:
+            exact_ordering(G)
+
+    def time_exact_ordering_cached(self, _):
+        for G in self.graphs:
+            exact_ordering(G)
+
+    def track_bandwidth_vs_rcm(self, _):
+        ratio = 0
+        for G in self.graphs:
+            rcm = weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                                 G.shape[0])
+            ratio += ordering_quality(G, exact_ordering(G))[0] / ordering_quality(G, rcm)[0]
+        return ratio / len(self.graphs)
+
+
+class OrderingCacheBench:
+    params = [20, 200]
+    param_names = ['num_qubits']
+    timeout = 300
+
+    def setup(self, num_qubits):
+        self.circuit = random_circuit(num_qubits, 50*num_qubits, seed=1234)
+        self.cache = OrderingCache()
+        local_ordering(self.circuit, method='spectral_rcm', cache=self.cache)
+
+    def time_local_ordering_uncached(self, _):
+        local_ordering(self.circuit, method='spectral_rcm', cache=False)
+
+    def time_local_ordering_cached(self, _):
+        local_ordering(self.circuit, method='spectral_rcm', cache=self.cache)
+
+
+class QasmGraphBench:
+    params = [100, 1000]
+    param_names = ['num_qubits']
+    timeout = 300
+
+    def setup(self, num_qubits):
+        circuit = random_circuit(num_qubits, 500*num_qubits, seed=1234)
+        fd, self.path = tempfile.mkstemp(suffix='.qasm')
+        with os.fdopen(fd, 'w') as qasm_file:
+            qasm_file.write(circuit.qasm())
+
+    def teardown(self, _):
+        os.remove(self.path)
+
+    def time_qasm_entangling_graph(self, _):
+        qasm_entangling_graph(self.path)
+
+    def time_circuit_entangling_graph(self, _):
+        entangling_graph(QuantumCircuit.from_qasm_file(self.path))
+
+    def peakmem_qasm_entangling_graph(self, _):
+        qasm_entangling_graph(self.path)
+
+
+class MultiQubitGraphBench:
+    params = [100, 1000]
+    param_names = ['num_qubits']
+    timeout = 300
+
+    def setup(self, num_qubits):
+        rng = np.random.RandomState(1234)
+        regs = [QuantumRegister(num_qubits // 2, 'a'),
+                QuantumRegister(num_qubits - num_qubits // 2, 'b')]
+        circ = QuantumCircuit(*regs)
+        for _ in range(20*num_qubits):
+            qubits = [circ.qubits[int(idx)] for idx in
+                      rng.choice(num_qubits, 3, replace=False)]
+            if rng.rand() < 0.5:
+                circ.cx(qubits[0], qubits[1])
+            else:
+                circ.ccx(*qubits)
+        self.circuit = circ
+
+    def time_entangling_graph(self, _):
+        entangling_graph(self.circuit)
+
+    def time_local_ordering(self, _):
+        local_ordering(self.circuit, cache=False)
+
+
+class PermuteCircuitBench:
+    params = [20, 200]
+    param_names = ['num_qubits']
+    timeout = 300
+
+    def setup(self, num_qubits):
+        self.circuit = random_circuit(num_qubits, 500*num_qubits, seed=1234)
+        self.circuit.measure_all()
+        self.perm = np.random.RandomState(1234).permutation(num_qubits)
+
+    def time_permute_circuit(self, _):
+        permute_circuit(self.circuit, self.perm)
+
+    def time_append_circuit(self, _):
+        """The instruction by instruction rebuild that permute_circuit replaces."""
+        qubits = self.circuit.qubits
+        new_qubit = dict(zip([qubits[idx] for idx in self.perm], qubits))
+        circ = QuantumCircuit(*self.circuit.qregs, *self.circuit.cregs)
+        for inst, qargs, cargs in self.circuit.data:
+            circ.append(inst, [new_qubit[qubit] for qubit in qargs], cargs)
+
+    def peakmem_permute_circuit(self, _):
+        permute_circuit(self.circuit, self.perm)
+
+
+class WindowedOrderingBench:
+    params = ([10, 200], [1, 10])
+    param_names = ['num_qubits', 'stride']
+    timeout = 300
+
+    def setup(self, num_qubits, _):
+        self.circuit = random_circuit(num_qubits, 200*num_qubits, seed=1234)
+
+    def time_window_graphs(self, _, stride):
+        for _ in window_graphs(self.circuit, 50, stride):
+            pass
+
+    def time_window_graphs_rebuilt(self, num_qubits, stride):
+        """Building each window graph from its gates, without reuse."""
+        qubits, gates, layers, _ = layered_gates(self.circuit)
+        num_layers = int(layers[-1]) + 1
+        for start in window_starts(num_layers, 50, stride):
+            lo, hi = np.searchsorted(layers, [start, start + 50])
+            sp.csr_matrix(clique_csr(qubits[gates[lo]:gates[hi]],
+                                     gates[lo:hi+1] - gates[lo], num_qubits),
+                          shape=(num_qubits, num_qubits))
+
+    def time_windowed_ordering(self, _, stride):
+        windowed_ordering(self.circuit, 50, stride, cache=False)
+
+
+class OrderingWorkspaceBench:
+    params = [10, 100, 1000]
+    param_names = ['num_qubits']
+    timeout = 300
+
+    def setup(self, num_qubits):
+        self.graphs = [entangling_graph(random_circuit(num_qubits, 10*num_qubits,
+                                                       seed=seed))
+                       for seed in range(20)]
+        self.workspace = OrderingWorkspace(num_qubits)
+
+    def time_rcm_new_buffers(self, _):
+        for G in self.graphs:
+            weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
+
+    def time_rcm_workspace(self, _):
+        for G in self.graphs:
+            weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0],
+                                           False, self.workspace)
+
+    def track_allocations_new_buffers(self, _):
+        count = 0
+        for G in self.graphs:
+            workspace = OrderingWorkspace()
+            weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0],
+                                           False, workspace)
+            count += workspace.allocations
+        return count
+
+    def track_allocations_workspace(self, _):
+        workspace = OrderingWorkspace()
+        for G in self.graphs:
+            weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0],
+                                           False, workspace)
+        return workspace.allocations
@@ -0,0 +1,188 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=missing-docstring,invalid-name,attribute-defined-outside-init
+
+"""Benchmarks for the visualization routines."""
+
+import matplotlib
+matplotlib.use('Agg')
+# pylint: disable=wrong-import-position
+import numpy as np
+import scipy.sparse as sp
+import matplotlib.pyplot as plt
+from qiskit.test.mock import FakeRochester, FakeManhattan, FakeTokyo, FakeMelbourne
+from theia.visualization import wspy, iplot_spy, iplot_error_map, iplot_gate_map
+from theia.cython.spy import binned_max
+from theia.visualization.backend_properties import BackendPropertiesTable
+from theia.visualization.colormaps import map_to_hex
+from theia.visualization.coupling_geometry import coupling_geometry, _coupling_geometry
+from theia.visualization.device_layouts import DEVICE_LAYOUTS
+from theia.visualization.layout_engine import (device_layout, _grid_layout,
+                                               _undirected_edges)
+
+
+class WspyBench:
+    params = ([100, 1000, 20000], [1000, 100000])
+    param_names = ['num_rows', 'nnz']
+    timeout = 300
+
+    def setup(self, num_rows, nnz):
+        M = sp.random(num_rows, num_rows, density=min(nnz/num_rows**2, 1),
+                      random_state=0, format='csr')
+        M.data = np.ceil(10*M.data)
+        self.M = (M + M.T).tocsr()
+
+    def teardown(self, *_):
+        plt.close('all')
+
+    def time_wspy(self, *_):
+        fig, ax = plt.subplots(1, 1, figsize=(5, 5))
+        wspy(self.M, ax=ax)
+        fig.canvas.draw()
+
+
+class SpyBinningBench:
+    params = [10**4, 10**6]
+    param_names = ['num_rows']
+    timeout = 300
+
+    def setup(self, num_rows):
+        # Banded matrix with about 10 nonzeros per row.
+        rng = np.random.default_rng(0)
+        rows = rng.integers(0, num_rows, 5*num_rows)
+        cols = np.clip(rows + rng.integers(-1000, 1000, rows.shape[0]), 0, num_rows-1)
+        M = sp.coo_matrix((np.ones(rows.shape[0], dtype=np.int32), (rows, cols)),
+                          shape=(num_rows, num_rows)).tocsr()
+        self.M = (M + M.T).tocsr()
+
+    def time_full_view(self, num_rows):
+        M = self.M
+        bins = -(-num_rows // 500)
+        binned_max(M.data, M.indices, M.indptr, 0, num_rows, 0, num_rows, bins, bins)
+
+    def time_zoomed_view(self, num_rows):
+        M = self.M
+        start = num_rows // 2
+        binned_max(M.data, M.indices, M.indptr, start, start+2000,
+                   start, start+2000, 4, 4)
+
+    def time_iplot_spy(self, _):
+        iplot_spy(self.M)
+
+    def track_payload_fraction(self, _):
+        return iplot_spy(self.M).data[0].z.size / self.M.nnz
+
+
+class BackendPropertiesBench:
+    params = ['rochester', 'manhattan']
+    param_names = ['device']
+
+    def setup(self, device):
+        backend = {'rochester': FakeRochester, 'manhattan': FakeManhattan}[device]()
+        self.properties = backend.properties()
+        self.coupling_map = backend.configuration().coupling_map
+        self.table = BackendPropertiesTable(self.properties)
+
+    def time_table(self, _):
+        BackendPropertiesTable(self.properties)
+
+    def time_to_dict(self, _):
+        self.properties.to_dict()
+
+    def time_cx_errors(self, _):
+        self.table.cx_errors(self.coupling_map)
+
+    def time_cx_errors_nested_loop(self, _):
+        gates = self.properties.to_dict()['gates']
+        errors = []
+        for line in self.coupling_map:
+            for item in gates:
+                if item['qubits'] == line:
+                    errors.append(item['parameters'][0]['value'])
+                    break
+
+
+class ColormapBench:
+    params = [100, 10000]
+    param_names = ['num_values']
+
+    def setup(self, num_values):
+        self.values = np.random.default_rng(0).random(num_values)
+
+    def time_map_to_hex(self, _):
+        map_to_hex(self.values, 0, 1)
+
+
+class ErrorMapBench:
+    params = ['tokyo', 'rochester']
+    param_names = ['device']
+
+    def setup(self, device):
+        self.backend = {'tokyo': FakeTokyo, 'rochester': FakeRochester}[device]()
+        iplot_error_map(self.backend)
+
+    def time_iplot_error_map(self, _):
+        iplot_error_map(self.backend)
+
+    def time_iplot_error_map_widget(self, _):
+        iplot_error_map(self.backend, as_widget=True)
+
+    def track_traces(self, _):
+        return len(iplot_error_map(self.backend, as_widget=True).data)
+
+
+class CouplingGeometryBench:
+    params = ['tokyo', 'rochester']
+    param_names = ['device']
+
+    def setup(self, device):
+        self.backend = {'tokyo': FakeTokyo, 'rochester': FakeRochester}[device]()
+        config = self.backend.configuration()
+        self.coupling_map = config.coupling_map
+        self.layout = DEVICE_LAYOUTS[config.n_qubits]
+        coupling_geometry(self.coupling_map, self.layout)
+
+    def time_coupling_geometry(self, _):
+        coupling_geometry(self.coupling_map, self.layout)
+
+    def time_coupling_geometry_uncached(self, _):
+        _coupling_geometry.__wrapped__(tuple(map(tuple, self.coupling_map)),
+                                       tuple(map(tuple, self.layout)), 0)
+
+    def time_iplot_gate_map(self, _):
+        iplot_gate_map(self.backend)
+
+
+class LayoutEngineBench:
+    params = ['melbourne', 'manhattan']
+    param_names = ['device']
+
+    def setup(self, device):
+        backend = {'melbourne': FakeMelbourne, 'manhattan': FakeManhattan}[device]()
+        config = backend.configuration()
+        self.n_qubits = config.n_qubits
+        self.coupling_map = config.coupling_map
+        self.edges = _undirected_edges(self.coupling_map)
+        device_layout(self.n_qubits, self.coupling_map, cache_dir=None)
+
+    def time_device_layout(self, _):
+        device_layout(self.n_qubits, self.coupling_map, cache_dir=None)
+
+    def time_device_layout_uncached(self, _):
+        _grid_layout(self.n_qubits, self.edges)
+
+    def track_long_couplings(self, _):
+        layout = np.array(device_layout(self.n_qubits, self.coupling_map, cache_dir=None))
+        lengths = np.linalg.norm(layout[self.edges[:, 0]] - layout[self.edges[:, 1]], axis=1)
+        return int(np.sum(lengths > 1.5))
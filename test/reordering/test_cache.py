@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the ordering result cache."""
+
+import os
+import pickle
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit import QuantumCircuit
+from qiskit.test import QiskitTestCase
+from theia.reordering import local_ordering, OrderingCache, ORDERING_CACHE
+
+
+def _result(num_nodes):
+    return np.arange(num_nodes, dtype=np.int32)[::-1].copy(), (4, 2), (10.0, 6.0)
+
+
+def _graph(num_nodes):
+    rows = np.arange(num_nodes - 1)
+    G = sp.csr_matrix((np.ones(num_nodes - 1, dtype=np.int32), (rows, rows + 1)),
+                      shape=(num_nodes, num_nodes))
+    return (G + G.T).tocsr()
+
+
+class TestOrderingCache(QiskitTestCase):
+    """OrderingCache tests."""
+    def setUp(self):
+        super().setUp()
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super().tearDown()
+
+    def test_get_put(self):
+        """Results are returned as stored, and copied."""
+        cache = OrderingCache()
+        key = cache.key(_graph(5), method='rcm')
+        self.assertIsNone(cache.get(key))
+        cache.put(key, _result(5))
+        perm, bandwidths, profiles = cache.get(key)
+        np.testing.assert_array_equal(perm, _result(5)[0])
+        self.assertEqual((bandwidths, profiles), _result(5)[1:])
+        perm[0] = -1
+        self.assertEqual(cache.get(key)[0][0], 4)
+        self.assertEqual(cache.info(), (2, 1, 1024, 1))
+
+    def test_key(self):
+        """Keys depend on the graph and the options."""
+        key = OrderingCache.key(_graph(5), method='rcm')
+        self.assertEqual(key, OrderingCache.key(_graph(5), method='rcm'))
+        self.assertNotEqual(key, OrderingCache.key(_graph(6), method='rcm'))
+        self.assertNotEqual(key, OrderingCache.key(_graph(5), method='exact'))
+
+    def test_lru_eviction(self):
+        """The least recently used result is evicted first."""
+        cache = OrderingCache(maxsize=2)
+        keys = [cache.key(_graph(num), method='rcm') for num in (3, 4, 5)]
+        cache.put(keys[0], _result(3))
+        cache.put(keys[1], _result(4))
+        cache.get(keys[0])
+        cache.put(keys[2], _result(5))
+        self.assertEqual(len(cache), 2)
+        self.assertIsNotNone(cache.get(keys[0]))
+        self.assertIsNone(cache.get(keys[1]))
+        self.assertIsNotNone(cache.get(keys[2]))
+
+    def test_disk_reload(self):
+        """A new cache on the same path finds stored results on disk."""
+        cache = OrderingCache(path=self.path)
+        key = cache.key(_graph(5), method='rcm')
+        cache.put(key, _result(5))
+        self.assertEqual(os.listdir(self.path), [key + '.npz'])
+
+        other = pickle.loads(pickle.dumps(cache))
+        self.assertEqual(len(other), 0)
+        perm, bandwidths, profiles = other.get(key)
+        np.testing.assert_array_equal(perm, _result(5)[0])
+        self.assertEqual((bandwidths, profiles), _result(5)[1:])
+        self.assertEqual(other.info().hits, 1)
+
+        other.clear(disk=True)
+        self.assertEqual(os.listdir(self.path), [])
+        self.assertIsNone(OrderingCache(path=self.path).get(key))
+
+    def test_clear_keeps_other_files(self):
+        """Clearing the disk store only deletes the files of the cache."""
+        cache = OrderingCache(path=self.path)
+        key = cache.key(_graph(5), method='rcm')
+        cache.put(key, _result(5))
+        others = ['data.npz', key.upper() + '.npz', key + '.npz.bak']
+        for name in others:
+            with open(os.path.join(self.path, name), 'wb') as other_file:
+                other_file.write(b'data')
+        cache.clear(disk=True)
+        self.assertEqual(sorted(os.listdir(self.path)), sorted(others))
+
+    def test_local_ordering(self):
+        """local_ordering reuses cached results."""
+        circ = QuantumCircuit(4)
+        circ.cx(0, 3)
+        circ.cx(3, 1)
+        cache = OrderingCache(path=self.path)
+        first = local_ordering(circ, cache=cache)
+        second = local_ordering(circ, cache=cache)
+        np.testing.assert_array_equal(first[0], second[0])
+        self.assertEqual(first[1:], second[1:])
+        self.assertEqual(cache.info()[:2], (1, 1))
+        self.assertEqual(len(os.listdir(self.path)), 1)
+
+    def test_off_by_default(self):
+        """local_ordering only uses the shared cache when asked to."""
+        circ = QuantumCircuit(4)
+        circ.cx(0, 3)
+        ORDERING_CACHE.clear()
+        self.addCleanup(ORDERING_CACHE.clear)
+        local_ordering(circ)
+        self.assertEqual(len(ORDERING_CACHE), 0)
+        local_ordering(circ, cache=True)
+        self.assertEqual(len(ORDERING_CACHE), 1)
+
+    def test_timed_out_not_cached(self):
+        """Results cut short by the refinement time budget are not cached."""
+        circ = QuantumCircuit(4)
+        circ.cx(0, 3)
+        circ.cx(3, 1)
+        cache = OrderingCache(path=self.path)
+        local_ordering(circ, cache=cache, refine_passes=10, refine_time=1e-12)
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(os.listdir(self.path), [])
+        local_ordering(circ, cache=cache, refine_passes=10)
+        self.assertEqual(len(cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the exact minimum bandwidth ordering."""
+
+import itertools
+import unittest
+from unittest import mock
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit.test import QiskitTestCase
+from theia.cython.loco import ordering_metrics, weighted_reverse_cuthill_mckee
+from theia.reordering import exact
+from theia.reordering.exact import exact_ordering, _exact_ordering
+
+
+def _random_graph(num_nodes, num_edges, seed=None):
+    """A random symmetric graph."""
+    edges = np.random.RandomState(seed).randint(num_nodes, size=(num_edges, 2))
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    G = sp.coo_matrix((np.ones(edges.shape[0], dtype=np.int32), (edges[:, 0], edges[:, 1])),
+                      shape=(num_nodes, num_nodes)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _bandwidth(G, perm):
+    perms = np.asarray(perm, dtype=G.indices.dtype).reshape(1, -1)
+    return int(ordering_metrics(G.data, G.indices, G.indptr, G.shape[0], perms)[0][0])
+
+
+class TestExactOrdering(QiskitTestCase):
+    """exact_ordering tests."""
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(exact._EXACT_CACHE, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_brute_force(self):
+        """Orderings have the minimum bandwidth of all orderings."""
+        for seed in range(40):
+            num_nodes = seed % 7 + 1
+            G = _random_graph(num_nodes, 2*num_nodes, seed)
+            best = min(_bandwidth(G, perm)
+                       for perm in itertools.permutations(range(num_nodes)))
+            for weighted in [False, True]:
+                perm = exact_ordering(G, weighted)
+                np.testing.assert_array_equal(np.sort(perm), np.arange(num_nodes))
+                self.assertEqual(_bandwidth(G, perm), best)
+
+    def test_time_limit(self):
+        """A search out of time falls back to RCM, which is not cached."""
+        G = _random_graph(20, 45, seed=0)
+        perm, complete = _exact_ordering(G, True, 0)
+        self.assertFalse(complete)
+        np.testing.assert_array_equal(
+            perm, weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, 20))
+        self.assertEqual(len(exact._EXACT_CACHE), 0)
+
+    def test_lru_cache(self):
+        """A full cache evicts the least recently used ordering only."""
+        graphs = [_random_graph(8, 14, seed) for seed in range(3)]
+        keys = [exact._structure_key(G) for G in graphs]
+        with mock.patch.object(exact, 'MAX_EXACT_CACHE', 2):
+            exact_ordering(graphs[0])
+            exact_ordering(graphs[1])
+            exact_ordering(graphs[0])
+            exact_ordering(graphs[2])
+        self.assertEqual(list(exact._EXACT_CACHE), [keys[0], keys[2]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
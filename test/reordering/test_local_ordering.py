@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for local_ordering and local_ordering_batch."""
+
+import unittest
+
+import numpy as np
+from qiskit import QuantumCircuit, QuantumRegister
+from qiskit.test import QiskitTestCase
+from theia.reordering import local_ordering, local_ordering_batch
+from theia.reordering.graph import entangling_graph
+
+METHODS = ['rcm', 'bucket_rcm', 'spectral', 'spectral_rcm', 'multilevel', 'exact']
+
+
+def _random_circuit(num_qubits, num_gates, seed=None, num_registers=1):
+    """A random circuit of CX and H gates, with the qubits split evenly
+    over the registers."""
+    rng = np.random.RandomState(seed)
+    sizes = np.diff(np.linspace(0, num_qubits, num_registers + 1).astype(int))
+    qregs = [QuantumRegister(int(size), 'q{}'.format(idx)) for idx, size in enumerate(sizes)]
+    circ = QuantumCircuit(*qregs)
+    qubits = [qubit for qreg in qregs for qubit in qreg]
+    for _ in range(num_gates):
+        ctrl, tgt = rng.choice(num_qubits, 2, replace=False)
+        if rng.rand() < 0.5:
+            circ.cx(qubits[ctrl], qubits[tgt])
+        else:
+            circ.h(qubits[ctrl])
+    return circ
+
+
+class TestLocalOrdering(QiskitTestCase):
+    """local_ordering tests."""
+    def test_registers(self):
+        """Circuits with several registers get a permutation per register."""
+        circ = _random_circuit(8, 40, seed=1, num_registers=2)
+        circ.ccx(0, 3, 6)
+        for method in METHODS:
+            with self.subTest(method=method):
+                perm, _, _ = local_ordering(circ, method=method, refine_passes=5)
+                self.assertEqual(sorted(perm), ['q0', 'q1'])
+                np.testing.assert_array_equal(np.sort(perm['q0']), np.arange(4))
+                np.testing.assert_array_equal(np.sort(perm['q1']), np.arange(4))
+
+    def test_clique_expansion(self):
+        """Gates on more than two qubits add one to each pair of their qubits."""
+        qr1 = QuantumRegister(2, 'a')
+        qr2 = QuantumRegister(2, 'b')
+        circ = QuantumCircuit(qr1, qr2)
+        circ.ccx(qr1[0], qr2[1], qr1[1])
+        circ.cx(qr2[1], qr1[0])
+        circ.mcx([qr1[0], qr1[1], qr2[0]], qr2[1])
+        expected = np.array([[0, 2, 1, 3],
+                             [2, 0, 1, 2],
+                             [1, 1, 0, 1],
+                             [3, 2, 1, 0]])
+        np.testing.assert_array_equal(entangling_graph(circ).toarray(), expected)
+        perm, _, _ = local_ordering(circ)
+        self.assertEqual(sorted(perm), ['a', 'b'])
+
+
+class TestLocalOrderingBatch(QiskitTestCase):
+    """local_ordering_batch tests."""
+    def setUp(self):
+        super().setUp()
+        self.circuits = [_random_circuit(6 + kk, 40, seed=kk, num_registers=1 + kk % 2)
+                         for kk in range(5)]
+
+    def assertSameResults(self, results, expected):
+        """Checks that results match expected, one circuit at a time."""
+        self.assertEqual(len(results), len(expected))
+        for (perm, band, pro), (exp_perm, exp_band, exp_pro) in zip(results, expected):
+            if isinstance(exp_perm, dict):
+                self.assertEqual(sorted(perm), sorted(exp_perm))
+                for name in exp_perm:
+                    np.testing.assert_array_equal(perm[name], exp_perm[name])
+            else:
+                np.testing.assert_array_equal(perm, exp_perm)
+            self.assertEqual((band, pro), (exp_band, exp_pro))
+
+    def test_matches_local_ordering(self):
+        """Batches give the results of local_ordering, in input order."""
+        for method in ['rcm', 'bucket_rcm']:
+            expected = [local_ordering(circ, method=method, cache=False)
+                        for circ in self.circuits]
+            for workers in [1, 2]:
+                with self.subTest(method=method, workers=workers):
+                    results = local_ordering_batch(self.circuits, workers=workers,
+                                                   method=method, cache=False)
+                    self.assertSameResults(results, expected)
+
+    def test_empty(self):
+        """An empty batch gives an empty list."""
+        for workers in [None, 1, 2]:
+            self.assertEqual(local_ordering_batch([], workers=workers), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
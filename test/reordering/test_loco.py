@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the sparse ordering kernels."""
+
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit.test import QiskitTestCase
+from theia.cython.loco import (reverse_cuthill_mckee, weighted_reverse_cuthill_mckee,
+                               bucket_reverse_cuthill_mckee,
+                               weighted_bucket_reverse_cuthill_mckee,
+                               sparse_bandwidth, weighted_profile)
+from theia.cython.permute import sparse_permute
+
+
+def _random_graph(num_nodes, num_edges, seed=None):
+    """A random symmetric graph with integer edge weights."""
+    rng = np.random.RandomState(seed)
+    rows = rng.randint(num_nodes, size=num_edges)
+    cols = rng.randint(num_nodes, size=num_edges)
+    keep = rows != cols
+    G = sp.coo_matrix((rng.randint(1, 5, size=keep.sum()).astype(np.int32),
+                       (rows[keep], cols[keep])), shape=(num_nodes, num_nodes)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _path_graph(num_nodes, seed=None):
+    """A path with randomly labelled nodes."""
+    labels = np.random.RandomState(seed).permutation(num_nodes)
+    G = sp.coo_matrix((np.ones(num_nodes - 1, dtype=np.int32), (labels[:-1], labels[1:])),
+                      shape=(num_nodes, num_nodes)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _grid_leaf_graph(size, seed=None):
+    """A randomly labelled square grid with a leaf node attached to its center."""
+    idx = np.arange(size*size).reshape(size, size)
+    edges = np.vstack([np.stack([idx[:, :-1].ravel(), idx[:, 1:].ravel()], axis=1),
+                       np.stack([idx[:-1, :].ravel(), idx[1:, :].ravel()], axis=1),
+                       [[size*size, idx[size//2, size//2]]]])
+    labels = np.random.RandomState(seed).permutation(size*size + 1)
+    G = sp.coo_matrix((np.ones(edges.shape[0], dtype=np.int32),
+                       (labels[edges[:, 0]], labels[edges[:, 1]])),
+                      shape=(size*size + 1, size*size + 1)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _bandwidth(G, perm):
+    _, ind, ptr = sparse_permute(G.data, G.indices, G.indptr, G.shape[0], G.shape[1],
+                                 perm, perm, 0)
+    return sparse_bandwidth(ind, ptr, G.shape[0])[2]
+
+
+def _bucket_orderings(G, seeds=None):
+    """Unweighted and weighted bucket RCM orderings of G."""
+    return [bucket_reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0], seeds),
+            weighted_bucket_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0],
+                                                  seeds)]
+
+
+def _order(G):
+    """Outputs of the GIL-free kernels on G."""
+    num_nodes = G.shape[0]
+    perm = reverse_cuthill_mckee(G.indices, G.indptr, num_nodes)
+    weighted_perm = weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, num_nodes)
+    data, ind, ptr = sparse_permute(G.data, G.indices, G.indptr, num_nodes, num_nodes,
+                                    weighted_perm, weighted_perm, 0)
+    return (np.asarray(perm), np.asarray(weighted_perm), data, ind, ptr,
+            np.asarray(sparse_bandwidth(ind, ptr, num_nodes)),
+            weighted_profile(data, ind, ptr, num_nodes))
+
+
+class TestThreadedKernels(QiskitTestCase):
+    """Kernels run from several threads at once."""
+    def test_threads_match_serial(self):
+        """Kernels on independent graphs in a thread pool give the serial results."""
+        graphs = [_random_graph(2000, 6000, seed=kk) for kk in range(8)]
+        expected = [_order(G) for G in graphs]
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            results = list(executor.map(_order, graphs + graphs))
+        for result, exp in zip(results, expected + expected):
+            for out, exp_out in zip(result, exp):
+                np.testing.assert_array_equal(out, exp_out)
+
+
+class TestBucketRCM(QiskitTestCase):
+    """Bucket-sorted RCM tests."""
+    def test_permutation(self):
+        """Orderings contain every node once, isolated nodes included."""
+        for seed, (num_nodes, num_edges) in enumerate([(0, 0), (1, 0), (6, 0), (9, 5),
+                                                       (50, 80)]):
+            G = _random_graph(num_nodes, num_edges, seed)
+            for perm in _bucket_orderings(G):
+                np.testing.assert_array_equal(np.sort(perm), np.arange(num_nodes))
+
+    def test_path(self):
+        """A relabelled path is ordered with bandwidth one."""
+        for seed in range(5):
+            G = _path_graph(12, seed)
+            for perm in _bucket_orderings(G):
+                self.assertEqual(_bandwidth(G, perm), 1)
+
+    def test_seeds(self):
+        """Seeds that are an ordering of all nodes start the BFS of each component."""
+        G = _random_graph(10, 0)
+        seeds = np.random.RandomState(3).permutation(10)
+        for perm in _bucket_orderings(G, seeds):
+            np.testing.assert_array_equal(perm, seeds[::-1])
+
+    def test_invalid_seeds(self):
+        """Seeds out of range, repeated or of the wrong length raise."""
+        path = _path_graph(6)
+        for G, seeds in [(path, [10**7, -5, 0, 0, 0, 0]), (path, [0, 1, 2, 3, 4, 6]),
+                         (path, [0, 1, 2]), (_random_graph(4, 0), [0, 0, 0, 0])]:
+            with self.subTest(seeds=seeds):
+                with self.assertRaises(ValueError):
+                    bucket_reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0],
+                                                 np.array(seeds))
+                with self.assertRaises(ValueError):
+                    weighted_bucket_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                                          G.shape[0], np.array(seeds))
+
+
+class TestPeripheralSeeds(QiskitTestCase):
+    """Pseudo-peripheral seed tests."""
+    def _orderings(self, G, peripheral):
+        return [reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0], peripheral),
+                weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0],
+                                               peripheral)]
+
+    def test_permutation(self):
+        """Orderings contain every node once, isolated nodes included."""
+        for seed, (num_nodes, num_edges) in enumerate([(0, 0), (1, 0), (6, 0), (9, 5),
+                                                       (50, 80)]):
+            G = _random_graph(num_nodes, num_edges, seed)
+            for perm in self._orderings(G, True):
+                np.testing.assert_array_equal(np.sort(perm), np.arange(num_nodes))
+
+    def test_grid_with_leaf(self):
+        """Peripheral seeds halve the bandwidth of a grid with a leaf at its center."""
+        for size in [4, 6, 8]:
+            G = _grid_leaf_graph(size, seed=size)
+            for plain, peripheral in zip(self._orderings(G, False),
+                                         self._orderings(G, True)):
+                self.assertEqual(_bandwidth(G, peripheral), size)
+                self.assertLess(_bandwidth(G, peripheral), _bandwidth(G, plain))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
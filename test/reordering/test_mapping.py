@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the coupling-map-aware ordering."""
+
+import itertools
+import unittest
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.test import QiskitTestCase
+from theia.reordering import coupling_ordering
+from theia.reordering.graph import entangling_graph
+from theia.reordering.mapping import coupling_distances, map_graph, mapping_cost
+
+LINE = [[ii, ii+1] for ii in range(9)]
+
+
+def _random_circuit(num_qubits, num_gates, seed=None):
+    """A random circuit of CX gates."""
+    rng = np.random.RandomState(seed)
+    circ = QuantumCircuit(num_qubits)
+    for _ in range(num_gates):
+        ctrl, tgt = rng.choice(num_qubits, 2, replace=False)
+        circ.cx(int(ctrl), int(tgt))
+    return circ
+
+
+class TestCouplingOrdering(QiskitTestCase):
+    """coupling_ordering tests."""
+    def setUp(self):
+        super().setUp()
+        self.circuit = _random_circuit(6, 30, seed=4)
+
+    def test_layout(self):
+        """Each qubit is placed on its own physical qubit."""
+        layout, reduction = coupling_ordering(self.circuit, LINE)
+        self.assertEqual(np.unique(layout).shape[0], 6)
+        self.assertTrue(np.all((layout >= 0) & (layout < 10)))
+        G = entangling_graph(self.circuit)
+        costs = mapping_cost(G, coupling_distances(LINE, 10),
+                             np.vstack([np.arange(6), layout]))
+        self.assertEqual(reduction, np.round((costs[0]-costs[1])/costs[0]*100, 2))
+
+    def test_local_minimum(self):
+        """No swap of two qubits or move to a free qubit lowers the cost."""
+        G = entangling_graph(self.circuit)
+        D = coupling_distances(LINE, 10)
+        layout = map_graph(G, D, max_iter=1000)
+        cost = mapping_cost(G, D, layout)
+        for aa, bb in itertools.combinations(range(6), 2):
+            swapped = layout.copy()
+            swapped[[aa, bb]] = swapped[[bb, aa]]
+            self.assertGreaterEqual(mapping_cost(G, D, swapped), cost)
+        for node, free in itertools.product(range(6), np.setdiff1d(np.arange(10), layout)):
+            moved = layout.copy()
+            moved[node] = free
+            self.assertGreaterEqual(mapping_cost(G, D, moved), cost)
+
+    def test_too_many_qubits(self):
+        """Circuits larger than the device raise."""
+        with self.assertRaises(ValueError):
+            coupling_ordering(self.circuit, [[0, 1], [1, 2]])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the multilevel ordering engine."""
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit.test import QiskitTestCase
+from theia.cython.loco import (ordering_metrics, reverse_cuthill_mckee,
+                               weighted_reverse_cuthill_mckee)
+from theia.reordering.multilevel import multilevel_ordering
+
+
+def _graph(num_nodes, edges, seed=None):
+    """A symmetric graph with the given edges between randomly labelled nodes."""
+    labels = np.random.RandomState(seed).permutation(num_nodes)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    G = sp.coo_matrix((np.ones(edges.shape[0], dtype=np.int32),
+                       (labels[edges[:, 0]], labels[edges[:, 1]])),
+                      shape=(num_nodes, num_nodes)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _random_graph(num_nodes, num_edges, seed=None):
+    edges = np.random.RandomState(seed).randint(num_nodes, size=(num_edges, 2))
+    return _graph(num_nodes, edges[edges[:, 0] != edges[:, 1]], seed)
+
+
+def _metrics(G, perm):
+    """Bandwidth and weighted profile of G under perm."""
+    perms = np.asarray(perm, dtype=G.indices.dtype).reshape(1, -1)
+    ub, _, pro, _ = ordering_metrics(G.data, G.indices, G.indptr, G.shape[0], perms)
+    return int(ub[0]), pro[0].item()
+
+
+class TestMultilevelOrdering(QiskitTestCase):
+    """multilevel_ordering tests."""
+    def test_permutation(self):
+        """Orderings contain every node once, isolated nodes included."""
+        for seed, (num_nodes, num_edges) in enumerate([(0, 0), (1, 0), (6, 0), (9, 5),
+                                                       (200, 300)]):
+            G = _random_graph(num_nodes, num_edges, seed) if num_nodes else \
+                sp.csr_matrix((0, 0), dtype=np.int32)
+            for weighted in [False, True]:
+                perm = multilevel_ordering(G, weighted)
+                np.testing.assert_array_equal(np.sort(perm), np.arange(num_nodes))
+
+    def test_path(self):
+        """A relabelled path is ordered with bandwidth one."""
+        nodes = np.arange(39)
+        for seed in range(5):
+            G = _graph(40, np.stack([nodes, nodes + 1], axis=1), seed)
+            for weighted in [False, True]:
+                self.assertEqual(_metrics(G, multilevel_ordering(G, weighted))[0], 1)
+
+    def test_not_worse_than_rcm(self):
+        """The weighted profile is never above that of RCM."""
+        for seed in range(30):
+            G = _random_graph(60, 90, seed)
+            rcm = [reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0]),
+                   weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])]
+            for weighted in [False, True]:
+                self.assertLessEqual(_metrics(G, multilevel_ordering(G, weighted))[1],
+                                     _metrics(G, rcm[weighted])[1])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the streaming OpenQASM parser."""
+
+import io
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.test import QiskitTestCase
+from theia.reordering import qasm
+from theia.reordering.graph import entangling_graph
+from theia.reordering.qasm import qasm_entangling_graph
+
+QASM = """OPENQASM 2.0;
+// header comment; with a semicolon
+include "qelib1.inc";
+qreg q[3];
+qreg r[2];
+creg c[3];
+gate foo a, b { cx a, b; cx b, a; }
+h q[0];
+cx q[0],q[1]; // trailing comment
+cx q[1],q[2];
+foo q[2], r[0];
+ccx q[0], q[2], r[1];
+cx q, r[1];
+if (c==1) cx r[0],q[0];
+measure q -> c;
+"""
+
+
+class TestQasmEntanglingGraph(QiskitTestCase):
+    """qasm_entangling_graph tests."""
+    def setUp(self):
+        super().setUp()
+        self.expected = entangling_graph(QuantumCircuit.from_qasm_str(QASM)).toarray()
+
+    def assertGraph(self, source):
+        """Checks the graph of source against the circuit path."""
+        graph = qasm_entangling_graph(source)
+        np.testing.assert_array_equal(graph.toarray(), self.expected)
+
+    def test_lines_without_newlines(self):
+        """Comments in lines without newlines only remove their own line."""
+        self.assertGraph(QASM.splitlines())
+
+    def test_lines(self):
+        """Lines with newlines, as read from a file."""
+        self.assertGraph(QASM.splitlines(keepends=True))
+
+    def test_file_object(self):
+        """An open file."""
+        self.assertGraph(io.StringIO(QASM))
+
+    def test_path(self):
+        """A file path."""
+        fd, path = tempfile.mkstemp(suffix='.qasm')
+        self.addCleanup(os.remove, path)
+        with os.fdopen(fd, 'w') as qasm_file:
+            qasm_file.write(QASM)
+        self.assertGraph(path)
+
+    def test_small_blocks(self):
+        """Statements and gate bodies spanning blocks of lines."""
+        with mock.patch.object(qasm, 'BLOCK_LINES', 1):
+            self.assertGraph(QASM.splitlines())
+        text = '\n'.join(line.split('//')[0] for line in QASM.splitlines())
+        source = text.replace(' ', '\n').replace(',', '\n,\n').splitlines()
+        with mock.patch.object(qasm, 'BLOCK_LINES', 2):
+            self.assertGraph(source)
+
+    def test_incomplete(self):
+        """A statement without a semicolon raises."""
+        with self.assertRaises(ValueError):
+            qasm_entangling_graph(['OPENQASM 2.0;', 'qreg q[2];', 'cx q[0],q[1]'])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the adjacent-swap refinement of orderings."""
+
+import unittest
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit.test import QiskitTestCase
+from theia.cython.loco import reverse_cuthill_mckee, ordering_metrics
+from theia.cython.refine import refine_ordering
+
+
+def _random_graph(num_nodes, num_edges, seed=None):
+    """A random symmetric graph with integer edge weights."""
+    rng = np.random.RandomState(seed)
+    rows = rng.randint(num_nodes, size=num_edges)
+    cols = rng.randint(num_nodes, size=num_edges)
+    keep = rows != cols
+    G = sp.coo_matrix((rng.randint(1, 5, size=keep.sum()).astype(np.int32),
+                       (rows[keep], cols[keep])), shape=(num_nodes, num_nodes)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _metrics(G, perm):
+    """Bandwidth and weighted profile of G under perm."""
+    perms = np.asarray(perm, dtype=G.indices.dtype).reshape(1, -1)
+    ub, _, pro, _ = ordering_metrics(G.data, G.indices, G.indptr, G.shape[0], perms)
+    return int(ub[0]), pro[0].item()
+
+
+def _refine(G, perm, max_passes=10, max_time=0):
+    return refine_ordering(G.data, G.indices, G.indptr, G.shape[0], perm,
+                           max_passes, max_time)
+
+
+class TestRefineOrdering(QiskitTestCase):
+    """refine_ordering tests."""
+    def test_not_worse(self):
+        """Refinement never raises the bandwidth or weighted profile."""
+        for seed in range(20):
+            G = _random_graph(25, 40, seed)
+            for perm in [reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0]),
+                         np.random.RandomState(seed).permutation(25)]:
+                refined, swaps, timed_out = _refine(G, perm)
+                np.testing.assert_array_equal(np.sort(refined), np.arange(25))
+                self.assertFalse(timed_out)
+                before, after = _metrics(G, perm), _metrics(G, refined)
+                self.assertLessEqual(after[0], before[0])
+                self.assertLessEqual(after[1], before[1])
+                if not swaps:
+                    np.testing.assert_array_equal(refined, perm)
+
+    def test_time_budget(self):
+        """A spent time budget stops the search and is reported."""
+        G = _random_graph(5000, 20000, seed=1)
+        perm = np.random.RandomState(1).permutation(5000)
+        refined, _, timed_out = _refine(G, perm, max_time=1e-9)
+        self.assertTrue(timed_out)
+        np.testing.assert_array_equal(np.sort(refined), np.arange(5000))
+
+    def test_small(self):
+        """Graphs with fewer than two nodes are returned as given."""
+        for num_nodes in [0, 1]:
+            G = sp.csr_matrix((num_nodes, num_nodes), dtype=np.int32)
+            refined, swaps, timed_out = _refine(G, np.arange(num_nodes))
+            np.testing.assert_array_equal(refined, np.arange(num_nodes))
+            self.assertEqual((swaps, timed_out), (0, False))
+
+    def test_invalid_permutation(self):
+        """Permutations of the wrong length, out of range or with repeats raise."""
+        G = _random_graph(6, 10, seed=2)
+        for perm in [[0, 1, 2], [0, 1, 2, 3, 4, 10**7], [-5, 0, 1, 2, 3, 4],
+                     [0, 0, 1, 2, 3, 4]]:
+            with self.assertRaises(ValueError):
+                _refine(G, np.array(perm))
+        with self.assertRaises(ValueError):
+            _refine(sp.csr_matrix((1, 1), dtype=np.int32), np.array([3]))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
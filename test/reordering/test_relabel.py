@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for relabelling the qubits of circuits."""
+
+import unittest
+
+import numpy as np
+from qiskit import QuantumCircuit, QuantumRegister, ClassicalRegister
+from qiskit.converters import circuit_to_dag, dag_to_circuit
+from qiskit.test import QiskitTestCase
+from theia.reordering import local_ordering, permute_circuit
+from theia.reordering.graph import entangling_graph
+
+
+def _random_circuit(seed=None):
+    """A random circuit on two registers with 1, 2 and 3 qubit gates
+    and measurements."""
+    rng = np.random.RandomState(seed)
+    qr1 = QuantumRegister(3, 'a')
+    qr2 = QuantumRegister(4, 'b')
+    cr = ClassicalRegister(7, 'c')
+    circ = QuantumCircuit(qr1, qr2, cr)
+    qubits = list(qr1) + list(qr2)
+    for _ in range(50):
+        kind = rng.randint(4)
+        args = [qubits[idx] for idx in rng.choice(7, 3, replace=False)]
+        if kind == 0:
+            circ.h(args[0])
+        elif kind == 1:
+            circ.ccx(*args)
+        else:
+            circ.cx(*args[:2])
+    circ.measure(qubits, cr)
+    return circ
+
+
+class TestPermuteCircuit(QiskitTestCase):
+    """permute_circuit tests."""
+    def setUp(self):
+        super().setUp()
+        self.circuit = _random_circuit(seed=2)
+        self.perm = np.random.RandomState(2).permutation(7)
+
+    def assertRelabelled(self, new_circ):
+        """Checks that new_circ is self.circuit relabelled by self.perm."""
+        G = entangling_graph(self.circuit).toarray()
+        self.assertEqual(new_circ.count_ops(), self.circuit.count_ops())
+        np.testing.assert_array_equal(entangling_graph(new_circ).toarray(),
+                                      G[np.ix_(self.perm, self.perm)])
+
+    def test_circuit(self):
+        """Relabelling permutes the entangling graph and keeps every gate."""
+        expected = dag_to_circuit(circuit_to_dag(self.circuit))
+        new_circ = permute_circuit(self.circuit, self.perm)
+        self.assertRelabelled(new_circ)
+        self.assertEqual(self.circuit, expected)
+        qubits = self.circuit.qubits
+        for (inst, qargs, cargs), (new_inst, new_qargs, new_cargs) in zip(self.circuit.data,
+                                                                          new_circ.data):
+            self.assertIs(new_inst, inst)
+            self.assertEqual(new_cargs, cargs)
+            self.assertEqual([self.perm[qubits.index(qarg)] for qarg in new_qargs],
+                             [qubits.index(qarg) for qarg in qargs])
+
+    def test_dag(self):
+        """DAG circuits are relabelled into DAG circuits."""
+        new_dag = permute_circuit(circuit_to_dag(self.circuit), self.perm)
+        self.assertRelabelled(dag_to_circuit(new_dag))
+        self.assertEqual(new_dag,
+                         circuit_to_dag(permute_circuit(self.circuit, self.perm)))
+
+    def test_register_permutations(self):
+        """Permutations keyed by register match those of local_ordering."""
+        perm, _, _, new_circ = local_ordering(self.circuit, relabel=True)
+        self.assertEqual(sorted(perm), ['a', 'b'])
+        self.perm = np.concatenate([perm['a'], perm['b'] + 3])
+        self.assertRelabelled(new_circ)
+        self.assertEqual(permute_circuit(self.circuit, perm), new_circ)
+
+    def test_invalid_permutation(self):
+        """Permutations that do not contain every qubit once raise."""
+        for perm in [np.zeros(7, dtype=int), np.arange(6), np.arange(1, 8)]:
+            with self.assertRaises(ValueError):
+                permute_circuit(self.circuit, perm)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
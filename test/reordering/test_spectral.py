@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the spectral ordering engine."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit.test import QiskitTestCase
+from theia.cython.loco import ordering_metrics
+from theia.reordering import spectral
+from theia.reordering.spectral import spectral_ordering
+
+
+def _graph(num_nodes, edges, seed=None):
+    """A symmetric graph with the given edges between randomly labelled nodes."""
+    labels = np.random.RandomState(seed).permutation(num_nodes)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    G = sp.coo_matrix((np.ones(edges.shape[0], dtype=np.int32),
+                       (labels[edges[:, 0]], labels[edges[:, 1]])),
+                      shape=(num_nodes, num_nodes)).tocsr()
+    return (G + G.T).tocsr()
+
+
+def _random_graph(num_nodes, num_edges, seed=None):
+    edges = np.random.RandomState(seed).randint(num_nodes, size=(num_edges, 2))
+    return _graph(num_nodes, edges[edges[:, 0] != edges[:, 1]], seed)
+
+
+def _path_graph(num_nodes, seed=None):
+    nodes = np.arange(num_nodes - 1)
+    return _graph(num_nodes, np.stack([nodes, nodes + 1], axis=1), seed)
+
+
+def _bandwidth(G, perm):
+    perms = np.asarray(perm, dtype=G.indices.dtype).reshape(1, -1)
+    return int(ordering_metrics(G.data, G.indices, G.indptr, G.shape[0], perms)[0][0])
+
+
+class TestSpectralOrdering(QiskitTestCase):
+    """spectral_ordering tests."""
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(spectral._WARM_STARTS, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_permutation(self):
+        """Orderings contain every node once, isolated nodes included."""
+        for seed, (num_nodes, num_edges) in enumerate([(0, 0), (1, 0), (6, 0), (9, 5),
+                                                       (50, 80)]):
+            G = _random_graph(num_nodes, num_edges, seed) if num_nodes else \
+                sp.csr_matrix((0, 0), dtype=np.int32)
+            for weighted in [False, True]:
+                perm = spectral_ordering(G, weighted)
+                np.testing.assert_array_equal(np.sort(perm), np.arange(num_nodes))
+
+    def test_path(self):
+        """A relabelled path is ordered with bandwidth one."""
+        for seed in range(5):
+            G = _path_graph(12, seed)
+            for weighted in [False, True]:
+                self.assertEqual(_bandwidth(G, spectral_ordering(G, weighted)), 1)
+
+    def test_warm_start_by_graph(self):
+        """Warm starts are only taken from the same component graph."""
+        graphs = [_random_graph(30, 90, seed) for seed in range(3)]
+        with mock.patch.object(spectral, 'DENSE_LIMIT', 10), \
+                mock.patch.object(spectral, 'MAX_WARM_STARTS', 2), \
+                mock.patch.object(spectral, 'fiedler_vector',
+                                  wraps=spectral.fiedler_vector) as fiedler:
+            spectral_ordering(graphs[0])
+            spectral_ordering(graphs[1])
+            self.assertIsNone(fiedler.call_args[0][2])
+            spectral_ordering(graphs[0])
+            self.assertIsNotNone(fiedler.call_args[0][2])
+            spectral_ordering(graphs[0], weighted=False)
+            self.assertIsNone(fiedler.call_args[0][2])
+            # The least recently used vector, of graphs[1], is evicted.
+            spectral_ordering(graphs[1])
+            self.assertIsNone(fiedler.call_args[0][2])
+            keys = list(spectral._WARM_STARTS)
+            self.assertEqual(len(keys), 2)
+            spectral_ordering(graphs[2], warm_start=False)
+            self.assertEqual(list(spectral._WARM_STARTS), keys)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
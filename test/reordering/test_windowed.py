@@ -0,0 +1,139 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the windowed ordering of layered circuits."""
+
+import unittest
+
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.test import QiskitTestCase
+from theia.cython.graph import clique_csr, group_layers, add_clique_weights
+from theia.cython.permute import adjacent_swaps
+from theia.reordering import windowed_ordering
+from theia.reordering.graph import entangling_graph
+from theia.reordering.windowed import layered_gates, window_graphs, window_starts
+
+
+def _random_circuit(num_qubits, num_gates, seed=None):
+    """A random circuit of 1, 2 and 3 qubit gates."""
+    rng = np.random.RandomState(seed)
+    circ = QuantumCircuit(num_qubits)
+    for _ in range(num_gates):
+        kind = rng.randint(4)
+        args = [int(idx) for idx in rng.choice(num_qubits, 3, replace=False)]
+        if kind == 0:
+            circ.h(args[0])
+        elif kind == 1:
+            circ.ccx(*args)
+        else:
+            circ.cx(*args[:2])
+    return circ
+
+
+def _window_circuit(qubits, gates, layers, num_qubits, start, stop):
+    """The entangling gates of layers start to stop-1 as a circuit."""
+    circ = QuantumCircuit(num_qubits)
+    for kk in np.flatnonzero((layers >= start) & (layers < stop)):
+        gate = qubits[gates[kk]:gates[kk+1]].tolist()
+        if len(gate) == 2:
+            circ.cx(*gate)
+        else:
+            circ.ccx(*gate)
+    return circ
+
+
+class TestWindowGraphs(QiskitTestCase):
+    """window_graphs tests."""
+    def setUp(self):
+        super().setUp()
+        self.circuit = _random_circuit(9, 120, seed=3)
+
+    def test_layers(self):
+        """Each gate is one layer after the last earlier gate on its qubits."""
+        qubits, gates, layers, _ = layered_gates(self.circuit)
+        last = {}
+        expected = []
+        for _, qargs, _ in self.circuit.data:
+            if len(qargs) < 2:
+                continue
+            idx = [self.circuit.qubits.index(qarg) for qarg in qargs]
+            layer = max(last.get(qubit, -1) for qubit in idx) + 1
+            last.update(dict.fromkeys(idx, layer))
+            expected.append((layer, sorted(idx)))
+        self.assertEqual(sorted(expected, key=lambda gate: gate[0]),
+                         [(layer, sorted(qubits[gates[kk]:gates[kk+1]].tolist()))
+                          for kk, layer in enumerate(layers.tolist())])
+
+    def test_full_rebuild(self):
+        """Incrementally updated graphs match graphs rebuilt from each window."""
+        layered = layered_gates(self.circuit)
+        num_layers = int(layered[2][-1]) + 1
+        for window, stride in [(1, 1), (3, 1), (5, 2), (4, 7), (num_layers, 1)]:
+            windows = list(window_graphs(self.circuit, window, stride))
+            self.assertEqual([start for start, _, _ in windows],
+                             window_starts(num_layers, window, stride))
+            self.assertEqual(windows[-1][1], num_layers)
+            for start, stop, G in windows:
+                expected = entangling_graph(_window_circuit(*layered, start, stop))
+                with self.subTest(window=window, stride=stride, start=start):
+                    self.assertEqual(G.nnz, expected.nnz)
+                    np.testing.assert_array_equal(G.toarray(), expected.toarray())
+        np.testing.assert_array_equal(windows[0][2].toarray(),
+                                      entangling_graph(self.circuit).toarray())
+
+    def test_invalid_window(self):
+        """Windows and strides must be positive."""
+        for window, stride in [(0, 1), (2, 0), (-1, None)]:
+            with self.assertRaises(ValueError):
+                list(window_graphs(self.circuit, window, stride))
+
+    def test_invalid_groups(self):
+        """Group kernels check the groups as clique_csr does."""
+        nodes = np.array([0, 1, 1, 2], dtype=np.int32)
+        groups = np.array([0, 2, 4], dtype=np.int32)
+        data, ind, ptr = clique_csr(nodes, groups, 3)
+        for bad_nodes, bad_groups in [(np.array([0, 5], dtype=np.int32), groups[:2]),
+                                      (nodes, np.array([0, 5], dtype=np.int32)),
+                                      (nodes, np.array([0, 3, 2], dtype=np.int32))]:
+            with self.assertRaises(ValueError):
+                group_layers(bad_nodes, bad_groups, 3)
+            with self.assertRaises(ValueError):
+                add_clique_weights(data, ind, ptr, bad_nodes, bad_groups, 0, 1, 1)
+        with self.assertRaises(ValueError):
+            add_clique_weights(data, ind, ptr, nodes, groups, 0, 3, 1)
+        # Empty ranges are allowed.
+        self.assertEqual(add_clique_weights(data, ind, ptr, nodes, groups, 2, 1, 1), 0)
+
+
+class TestWindowedOrdering(QiskitTestCase):
+    """windowed_ordering tests."""
+    def test_schedule(self):
+        """Each window gets a permutation, and swaps count the changes between them."""
+        circ = _random_circuit(9, 120, seed=4)
+        schedule, bands, pros, swaps = windowed_ordering(circ, 4, stride=2)
+        num_layers = int(layered_gates(circ)[2][-1]) + 1
+        self.assertEqual([start for start, _ in schedule],
+                         window_starts(num_layers, 4, 2))
+        self.assertEqual(bands.shape, (len(schedule),))
+        self.assertEqual(pros.shape, (len(schedule),))
+        for _, perm in schedule:
+            np.testing.assert_array_equal(np.sort(perm), np.arange(9))
+        self.assertEqual(swaps.tolist(),
+                         [adjacent_swaps(prev.astype(np.int64), perm.astype(np.int64))
+                          for (_, prev), (_, perm) in zip(schedule, schedule[1:])])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the columnar device calibration data."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+from qiskit.providers.models import BackendProperties
+from qiskit.test import QiskitTestCase
+from theia.reordering.graph import cx_error_weights
+from theia.visualization import backend_properties
+from theia.visualization.backend_properties import BackendPropertiesTable, properties_table
+
+DATE = '2020-08-10T02:07:03-04:00'
+
+
+def _nduv(name, value, unit=''):
+    return {'date': DATE, 'name': name, 'unit': unit, 'value': value}
+
+
+def _gate(gate, qubits, error=None):
+    """A gate calibration, without a gate error if error is None."""
+    params = [_nduv('gate_length', 35.5, 'ns')]
+    if error is not None:
+        params.append(_nduv('gate_error', error))
+    return {'gate': gate, 'qubits': qubits, 'parameters': params,
+            'name': gate + '_'.join(str(qubit) for qubit in qubits)}
+
+
+def _properties(last_update_date=DATE):
+    """Properties of a 3 qubit device, with qubit 1 missing its readout
+    error, qubit 2 its u2 error, and the cx 1_2 and 0_2 their errors."""
+    qubits = [[_nduv('T1', 100.0, 'µs'), _nduv('T2', 50.0, 'µs'),
+               _nduv('readout_error', 0.02)],
+              [_nduv('T1', 80.0, 'µs'), _nduv('T2', 30.0, 'µs'),
+               _nduv('frequency', 5.0, 'GHz')],
+              [_nduv('T1', 60.0, 'µs'), _nduv('T2', 70.0, 'µs'),
+               _nduv('readout_error', 0.04)]]
+    gates = [_gate('u2', [0], 0.001), _gate('u2', [1], 0.002), _gate('u2', [2]),
+             _gate('cx', [0, 1], 0.02), _gate('cx', [1, 0], 0.03),
+             _gate('cx', [1, 2]), _gate('cx', [2, 1], 0.01), _gate('cx', [0, 2])]
+    return {'backend_name': 'fake_device', 'backend_version': '1.0.0',
+            'last_update_date': last_update_date, 'qubits': qubits,
+            'gates': gates, 'general': []}
+
+
+class TestBackendPropertiesTable(QiskitTestCase):
+    """BackendPropertiesTable tests."""
+    def test_dict_and_object(self):
+        """Properties and their dict form give the same table."""
+        props = _properties()
+        tables = [BackendPropertiesTable(props),
+                  BackendPropertiesTable(BackendProperties.from_dict(props))]
+        for table in tables:
+            self.assertEqual(table.num_qubits, 3)
+            np.testing.assert_array_equal(table.t1, [100.0, 80.0, 60.0])
+            np.testing.assert_array_equal(table.t2, [50.0, 30.0, 70.0])
+            self.assertEqual(table.units['T1'], 'µs')
+            np.testing.assert_array_equal(table.edges,
+                                          [[0, 1], [1, 0], [1, 2], [2, 1], [0, 2]])
+            self.assertEqual(table.edge_index[(2, 1)], 3)
+
+    def test_missing_values(self):
+        """Missing calibration data is NaN, and left out of the averages."""
+        table = BackendPropertiesTable(_properties())
+        np.testing.assert_array_equal(table.readout_error, [0.02, np.nan, 0.04])
+        self.assertAlmostEqual(np.nanmean(table.readout_error), 0.03)
+        self.assertEqual(np.nanmax(table.readout_error), 0.04)
+        np.testing.assert_array_equal(table.gate_error('u2'), [0.001, 0.002, np.nan])
+        self.assertTrue(np.isnan(table.gate_error('sx')).all())
+        np.testing.assert_array_equal(table.cx_error, [0.02, 0.03, np.nan, 0.01, np.nan])
+        np.testing.assert_array_equal(table.cx_errors([[1, 0], [1, 2], [2, 0]]),
+                                      [0.03, np.nan, np.nan])
+
+    def test_no_readout(self):
+        """Devices without readout errors give all NaN readout errors."""
+        props = _properties()
+        for items in props['qubits']:
+            items[:] = [item for item in items if item['name'] != 'readout_error']
+        table = BackendPropertiesTable(props)
+        self.assertTrue(np.isnan(table.readout_error).all())
+        self.assertNotIn('readout_error', table.units)
+
+
+class TestPropertiesTable(QiskitTestCase):
+    """properties_table tests."""
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(backend_properties._TABLES, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.backend = mock.Mock()
+        self.backend.properties.return_value = BackendProperties.from_dict(_properties())
+
+    def test_cached_per_calibration(self):
+        """Tables are shared until the properties are updated."""
+        table = properties_table(self.backend)
+        self.assertIs(properties_table(self.backend), table)
+        self.backend.properties.return_value = BackendProperties.from_dict(
+            _properties('2020-08-11T02:07:03-04:00'))
+        self.assertIsNot(properties_table(self.backend), table)
+        self.assertEqual(len(backend_properties._TABLES), 2)
+
+    def test_cx_error_weights(self):
+        """CX weights are the larger error of each pair relative to the
+        lowest, leaving out pairs without errors."""
+        weights = cx_error_weights(self.backend)
+        self.assertEqual(sorted(weights), [(0, 1), (1, 2)])
+        self.assertAlmostEqual(weights[(0, 1)], 3.0)
+        self.assertEqual(weights[(1, 2)], 1.0)
+        self.assertEqual(len(backend_properties._TABLES), 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
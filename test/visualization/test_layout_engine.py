@@ -0,0 +1,131 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the automatic device layouts."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+import numpy as np
+from qiskit.test import QiskitTestCase
+from theia.visualization import layout_engine
+from theia.visualization.device_layouts import DEVICE_LAYOUTS
+from theia.visualization.layout_engine import coupling_map_key, device_layout
+
+
+def _grid_map(rows, cols):
+    """Couplings of a rows x cols grid, in both directions."""
+    qubits = np.arange(rows*cols).reshape(rows, cols)
+    pairs = np.concatenate([np.stack([qubits[:, :-1].ravel(), qubits[:, 1:].ravel()], axis=1),
+                            np.stack([qubits[:-1].ravel(), qubits[1:].ravel()], axis=1)])
+    return np.concatenate([pairs, pairs[:, ::-1]]).tolist()
+
+
+def _ring_map(n_qubits):
+    qubits = np.arange(n_qubits)
+    return np.stack([qubits, np.roll(qubits, -1)], axis=1).tolist()
+
+
+class TestDeviceLayout(QiskitTestCase):
+    """device_layout tests."""
+    def setUp(self):
+        super().setUp()
+        patcher = mock.patch.dict(layout_engine._LAYOUTS, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+        super().tearDown()
+
+    def assertDistinctCells(self, layout, n_qubits):
+        """Checks that layout puts n_qubits in distinct cells from (0, 0)."""
+        cells = np.asarray(layout)
+        self.assertEqual(cells.shape, (n_qubits, 2))
+        self.assertEqual(np.unique(cells, axis=0).shape[0], n_qubits)
+        np.testing.assert_array_equal(cells.min(axis=0), [0, 0])
+
+    def test_distinct_cells(self):
+        """Computed layouts place every qubit in its own cell."""
+        edges = np.random.RandomState(0).randint(30, size=(40, 2)).tolist()
+        for n_qubits, cmap in [(7, None), (12, _grid_map(3, 4)), (27, _ring_map(27)),
+                               (30, edges), (9, [[0, 1], [2, 3], [3, 4]])]:
+            with self.subTest(n_qubits=n_qubits):
+                layout = device_layout(n_qubits, cmap, cache_dir=None)
+                self.assertDistinctCells(layout, n_qubits)
+                self.assertTrue(all(isinstance(val, int) for cell in layout for val in cell))
+
+    def test_grid(self):
+        """A grid of qubits is laid out with every coupling one step long."""
+        cmap = _grid_map(3, 5)
+        cells = np.asarray(device_layout(15, cmap, cache_dir=None))
+        lengths = np.abs(cells[[pair[0] for pair in cmap]] -
+                         cells[[pair[1] for pair in cmap]]).sum(axis=1)
+        np.testing.assert_array_equal(lengths, 1)
+
+    def test_disk_cache(self):
+        """Computed layouts are saved as JSON and loaded by later calls."""
+        cmap = _ring_map(12)
+        layout = device_layout(12, cmap, cache_dir=self.path)
+        with open(os.path.join(self.path, coupling_map_key(12, cmap) + '.json')) as file:
+            self.assertEqual(json.load(file), {'layout': layout})
+        self.assertEqual(os.listdir(self.path), [coupling_map_key(12, cmap) + '.json'])
+        layout_engine._LAYOUTS.clear()
+        with mock.patch.object(layout_engine, '_grid_layout') as grid_layout:
+            self.assertEqual(device_layout(12, cmap[::-1], cache_dir=self.path), layout)
+            self.assertEqual(device_layout(12, cmap, cache_dir=self.path), layout)
+        grid_layout.assert_not_called()
+
+    def test_invalid_cache_file(self):
+        """Cache files that do not hold a layout of the device are recomputed."""
+        cmap = _ring_map(8)
+        path = os.path.join(self.path, coupling_map_key(8, cmap) + '.json')
+        for contents in ['{"layout": [[0, 0]]}', '{"cells": []}', 'not json']:
+            layout_engine._LAYOUTS.clear()
+            with open(path, 'w') as file:
+                file.write(contents)
+            with self.subTest(contents=contents):
+                self.assertDistinctCells(device_layout(8, cmap, cache_dir=self.path), 8)
+                with open(path) as file:
+                    self.assertEqual(len(json.load(file)['layout']), 8)
+
+    def test_known_layout(self):
+        """Devices that fit a known layout get that layout."""
+        cmap = [[0, 1], [1, 0], [1, 2], [1, 3], [3, 4]]
+        with mock.patch.object(layout_engine, '_grid_layout') as grid_layout:
+            self.assertIs(device_layout(5, cmap, cache_dir=self.path), DEVICE_LAYOUTS[5])
+        grid_layout.assert_not_called()
+        self.assertEqual(os.listdir(self.path), [])
+
+    def test_known_layout_fallback(self):
+        """Devices that do not fit the known layout of their size are laid out."""
+        cmap = [[0, 3], [3, 1], [1, 4], [4, 2]]
+        with mock.patch.object(layout_engine, '_grid_layout',
+                               wraps=layout_engine._grid_layout) as grid_layout:
+            layout = device_layout(5, cmap, cache_dir=None)
+        grid_layout.assert_called_once()
+        self.assertNotEqual(layout, DEVICE_LAYOUTS[5])
+        self.assertDistinctCells(layout, 5)
+        cells = np.asarray(layout)
+        lengths = np.abs(cells[[0, 3, 1, 4]] - cells[[3, 1, 4, 2]]).sum(axis=1)
+        np.testing.assert_array_equal(lengths, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Tests for the binned sparse matrix plots."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+import scipy.sparse as sp
+from qiskit.test import QiskitTestCase
+from theia.cython.spy import binned_max
+from theia.visualization import spy
+
+
+def _random_matrix(nrows, ncols, density, dtype, seed=None):
+    """A random CSR matrix with weights from 1 to 9."""
+    rng = np.random.RandomState(seed)
+    M = sp.random(nrows, ncols, density, format='csr', random_state=rng)
+    M.data = rng.randint(1, 10, size=M.nnz).astype(dtype)
+    return M
+
+
+def _dense_binned_max(M, row_start, row_stop, col_start, col_stop, row_bin, col_bin):
+    """Largest stored weight of each block, NaN for blocks without elements."""
+    stored = np.full(M.shape, np.nan)
+    rows = np.repeat(np.arange(M.shape[0]), np.diff(M.indptr))
+    stored[rows, M.indices] = M.data
+    block = stored[row_start:row_stop, col_start:col_stop]
+    height = -(-block.shape[0] // row_bin)
+    width = -(-block.shape[1] // col_bin)
+    if not height or not width:
+        return np.full((height, width), np.nan)
+    padded = np.full((height*row_bin, width*col_bin), np.nan)
+    padded[:block.shape[0], :block.shape[1]] = block
+    blocks = padded.reshape(height, row_bin, width, col_bin).swapaxes(1, 2)
+    blocks = blocks.reshape(height, width, -1)
+    out = np.full((height, width), np.nan)
+    full = ~np.all(np.isnan(blocks), axis=2)
+    out[full] = np.nanmax(blocks[full], axis=1)
+    return out
+
+
+class TestBinnedMax(QiskitTestCase):
+    """binned_max tests."""
+    def test_dense_block_max(self):
+        """Bins match the block maxima of the dense matrix."""
+        blocks = [(0, 23, 0, 17), (5, 19, 3, 11), (22, 23, 16, 17), (7, 7, 0, 17)]
+        for dtype in [np.int32, np.float64]:
+            M = _random_matrix(23, 17, 0.2, dtype, seed=1)
+            for index_dtype in [np.int32, np.int64]:
+                ind = M.indices.astype(index_dtype)
+                ptr = M.indptr.astype(index_dtype)
+                for block in blocks:
+                    for row_bin, col_bin in [(1, 1), (2, 3), (4, 4), (30, 30)]:
+                        with self.subTest(dtype=dtype, index_dtype=index_dtype,
+                                          block=block, bins=(row_bin, col_bin)):
+                            image = binned_max(M.data, ind, ptr, *block, row_bin, col_bin)
+                            self.assertEqual(image.dtype, np.float64)
+                            np.testing.assert_array_equal(
+                                image, _dense_binned_max(M, *block, row_bin, col_bin))
+
+    def test_invalid_block(self):
+        """Rows outside the matrix and empty bins raise."""
+        M = _random_matrix(6, 6, 0.5, np.float64, seed=2)
+        for args in [(0, 7, 0, 6, 1, 1), (-1, 3, 0, 6, 1, 1),
+                     (0, 6, 0, 6, 0, 1), (0, 6, 0, 6, 1, 0)]:
+            with self.assertRaises(ValueError):
+                binned_max(M.data, M.indices, M.indptr, *args)
+
+
+class TestIplotSpy(QiskitTestCase):
+    """iplot_spy tests."""
+    def test_rebin(self):
+        """Zooming re-bins the visible block to the figure resolution."""
+        M = _random_matrix(300, 200, 0.05, np.float64, seed=3)
+        with mock.patch.object(spy, 'PlotlyWidget') as widget:
+            spy.iplot_spy(M, figsize=(50, 100))
+        fig = widget.call_args[0][0]
+        np.testing.assert_array_equal(fig.data[0].z,
+                                      _dense_binned_max(M, 0, 300, 0, 200, 3, 4))
+        out = widget.return_value
+        rebin = out.layout.on_change.call_args[0][0]
+        for x_range, y_range, block, bins in [
+                ((9.6, 120.2), (310, -20), (10, 121, 0, 300), (3, 3)),
+                ((-0.5, 3.4), (40.5, 20.5), (0, 4, 21, 41), (1, 1)),
+                (None, None, (0, 200, 0, 300), (4, 3))]:
+            with self.subTest(x_range=x_range, y_range=y_range):
+                rebin(out.layout, x_range, y_range)
+                trace = out.data[0].update.call_args[0][0]
+                col_start, col_stop, row_start, row_stop = block
+                col_bin, row_bin = bins
+                np.testing.assert_array_equal(
+                    trace['z'], _dense_binned_max(M, row_start, row_stop, col_start,
+                                                  col_stop, row_bin, col_bin))
+                self.assertEqual((trace['x0'], trace['dx']),
+                                 (col_start + (col_bin-1)/2, col_bin))
+                self.assertEqual((trace['y0'], trace['dy']),
+                                 (row_start + (row_bin-1)/2, row_bin))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+#cython: language_level = 3
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+# Monotonic wall clock for the time budgets of the kernels, measuring
+# the same elapsed time as time.perf_counter on the Python side.
+cdef extern from *:
+    """
+    #include <chrono>
+    static inline double theia_monotonic_seconds(void) {
+        return std::chrono::duration<double>(
+            std::chrono::steady_clock::now().time_since_epoch()).count();
+    }
+    """
+    double monotonic_seconds "theia_monotonic_seconds" () noexcept nogil
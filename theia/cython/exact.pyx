@@ -0,0 +1,193 @@
+# -*- coding: utf-8 -*-
+#cython: language_level = 3
+#distutils: language = c++
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Exact bandwidth layout search"""
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.stdint cimport uint64_t
+from libc.string cimport memcpy
+from .clock cimport monotonic_seconds
+from libcpp.string cimport string
+from libcpp.unordered_set cimport unordered_set
+cnp.import_array()
+
+cdef extern from *:
+    int __builtin_popcountll(unsigned long long x) nogil
+    int __builtin_ctzll(unsigned long long x) nogil
+
+# Max. number of nodes, one bit per node
+MAX_NODES = 64
+
+# Search outcomes
+cdef enum:
+    FOUND = 1
+    INFEASIBLE = 0
+    TIMED_OUT = -1
+
+
+cdef inline int popcount(uint64_t x) noexcept nogil:
+    return __builtin_popcountll(x)
+
+
+@cython.final
+cdef class _LayoutSearch:
+    """
+    Depth first search for a layout with bandwidth at most k.
+
+    Nodes are placed left to right.  Nodes placed more than k positions
+    back must have no unplaced neighbors, so every unplaced neighbor of
+    the last k placed nodes has a deadline by which it must be placed.
+    Failed searches are remembered by the placed set and the deadlines,
+    which fix all remaining constraints.  A partial layout is pruned when
+    the unplaced nodes within distance d of a node placed at position p
+    cannot all fit at positions up to p + d*k.  Since the reverse of a
+    layout is a layout, only layouts with the anchor node in the first
+    half are searched.
+    """
+    cdef int n, k, anchor
+    cdef uint64_t[:, ::1] balls
+    cdef int[::1] ecc
+    cdef int[::1] degree
+    cdef int[::1] order
+    cdef unordered_set[string] failed
+    cdef double stop
+    cdef size_t steps
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int extend(self, uint64_t placed, int num_placed) noexcept:
+        cdef int n = self.n, k = self.k
+        cdef int wstart = num_placed - k if num_placed > k else 0
+        cdef int pos, node, last, d, kk, jj, num_cands = 0, out
+        cdef uint64_t pending = 0, new, allowed, forced
+        cdef char deadline[64]
+        cdef int cands[64]
+        cdef int keys[64]
+        cdef string key
+
+        if num_placed == n:
+            return FOUND
+        self.steps += 1
+        if (self.steps & 255) == 0 and monotonic_seconds() > self.stop:
+            return TIMED_OUT
+
+        for kk in range(n):
+            deadline[kk] = 0
+        for pos in range(wstart, num_placed):
+            node = self.order[pos]
+            last = pos + k - num_placed
+            new = self.balls[node, 0] & ~placed & ~pending
+            pending |= new
+            # The unplaced neighbors of the window up to this node must
+            # fit at positions up to its deadline.
+            if popcount(pending) > last + 1:
+                return INFEASIBLE
+            for d in range(2, self.ecc[node] + 1):
+                if popcount(self.balls[node, d-1] & ~placed) > last + (d-1)*k + 1:
+                    return INFEASIBLE
+            while new:
+                deadline[__builtin_ctzll(new)] = last + 1
+                new &= new - 1
+
+        key.resize(sizeof(uint64_t) + n)
+        memcpy(&key[0], &placed, sizeof(uint64_t))
+        memcpy(&key[sizeof(uint64_t)], deadline, n)
+        if self.failed.count(key):
+            return INFEASIBLE
+
+        allowed = ~placed
+        if n < 64:
+            allowed &= (<uint64_t>1 << n) - 1
+        if not (placed >> self.anchor) & 1 and num_placed >= (n-1) // 2:
+            if num_placed > (n-1) // 2:
+                allowed = 0
+            allowed &= <uint64_t>1 << self.anchor
+        if num_placed - wstart == k:
+            # The oldest window node leaves the window after this step.
+            forced = self.balls[self.order[wstart], 0] & ~placed
+            if forced & (forced - 1):
+                allowed = 0
+            elif forced:
+                allowed &= forced
+
+        # Earliest deadline first, then lowest degree.
+        while allowed:
+            node = __builtin_ctzll(allowed)
+            allowed &= allowed - 1
+            cands[num_cands] = node
+            keys[num_cands] = (deadline[node] if deadline[node] else n+1)*(n+1) + \
+                self.degree[node]
+            jj = num_cands
+            while jj > 0 and keys[jj-1] > keys[jj]:
+                keys[jj-1], keys[jj] = keys[jj], keys[jj-1]
+                cands[jj-1], cands[jj] = cands[jj], cands[jj-1]
+                jj -= 1
+            num_cands += 1
+
+        for kk in range(num_cands):
+            self.order[num_placed] = cands[kk]
+            out = self.extend(placed | (<uint64_t>1 << cands[kk]), num_placed + 1)
+            if out != INFEASIBLE:
+                return out
+        self.failed.insert(key)
+        return INFEASIBLE
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def bandwidth_layout(uint64_t[:, ::1] balls,
+                     int[::1] ecc,
+                     int[::1] degree,
+                     int k,
+                     double max_time):
+    """
+    Searches for a layout of a connected graph with bandwidth at most k.
+
+    Here balls[node, d-1] is the bit mask of the nodes within distance d
+    of node, for d up to its eccentricity ecc[node], and the graph has
+    at most MAX_NODES nodes.  The search gives up after max_time seconds
+    of wall-clock time.
+
+    Returns:
+        tuple: status (1 found, 0 no such layout, -1 out of time),
+               layout if found
+    """
+    cdef _LayoutSearch search = _LayoutSearch()
+    cdef int n = balls.shape[0]
+    cdef int start, kk, out = INFEASIBLE
+    if n > MAX_NODES:
+        raise ValueError('Graph has more than {} nodes.'.format(MAX_NODES))
+    search.n = n
+    search.k = k
+    search.balls = balls
+    search.ecc = ecc
+    search.degree = degree
+    search.anchor = int(np.argmax(degree))
+    search.order = np.zeros(n, dtype=np.int32)
+    search.stop = monotonic_seconds() + max_time
+    search.steps = 0
+    starts = np.argsort(degree, kind='stable')
+    for kk in range(n):
+        start = starts[kk]
+        search.order[0] = start
+        out = search.extend(<uint64_t>1 << start, 1)
+        if out != INFEASIBLE:
+            break
+    if out == FOUND:
+        return 1, np.asarray(search.order)
+    return out, None
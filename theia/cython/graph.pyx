@@ -0,0 +1,301 @@
+# -*- coding: utf-8 -*-
+#cython: language_level = 3
+#distutils: language = c++
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Graph construction routines"""
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+cnp.import_array()
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def symmetric_csr(int[::1] pairs, int num_nodes):
+    """
+    Builds the symmetric, weighted CSR adjacency matrix of a graph
+    from a flat array of edge pairs [a0, b0, a1, b1, ...].
+
+    Repeated edges are summed into the weight of that edge and
+    self-loops are dropped.  The column indices of each row are
+    returned sorted.  Raises ValueError if a node is not in
+    range(num_nodes).  The construction is O(num_nodes + num_edges) and
+    does not form any intermediate COO matrix or transpose copy.
+    """
+    cdef size_t num_pairs = pairs.shape[0] // 2
+    cdef size_t kk
+    cdef int ii, aa, bb
+    cdef cnp.ndarray[int, ndim=1] row_ptr = np.zeros(num_nodes+1, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] row_ind = np.empty(2*num_pairs, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] fill
+    _check_nodes(pairs, num_nodes)
+
+    # Count both directions of every edge
+    for kk in range(num_pairs):
+        aa = pairs[2*kk]
+        bb = pairs[2*kk+1]
+        if aa != bb:
+            row_ptr[aa+1] += 1
+            row_ptr[bb+1] += 1
+    for ii in range(num_nodes):
+        row_ptr[ii+1] += row_ptr[ii]
+
+    # Scatter into rows, with duplicates
+    fill = row_ptr[:num_nodes].copy()
+    for kk in range(num_pairs):
+        aa = pairs[2*kk]
+        bb = pairs[2*kk+1]
+        if aa != bb:
+            row_ind[fill[aa]] = bb
+            fill[aa] += 1
+            row_ind[fill[bb]] = aa
+            fill[bb] += 1
+
+    return _merge_rows(row_ptr, row_ind, num_nodes)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def clique_csr(int[::1] nodes, int[::1] groups, int num_nodes):
+    """
+    Builds the symmetric, weighted CSR adjacency matrix of a graph in
+    which each group of nodes forms a clique.  Group gg holds the nodes
+    nodes[groups[gg]:groups[gg+1]].
+
+    Every pair of distinct nodes in a group adds one to the weight of
+    their edge, so groups of two give the same matrix as symmetric_csr.
+    The construction is O(num_nodes + sum of squared group sizes).
+    Raises ValueError if a node is not in range(num_nodes) or groups
+    are not non-decreasing offsets into nodes.
+    """
+    cdef size_t num_groups = groups.shape[0] - 1 if groups.shape[0] else 0
+    cdef size_t gg
+    cdef int ii, jj, aa, bb
+    cdef cnp.ndarray[int, ndim=1] row_ptr = np.zeros(num_nodes+1, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] row_ind
+    cdef cnp.ndarray[int, ndim=1] fill
+    _check_groups(nodes, groups, num_nodes)
+
+    # Count both directions of every clique edge
+    for gg in range(num_groups):
+        for ii in range(groups[gg], groups[gg+1]):
+            aa = nodes[ii]
+            for jj in range(ii+1, groups[gg+1]):
+                bb = nodes[jj]
+                if aa != bb:
+                    row_ptr[aa+1] += 1
+                    row_ptr[bb+1] += 1
+    for ii in range(num_nodes):
+        row_ptr[ii+1] += row_ptr[ii]
+
+    # Scatter into rows, with duplicates
+    row_ind = np.empty(row_ptr[num_nodes], dtype=np.int32)
+    fill = row_ptr[:num_nodes].copy()
+    for gg in range(num_groups):
+        for ii in range(groups[gg], groups[gg+1]):
+            aa = nodes[ii]
+            for jj in range(ii+1, groups[gg+1]):
+                bb = nodes[jj]
+                if aa != bb:
+                    row_ind[fill[aa]] = bb
+                    fill[aa] += 1
+                    row_ind[fill[bb]] = aa
+                    fill[bb] += 1
+
+    return _merge_rows(row_ptr, row_ind, num_nodes)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _check_nodes(int[::1] nodes, int num_nodes) except -1:
+    """Raises ValueError unless every node is in range(num_nodes)."""
+    cdef size_t kk
+    for kk in range(nodes.shape[0]):
+        if nodes[kk] < 0 or nodes[kk] >= num_nodes:
+            raise ValueError('Nodes must be in range(num_nodes).')
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef int _check_groups(int[::1] nodes, int[::1] groups, int num_nodes) except -1:
+    """Raises ValueError unless groups are non-decreasing offsets into
+    nodes, and the nodes of the groups are in range(num_nodes).
+    """
+    cdef size_t gg
+    if groups.shape[0] == 0:
+        return 0
+    if groups[0] < 0 or groups[groups.shape[0]-1] > nodes.shape[0]:
+        raise ValueError('Groups must be offsets into nodes.')
+    for gg in range(groups.shape[0] - 1):
+        if groups[gg] > groups[gg+1]:
+            raise ValueError('Groups must be non-decreasing offsets.')
+    _check_nodes(nodes[groups[0]:groups[groups.shape[0]-1]], num_nodes)
+    return 0
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef tuple _merge_rows(cnp.ndarray[int, ndim=1] row_ptr,
+                       cnp.ndarray[int, ndim=1] row_ind,
+                       int num_nodes):
+    """
+    Sums the duplicate column indices of each row of a symmetric
+    pattern into weights, and sorts the columns of each row.
+    """
+    cdef size_t kk
+    cdef int ii, jj, pos, nnz
+    cdef cnp.ndarray[int, ndim=1] row_data = np.empty(row_ind.shape[0], dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] last = np.full(num_nodes, -1, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] fill
+
+    # Merge duplicates within each row, in place.  last[jj] holds the
+    # position of column jj in the current row, if already seen.
+    nnz = 0
+    for ii in range(num_nodes):
+        pos = row_ptr[ii]
+        row_ptr[ii] = nnz
+        for kk in range(pos, row_ptr[ii+1]):
+            jj = row_ind[kk]
+            if last[jj] >= row_ptr[ii]:
+                row_data[last[jj]] += 1
+            else:
+                last[jj] = nnz
+                row_ind[nnz] = jj
+                row_data[nnz] = 1
+                nnz += 1
+    row_ptr[num_nodes] = nnz
+
+    # The matrix is symmetric, so a counting-sort transpose gives back
+    # the same matrix with sorted column indices.
+    cdef cnp.ndarray[int, ndim=1] ptr = np.zeros(num_nodes+1, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] ind = np.empty(nnz, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] data = np.empty(nnz, dtype=np.int32)
+    for kk in range(nnz):
+        ptr[row_ind[kk]+1] += 1
+    for ii in range(num_nodes):
+        ptr[ii+1] += ptr[ii]
+    fill = ptr[:num_nodes].copy()
+    for ii in range(num_nodes):
+        for kk in range(row_ptr[ii], row_ptr[ii+1]):
+            jj = row_ind[kk]
+            ind[fill[jj]] = ii
+            data[fill[jj]] = row_data[kk]
+            fill[jj] += 1
+
+    return data, ind, ptr
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def group_layers(int[::1] nodes, int[::1] groups, int num_nodes):
+    """
+    Layer of each group of nodes, in the order given, where a group is
+    placed one layer after the last earlier group that shares a node
+    with it.  Groups are given, and checked, as for clique_csr.
+    """
+    cdef size_t num_groups = groups.shape[0] - 1 if groups.shape[0] else 0
+    cdef size_t gg
+    cdef int ii, layer
+    cdef cnp.ndarray[int, ndim=1] layers = np.empty(num_groups, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] last = np.full(num_nodes, -1, dtype=np.int32)
+    _check_groups(nodes, groups, num_nodes)
+    for gg in range(num_groups):
+        layer = 0
+        for ii in range(groups[gg], groups[gg+1]):
+            if last[nodes[ii]] + 1 > layer:
+                layer = last[nodes[ii]] + 1
+        for ii in range(groups[gg], groups[gg+1]):
+            last[nodes[ii]] = layer
+        layers[gg] = layer
+    return layers
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def add_clique_weights(int[::1] data, int[::1] ind, int[::1] ptr,
+                       int[::1] nodes, int[::1] groups,
+                       int start, int stop, int delta):
+    """
+    Adds delta, in place, to the weights of the clique edges of groups
+    start to stop-1 in a symmetric CSR matrix with sorted column indices
+    that already contains every such edge.  Groups are given, and
+    checked, as for clique_csr.  Each entry is found by binary search of
+    its row.
+
+    Returns the change in the number of nonzero weights.
+    """
+    cdef int gg, ii, jj, aa, bb, change = 0
+    _check_groups(nodes, groups, ptr.shape[0] - 1)
+    if start < stop and (start < 0 or stop >= groups.shape[0]):
+        raise ValueError('Groups start to stop-1 must exist.')
+    for gg in range(start, stop):
+        for ii in range(groups[gg], groups[gg+1]):
+            aa = nodes[ii]
+            for jj in range(ii+1, groups[gg+1]):
+                bb = nodes[jj]
+                if aa != bb:
+                    change += _add_entry(data, _find_entry(ind, ptr[aa], ptr[aa+1], bb),
+                                         delta)
+                    change += _add_entry(data, _find_entry(ind, ptr[bb], ptr[bb+1], aa),
+                                         delta)
+    return change
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _find_entry(int[::1] ind, int lo, int hi, int col) noexcept:
+    """Position of col in the sorted ind[lo:hi], which must contain it."""
+    cdef int mid
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if ind[mid] > col:
+            hi = mid
+        else:
+            lo = mid
+    return lo
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef inline int _add_entry(int[::1] data, int pos, int delta) noexcept:
+    """Adds delta to data[pos], returning the change in nonzeros."""
+    cdef int old = data[pos]
+    data[pos] = old + delta
+    return (old + delta != 0) - (old != 0)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def nonzero_csr(int[::1] data, int[::1] ind, int[::1] ptr, int num_nodes,
+                int nnz):
+    """
+    Copy of a CSR matrix with nnz nonzero weights, without its explicit
+    zero entries.
+    """
+    cdef int ii, kk, pos = 0
+    cdef cnp.ndarray[int, ndim=1] new_ptr = np.empty(num_nodes+1, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] new_ind = np.empty(nnz, dtype=np.int32)
+    cdef cnp.ndarray[int, ndim=1] new_data = np.empty(nnz, dtype=np.int32)
+    new_ptr[0] = 0
+    for ii in range(num_nodes):
+        for kk in range(ptr[ii], ptr[ii+1]):
+            if data[kk] != 0:
+                new_ind[pos] = ind[kk]
+                new_data[pos] = data[kk]
+                pos += 1
+        new_ptr[ii+1] = pos
+    return new_data, new_ind, new_ptr
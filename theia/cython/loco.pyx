@@ -18,6 +18,7 @@ import numpy as np
 cimport numpy as cnp
 cimport cython
 from libc.stdint cimport int64_t
+from libc.string cimport memset
 from libcpp.algorithm cimport sort
 from libcpp.vector cimport vector
 cnp.import_array()
@@ -29,31 +30,41 @@ cdef extern from "numpy/arrayobject.h" nogil:
     void PyDataMem_NEW_ZEROED(size_t size, size_t elsize)
     void PyDataMem_NEW(size_t size)
 
+# Index types of the CSR index and pointer arrays
+ctypedef fused index_t:
+    int
+    int64_t
+
+# Types of the CSR data (edge weights)
+ctypedef fused weight_t:
+    int
+    double
+
 #Struct used for arg sorting
 cdef struct _int_pair:
-    int data
-    int idx
+    int64_t data
+    int64_t idx
 
 #Struct used for weighted arg sorting
 cdef struct _weighted_int_pair:
-    int data
-    int idx
-    int weight
+    int64_t data
+    int64_t idx
+    double weight
 
 ctypedef _int_pair int_pair
 ctypedef _weighted_int_pair weighted_int_pair
-ctypedef int (*cfptr)(int_pair, int_pair)
-ctypedef int (*wptr)(weighted_int_pair, weighted_int_pair)
+ctypedef int (*cfptr)(int_pair, int_pair) noexcept nogil
+ctypedef int (*wptr)(weighted_int_pair, weighted_int_pair) noexcept nogil
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int int_sort(int_pair x, int_pair y):
+cdef int int_sort(int_pair x, int_pair y) noexcept nogil:
     return x.data < y.data
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int weighted_int_low_sort(weighted_int_pair x, 
-                           weighted_int_pair y):
+cdef int weighted_int_low_sort(weighted_int_pair x,
+                               weighted_int_pair y) noexcept nogil:
     if x.data != y.data:
         return x.data < y.data
     elif x.weight != y.weight:
@@ -63,8 +74,8 @@ cdef int weighted_int_low_sort(weighted_int_pair x,
     
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int weighted_int_high_sort(weighted_int_pair x, 
-                           weighted_int_pair y):
+cdef int weighted_int_high_sort(weighted_int_pair x,
+                                weighted_int_pair y) noexcept nogil:
     if x.data != y.data:
         return x.data < y.data
     elif x.weight != y.weight:
@@ -73,13 +84,85 @@ cdef int weighted_int_high_sort(weighted_int_pair x,
         return 0
 
 
+def _index_dtype(index_array):
+    """Numpy dtype matching a CSR index array, int32 or int64."""
+    if np.asarray(index_array).dtype == np.int64:
+        return np.int64
+    return np.int32
+
+
+# Number of scratch buffers of an OrderingWorkspace
+cdef enum:
+    _DEGREE, _INDS, _REV_INDS, _QUEUE, _MARK, _NUM_BUFFERS
+
+
+@cython.final
+cdef class OrderingWorkspace:
+    """
+    Scratch buffers of the reverse Cuthill-McKee kernels, reusable across
+    calls to avoid allocating them for every graph.
+
+    The buffers hold graphs of up to max_nodes nodes, with int32 or int64
+    indices, and are grown when a larger graph is ordered.  allocations
+    counts the buffers allocated so far.  A workspace must not be used
+    by two threads at the same time.
+    """
+    cdef readonly int64_t max_nodes
+    cdef readonly int64_t allocations
+    cdef char * buffers[_NUM_BUFFERS]
+    cdef double * weights
+    cdef vector[int_pair] pairs
+    cdef vector[weighted_int_pair] wpairs
+
+    def __cinit__(self, int64_t max_nodes=0):
+        cdef int kk
+        for kk in range(_NUM_BUFFERS):
+            self.buffers[kk] = NULL
+        self.weights = NULL
+        self.max_nodes = 0
+        self.allocations = 0
+        self.reserve(max_nodes)
+
+    def __dealloc__(self):
+        cdef int kk
+        for kk in range(_NUM_BUFFERS):
+            PyDataMem_FREE(self.buffers[kk])
+        PyDataMem_FREE(self.weights)
+
+    def reserve(self, int64_t num_nodes):
+        """
+        Grows the buffers to hold graphs of num_nodes nodes.
+        """
+        cdef int kk
+        if num_nodes <= self.max_nodes:
+            return
+        for kk in range(_NUM_BUFFERS):
+            PyDataMem_FREE(self.buffers[kk])
+            self.buffers[kk] = <char *>PyDataMem_NEW(num_nodes*sizeof(int64_t))
+        PyDataMem_FREE(self.weights)
+        self.weights = <double *>PyDataMem_NEW((num_nodes+1)*sizeof(double))
+        self.pairs.resize(num_nodes)
+        self.wpairs.resize(num_nodes)
+        self.allocations += _NUM_BUFFERS + 3
+        self.max_nodes = num_nodes
+
+
+cdef OrderingWorkspace _workspace(OrderingWorkspace workspace, int64_t num_rows):
+    # A temporary workspace is made for calls without one.
+    if workspace is None:
+        return OrderingWorkspace(num_rows)
+    workspace.reserve(num_rows)
+    return workspace
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int * _max_row_weights(
-        int * data,
-        int * inds,
-        int * ptrs,
-        int ncols):
+cdef void _max_row_weights(
+        weight_t * data,
+        index_t * inds,
+        index_t * ptrs,
+        index_t ncols,
+        double * weights) noexcept nogil:
     """
     Finds the largest abs value in each matrix column
     and the max. total number of elements in the cols (given by weights[-1]).
@@ -87,18 +170,19 @@ cdef int * _max_row_weights(
     Here we assume that the user already took the ABS value of the data.
     This keeps us from having to call abs over and over.
 
+    The values are written to weights, of length ncols+1.
     """
-    cdef int * weights = <int *>PyDataMem_NEW((ncols+1)*sizeof(int))
-    cdef int ln, mx, ii, jj
-    cdef int weight, current
+    cdef index_t ln, mx, ii, jj
+    cdef double weight, current
     mx = 0
     for jj in range(ncols):
         ln = (ptrs[jj + 1] - ptrs[jj])
         if ln > mx:
             mx = ln
 
-        weight = data[ptrs[jj]]
-        for ii in range(ptrs[jj] + 1, ptrs[jj + 1]):
+        # Columns without entries have weight 0.
+        weight = 0
+        for ii in range(ptrs[jj], ptrs[jj + 1]):
             current = data[ii]
             if current > weight:
                 weight = current
@@ -106,64 +190,63 @@ cdef int * _max_row_weights(
         weights[jj] = weight
 
     weights[ncols] = mx
-    return weights
-    
-    
+
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int * int_argsort(int * x, int nrows):
-    cdef vector[int_pair] pairs
+cdef void int_argsort(index_t * x, index_t nrows, int_pair * pairs,
+                      index_t * out) noexcept nogil:
+    """
+    Argsort of x, written to out, using pairs as a scratch buffer
+    of length nrows.
+    """
     cdef cfptr cfptr_ = &int_sort
-    cdef size_t kk
-    pairs.resize(nrows)
+    cdef index_t kk
     for kk in range(nrows):
         pairs[kk].data = x[kk]
         pairs[kk].idx = kk
-    
-    sort(pairs.begin(),pairs.end(),cfptr_)
-    cdef int * out = <int *>PyDataMem_NEW(nrows *sizeof(int))
+
+    sort(pairs, pairs + nrows, cfptr_)
     for kk in range(nrows):
         out[kk] = pairs[kk].idx
-    return out
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cdef int * weighted_int_argsort(int * data, 
-                                int * inds,
-                                int * ptr,
-                                int * x, int nrows):
-    cdef vector[weighted_int_pair] pairs
+cdef void weighted_int_argsort(weight_t * data,
+                               index_t * inds,
+                               index_t * ptr,
+                               index_t * x, index_t nrows,
+                               weighted_int_pair * pairs,
+                               double * weights,
+                               index_t * out) noexcept nogil:
+    """
+    Argsort of x, ties broken by the largest weight in each row, written
+    to out.  pairs and weights are scratch buffers of length nrows and
+    nrows+1.
+    """
     cdef wptr wptr_ = &weighted_int_low_sort
-    cdef size_t kk
-    
-    cdef int * weights = _max_row_weights(data,
-                                              inds,
-                                              ptr,
-                                            nrows)
-    pairs.resize(nrows)
+    cdef index_t kk
+
+    _max_row_weights(data, inds, ptr, nrows, weights)
     for kk in range(nrows):
         pairs[kk].data = x[kk]
         pairs[kk].idx = kk
         pairs[kk].weight = weights[kk]
-    
-    sort(pairs.begin(),pairs.end(),wptr_)
-    cdef int * out = <int *>PyDataMem_NEW(nrows *sizeof(int))
+
+    sort(pairs, pairs + nrows, wptr_)
     for kk in range(nrows):
         out[kk] = pairs[kk].idx
-    PyDataMem_FREE(weights)
-    return out
-
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-cpdef int[::1] _node_degrees(int[::1] ind, int[::1] ptr,
-        unsigned int num_rows):
-
-    cdef size_t ii, jj
-    cdef int[::1] degree = np.zeros(num_rows, dtype=np.int32)
-
+cdef void _fill_degrees(index_t * ind, index_t * ptr, index_t num_rows,
+                        index_t * degree) noexcept nogil:
+    """
+    Writes the degree of each node, counting self-loops twice, to degree.
+    """
+    cdef index_t ii, jj
     for ii in range(num_rows):
         degree[ii] = ptr[ii + 1] - ptr[ii]
         for jj in range(ptr[ii], ptr[ii + 1]):
@@ -172,194 +255,594 @@ cpdef int[::1] _node_degrees(int[::1] ind, int[::1] ptr,
                 degree[ii] += 1
                 break
 
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cpdef index_t[::1] _node_degrees(index_t[::1] ind, index_t[::1] ptr,
+        size_t num_rows):
+
+    cdef index_t[::1] degree = np.zeros(num_rows, dtype=_index_dtype(ind))
+
+    if num_rows:
+        with nogil:
+            _fill_degrees(&ind[0], &ptr[0], <index_t>num_rows, &degree[0])
+
     return degree
 
 
 
-cdef inline int int_max(int x, int y):
+cdef inline index_t int_max(index_t x, index_t y) noexcept nogil:
     return x ^ ((x ^ y) & -(x < y))
 
+cdef inline double double_max(double x, double y) noexcept nogil:
+    return x if x >= y else y
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def sparse_bandwidth(
-        int[::1] idx,
-        int[::1] ptr,
-        int nrows):
+        index_t[::1] idx,
+        index_t[::1] ptr,
+        int64_t nrows):
     """
     Calculates the max (mb), lower(lb), and upper(ub) bandwidths of a
     csr_matrix.
     """
-    cdef int ldist
-    cdef int lb = -nrows
-    cdef int ub = -nrows
-    cdef int mb = 0
-    cdef size_t ii, jj
-
-    for ii in range(nrows):
-        for jj in range(ptr[ii], ptr[ii + 1]):
-            ldist = ii - idx[jj]
-            lb = int_max(lb, ldist)
-            ub = int_max(ub, -ldist)
-            mb = int_max(mb, ub + lb + 1)
+    cdef index_t ldist
+    cdef index_t lb = -nrows
+    cdef index_t ub = -nrows
+    cdef index_t mb = 0
+    cdef index_t ii, jj
+
+    with nogil:
+        for ii in range(nrows):
+            for jj in range(ptr[ii], ptr[ii + 1]):
+                ldist = ii - idx[jj]
+                lb = int_max(lb, ldist)
+                ub = int_max(ub, -ldist)
+                mb = int_max(mb, ub + lb + 1)
 
     return mb, lb, ub
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def weighted_profile(int[::1] data,
-                    int[::1] idx,
-                    int[::1] ptr,
-                    int nrows):
-    cdef size_t ii, jj, 
-    cdef int temp
-    cdef int weighted_dist = 0
-    cdef int64_t pro = 0
-    for ii in range(nrows):
-        temp = 0
+def weighted_profile(weight_t[::1] data,
+                    index_t[::1] idx,
+                    index_t[::1] ptr,
+                    int64_t nrows):
+    cdef index_t ii, jj
+    cdef double temp
+    cdef double weighted_dist = 0
+    cdef double pro = 0
+    with nogil:
+        for ii in range(nrows):
+            temp = 0
+            for jj in range(ptr[ii], ptr[ii + 1]):
+                if idx[jj] >= ii:
+                    weighted_dist = (idx[jj] - ii)*<double>data[jj]
+                else:
+                    weighted_dist = (ii - idx[jj])*<double>data[jj]
+                temp = double_max(temp, weighted_dist)
+            pro += temp
+    if weight_t is int:
+        return <int64_t>pro
+    else:
+        return pro
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def ordering_metrics(weight_t[::1] data,
+                     index_t[::1] idx,
+                     index_t[::1] ptr,
+                     int64_t nrows,
+                     perm):
+    """
+    Bandwidth, profile, weighted profile and envelope size of a
+    symmetric csr_matrix after permutation by perm, computed in a single
+    pass over the matrix and without forming the permuted matrix.
+
+    Here perm gives the new order of the rows and columns, as for
+    sparse_permute.  The bandwidth is the upper bandwidth returned by
+    sparse_bandwidth, the (weighted) profile is that of weighted_profile,
+    and the envelope size is the number of entries between the first
+    nonzero and the diagonal of each row of the lower triangle.
+
+    If perm is a 2D array, each row is scored as a separate permutation
+    and the four metrics are returned as arrays.  Raises ValueError if
+    a row is not an ordering of range(nrows).
+    """
+    itype = _index_dtype(idx)
+    cdef index_t[:, ::1] perms = np.ascontiguousarray(np.atleast_2d(perm),
+                                                      dtype=itype)
+    cdef size_t num_perms = perms.shape[0]
+    _out = np.zeros((3, num_perms), dtype=np.int64)
+    _wout = np.zeros(num_perms, dtype=float)
+    cdef int64_t[:, ::1] out = _out
+    cdef double[::1] wout = _wout
+    cdef index_t[::1] pos = np.empty(nrows, dtype=itype)
+    cdef size_t kk
+    cdef index_t ii, jj
+    cdef index_t ub, dist, row_max, row_env, pi
+    cdef double row_wmax
+    cdef int64_t pro, env
+    cdef double wpro
+    cdef bint valid = True
+
+    if perms.shape[1] != nrows:
+        raise ValueError('Permutations must have length nrows.')
+
+    with nogil:
+        for kk in range(num_perms):
+            # Invert the permutation, checking that it is one.
+            for ii in range(nrows):
+                pos[ii] = -1
+            for ii in range(nrows):
+                pi = perms[kk, ii]
+                if pi < 0 or pi >= nrows or pos[pi] >= 0:
+                    valid = False
+                    break
+                pos[pi] = ii
+            if not valid:
+                break
+            ub = -nrows
+            pro = 0
+            wpro = 0
+            env = 0
+            for ii in range(nrows):
+                pi = pos[ii]
+                row_max = 0
+                row_wmax = 0
+                row_env = 0
+                for jj in range(ptr[ii], ptr[ii + 1]):
+                    dist = pos[idx[jj]] - pi
+                    ub = int_max(ub, dist)
+                    if dist < 0:
+                        dist = -dist
+                        row_env = int_max(row_env, dist)
+                    row_max = int_max(row_max, dist)
+                    row_wmax = double_max(row_wmax, dist*<double>data[jj])
+                pro += row_max
+                wpro += row_wmax
+                env += row_env
+            out[0, kk] = ub
+            out[1, kk] = pro
+            wout[kk] = wpro
+            out[2, kk] = env
+
+    if not valid:
+        raise ValueError('Permutations must be orderings of range(nrows).')
+    if weight_t is int:
+        wprofile = _wout.astype(np.int64)
+    else:
+        wprofile = _wout
+    if np.ndim(perm) == 1:
+        return int(_out[0, 0]), int(_out[1, 0]), wprofile[0].item(), int(_out[2, 0])
+    return _out[0], _out[1], wprofile, _out[2]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef index_t _level_structure(index_t * ind, index_t * ptr, index_t root,
+                              index_t * queue, index_t * mark, index_t stamp,
+                              index_t * last_start, index_t * size) noexcept nogil:
+    """
+    Rooted level structure of the component containing root, by BFS.
+
+    The nodes are written to queue level by level.  Returns the
+    eccentricity of root, and sets last_start and size so that the
+    last level is queue[last_start:size].
+    """
+    cdef index_t head = 0, tail = 1, level_end = 1, height = 0
+    cdef index_t ii, jj
+    queue[0] = root
+    mark[root] = stamp
+    last_start[0] = 0
+    while head < tail:
+        if head == level_end:
+            height += 1
+            last_start[0] = head
+            level_end = tail
+        ii = queue[head]
+        head += 1
         for jj in range(ptr[ii], ptr[ii + 1]):
-            if idx[jj] >= ii:
-                weighted_dist = (idx[jj] - ii)*data[jj]
-            else:
-                weighted_dist = (ii - idx[jj])*data[jj]
-            temp = int_max(temp, weighted_dist)
-        pro += temp
-    return pro
+            if mark[ind[jj]] != stamp:
+                mark[ind[jj]] = stamp
+                queue[tail] = ind[jj]
+                tail += 1
+    size[0] = tail
+    return height
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef index_t _pseudo_peripheral_node(index_t * ind, index_t * ptr, index_t * degree,
+                                     index_t root, index_t * queue, index_t * mark,
+                                     index_t * stamp) noexcept nogil:
+    """
+    George-Liu pseudo-peripheral node of the component containing root.
+
+    Repeatedly moves to the lowest degree node in the last level of the
+    current level structure, stopping as soon as the eccentricity no
+    longer increases.  queue and mark are scratch arrays of length
+    num_rows, and stamp is incremented once per BFS so that mark never
+    needs to be reset.
+    """
+    cdef index_t last_start, size, kk, node, height, new_height
+    stamp[0] += 1
+    height = _level_structure(ind, ptr, root, queue, mark, stamp[0],
+                              &last_start, &size)
+    while True:
+        node = queue[last_start]
+        for kk in range(last_start + 1, size):
+            if degree[queue[kk]] < degree[node]:
+                node = queue[kk]
+        stamp[0] += 1
+        new_height = _level_structure(ind, ptr, node, queue, mark, stamp[0],
+                                      &last_start, &size)
+        if new_height <= height:
+            return root
+        root = node
+        height = new_height
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def reverse_cuthill_mckee(int[::1] ind, int[::1] ptr, int num_rows):
+def reverse_cuthill_mckee(index_t[::1] ind, index_t[::1] ptr, int64_t num_rows,
+                          bint peripheral=False, OrderingWorkspace workspace=None):
     """
     Reverse Cuthill-McKee ordering of a sparse csr or csc matrix.
+
+    If peripheral is True, the BFS of each connected component is seeded
+    with a pseudo-peripheral node rather than the lowest degree node.
+    If given, the scratch buffers of workspace are used instead of
+    allocating new ones.
     """
-    cdef unsigned int N = 0, N_old, seed, level_start, level_end
-    cdef unsigned int zz, i, j, ii, jj, kk, ll, level_len, temp, temp2
-    cdef cnp.ndarray[int, ndim=1] order = np.zeros(num_rows, dtype=np.int32)
-    cdef int[::1] degree = _node_degrees(ind, ptr, num_rows)
-    cdef int * inds = int_argsort(&degree[0], num_rows)
-    cdef int * rev_inds = int_argsort(inds, num_rows)
-    cdef int * temp_degrees = NULL
-    
+    cdef index_t N = 0, N_old, seed, level_start, level_end
+    cdef index_t zz, i, j, ii, jj, kk, level_len
+    _order = np.zeros(num_rows, dtype=_index_dtype(ind))
+    cdef index_t[::1] order = _order
+    cdef OrderingWorkspace work = _workspace(workspace, num_rows)
+    cdef index_t * degree = <index_t *>work.buffers[_DEGREE]
+    cdef index_t * inds = <index_t *>work.buffers[_INDS]
+    cdef index_t * rev_inds = <index_t *>work.buffers[_REV_INDS]
+    cdef index_t * queue = <index_t *>work.buffers[_QUEUE]
+    cdef index_t * mark = <index_t *>work.buffers[_MARK]
+    cdef int_pair * pairs = work.pairs.data()
+    cdef index_t stamp = 0
+
     cdef cfptr cfptr_ = &int_sort
-    cdef vector[int_pair] pairs
 
-    # loop over zz takes into account possible disconnected graph.
-    for zz in range(num_rows):
-        if inds[zz] != -1:   # Do BFS with seed=inds[zz]
-            seed = inds[zz]
-            order[N] = seed
-            N += 1
-            inds[rev_inds[seed]] = -1
-            level_start = N - 1
-            level_end = N
-
-            while level_start < level_end:
-                for ii in range(level_start, level_end):
-                    i = order[ii]
-                    N_old = N
-
-                    # add unvisited neighbors
-                    for jj in range(ptr[i], ptr[i + 1]):
-                        # j is node number connected to i
-                        j = ind[jj]
-                        if inds[rev_inds[j]] != -1:
-                            inds[rev_inds[j]] = -1
-                            order[N] = j
-                            N += 1
-                    
-                    # Do the low -> high sorting here
-                    pairs.resize((N-N_old))
-                    level_len = 0
-                    for kk in range(N_old, N):
-                        pairs[level_len].data = degree[order[kk]]
-                        pairs[level_len].idx = order[N_old+level_len]
-                        level_len += 1
-                    
-                    sort(pairs.begin(),pairs.end(),cfptr_)
-                    
-                    for kk in range(level_len):
-                        order[N_old+kk] = pairs[kk].idx
-
-                # set next level start and end ranges
-                level_start = level_end
+    if num_rows == 0:
+        return _order
+    with nogil:
+        _fill_degrees(&ind[0], &ptr[0], <index_t>num_rows, degree)
+        int_argsort(degree, <index_t>num_rows, pairs, inds)
+        int_argsort(inds, <index_t>num_rows, pairs, rev_inds)
+        if peripheral:
+            memset(mark, 0, num_rows*sizeof(index_t))
+        # loop over zz takes into account possible disconnected graph.
+        for zz in range(num_rows):
+            if inds[zz] != -1:   # Do BFS with seed=inds[zz]
+                seed = inds[zz]
+                if peripheral:
+                    seed = _pseudo_peripheral_node(&ind[0], &ptr[0], degree,
+                                                   seed, queue, mark, &stamp)
+                order[N] = seed
+                N += 1
+                inds[rev_inds[seed]] = -1
+                level_start = N - 1
                 level_end = N
 
-        if N == num_rows:
-            break
-    PyDataMem_FREE(inds)
-    PyDataMem_FREE(rev_inds)
-    PyDataMem_FREE(temp_degrees)
+                while level_start < level_end:
+                    for ii in range(level_start, level_end):
+                        i = order[ii]
+                        N_old = N
+
+                        # add unvisited neighbors
+                        for jj in range(ptr[i], ptr[i + 1]):
+                            # j is node number connected to i
+                            j = ind[jj]
+                            if inds[rev_inds[j]] != -1:
+                                inds[rev_inds[j]] = -1
+                                order[N] = j
+                                N += 1
+
+                        # Do the low -> high sorting here
+                        level_len = 0
+                        for kk in range(N_old, N):
+                            pairs[level_len].data = degree[order[kk]]
+                            pairs[level_len].idx = order[N_old+level_len]
+                            level_len += 1
+
+                        sort(pairs, pairs + level_len, cfptr_)
+
+                        for kk in range(level_len):
+                            order[N_old+kk] = pairs[kk].idx
+
+                    # set next level start and end ranges
+                    level_start = level_end
+                    level_end = N
+
+            if N == num_rows:
+                break
     # return reversed order for RCM ordering
-    return order[::-1]
+    return _order[::-1]
 
 
 @cython.boundscheck(False)
 @cython.wraparound(False)
-def weighted_reverse_cuthill_mckee(int[::1] data, 
-                                   int[::1] ind, 
-                                   int[::1] ptr, 
-                                   int num_rows):
+def weighted_reverse_cuthill_mckee(weight_t[::1] data,
+                                   index_t[::1] ind, 
+                                   index_t[::1] ptr, 
+                                   int64_t num_rows,
+                                   bint peripheral=False,
+                                   OrderingWorkspace workspace=None):
     """
     Reverse Cuthill-McKee ordering of a sparse csr or csc matrix.
+
+    Ties in degree are broken by the largest weight in each row, low to
+    high when picking seeds, and high to low when ordering the neighbors
+    of a node.  If peripheral is True, the BFS of each connected component
+    is seeded with a pseudo-peripheral node rather than the lowest degree
+    node.  If given, the scratch buffers of workspace are used instead of
+    allocating new ones.
     """
-    cdef unsigned int N = 0, N_old, seed, level_start, level_end
-    cdef unsigned int zz, i, j, ii, jj, kk, ll, level_len, temp, temp2
-    cdef cnp.ndarray[int, ndim=1] order = np.zeros(num_rows, dtype=np.int32)
-    cdef int[::1] degree = _node_degrees(ind, ptr, num_rows)
-    cdef int * inds = weighted_int_argsort(&data[0],
-                                           &ind[0],
-                                           &ptr[0],
-                                           &degree[0], num_rows)
-    cdef int * rev_inds = int_argsort(inds, num_rows)
-    
+    cdef index_t N = 0, N_old, seed, level_start, level_end
+    cdef index_t zz, i, j, ii, jj, kk, level_len
+    _order = np.zeros(num_rows, dtype=_index_dtype(ind))
+    cdef index_t[::1] order = _order
+    cdef OrderingWorkspace work = _workspace(workspace, num_rows)
+    cdef index_t * degree = <index_t *>work.buffers[_DEGREE]
+    cdef index_t * inds = <index_t *>work.buffers[_INDS]
+    cdef index_t * rev_inds = <index_t *>work.buffers[_REV_INDS]
+    cdef index_t * queue = <index_t *>work.buffers[_QUEUE]
+    cdef index_t * mark = <index_t *>work.buffers[_MARK]
+    cdef weighted_int_pair * pairs = work.wpairs.data()
+    cdef double * row_weights = work.weights
+    cdef index_t stamp = 0
+
     cdef wptr wptr_ = &weighted_int_high_sort
-    cdef vector[weighted_int_pair] pairs
 
-    # loop over zz takes into account possible disconnected graph.
-    for zz in range(num_rows):
-        if inds[zz] != -1:   # Do BFS with seed=inds[zz]
-            seed = inds[zz]
-            order[N] = seed
-            N += 1
-            inds[rev_inds[seed]] = -1
-            level_start = N - 1
-            level_end = N
-
-            while level_start < level_end:
-                for ii in range(level_start, level_end):
-                    i = order[ii]
-                    N_old = N
-
-                    # add unvisited neighbors
-                    for jj in range(ptr[i], ptr[i + 1]):
-                        # j is node number connected to i
-                        j = ind[jj]
-                        if inds[rev_inds[j]] != -1:
-                            inds[rev_inds[j]] = -1
-                            order[N] = j
-                            N += 1
-
-                    # Do the low -> high sorting here
-                    pairs.resize((N-N_old))
-                    level_len = 0
-                    for kk in range(N_old, N):
-                        pairs[level_len].data = degree[order[kk]]
-                        pairs[level_len].idx = order[N_old+level_len]
-                        pairs[level_len].weight = data[order[kk]]
-                        level_len += 1
-                    
-                    sort(pairs.begin(),pairs.end(),wptr_)
-                    for kk in range(level_len):
-                        order[N_old+kk] = pairs[kk].idx
-
-                # set next level start and end ranges
-                level_start = level_end
+    if num_rows == 0:
+        return _order
+    with nogil:
+        _fill_degrees(&ind[0], &ptr[0], <index_t>num_rows, degree)
+        weighted_int_argsort(&data[0], &ind[0], &ptr[0], degree,
+                             <index_t>num_rows, pairs, work.weights, inds)
+        int_argsort(inds, <index_t>num_rows, work.pairs.data(), rev_inds)
+        if peripheral:
+            memset(mark, 0, num_rows*sizeof(index_t))
+        # loop over zz takes into account possible disconnected graph.
+        for zz in range(num_rows):
+            if inds[zz] != -1:   # Do BFS with seed=inds[zz]
+                seed = inds[zz]
+                if peripheral:
+                    seed = _pseudo_peripheral_node(&ind[0], &ptr[0], degree,
+                                                   seed, queue, mark, &stamp)
+                order[N] = seed
+                N += 1
+                inds[rev_inds[seed]] = -1
+                level_start = N - 1
                 level_end = N
 
+                while level_start < level_end:
+                    for ii in range(level_start, level_end):
+                        i = order[ii]
+                        N_old = N
+
+                        # add unvisited neighbors
+                        for jj in range(ptr[i], ptr[i + 1]):
+                            # j is node number connected to i
+                            j = ind[jj]
+                            if inds[rev_inds[j]] != -1:
+                                inds[rev_inds[j]] = -1
+                                order[N] = j
+                                N += 1
+
+                        # Do the low -> high sorting here
+                        level_len = 0
+                        for kk in range(N_old, N):
+                            pairs[level_len].data = degree[order[kk]]
+                            pairs[level_len].idx = order[N_old+level_len]
+                            pairs[level_len].weight = row_weights[order[kk]]
+                            level_len += 1
+
+                        sort(pairs, pairs + level_len, wptr_)
+                        for kk in range(level_len):
+                            order[N_old+kk] = pairs[kk].idx
+
+                    # set next level start and end ranges
+                    level_start = level_end
+                    level_end = N
+
+            if N == num_rows:
+                break
+    # return reversed order for RCM ordering
+    return _order[::-1]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _counting_argsort(index_t * keys, index_t * perm, index_t nrows,
+                            index_t max_key, index_t * out) noexcept nogil:
+    """
+    Stable counting sort of the nodes in perm by keys[node],
+    where 0 <= keys[node] <= max_key.  The sorted nodes are written to out.
+    """
+    cdef index_t * count = <index_t *>PyDataMem_NEW_ZEROED(max_key+2, sizeof(index_t))
+    cdef index_t kk
+    for kk in range(nrows):
+        count[keys[perm[kk]]+1] += 1
+    for kk in range(max_key+1):
+        count[kk+1] += count[kk]
+    for kk in range(nrows):
+        out[count[keys[perm[kk]]]] = perm[kk]
+        count[keys[perm[kk]]] += 1
+    PyDataMem_FREE(count)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _bucket_cuthill_mckee(index_t * ind, index_t * ptr, index_t num_rows,
+                                index_t * seeds, index_t * children,
+                                index_t * sorted_ind, char * visited,
+                                index_t * order) noexcept nogil:
+    """
+    Cuthill-McKee BFS, without sorting of the BFS levels.
+
+    Seeds are tried in the order given by seeds.  Each adjacency list
+    is first rewritten in the order given by children, after which the
+    BFS discovers the neighbors of every node already sorted.
+    """
+    cdef index_t * fill = <index_t *>PyDataMem_NEW(num_rows*sizeof(index_t))
+    cdef index_t N = 0, head, zz, ii, jj, kk, seed
+
+    for ii in range(num_rows):
+        fill[ii] = ptr[ii]
+    for kk in range(num_rows):
+        ii = children[kk]
+        for jj in range(ptr[ii], ptr[ii+1]):
+            sorted_ind[fill[ind[jj]]] = ii
+            fill[ind[jj]] += 1
+    PyDataMem_FREE(fill)
+
+    for zz in range(num_rows):
+        seed = seeds[zz]
+        if visited[seed]:
+            continue
+        visited[seed] = 1
+        order[N] = seed
+        head = N
+        N += 1
+        while head < N:
+            ii = order[head]
+            head += 1
+            for jj in range(ptr[ii], ptr[ii+1]):
+                kk = sorted_ind[jj]
+                if not visited[kk]:
+                    visited[kk] = 1
+                    order[N] = kk
+                    N += 1
         if N == num_rows:
             break
-    PyDataMem_FREE(inds)
-    PyDataMem_FREE(rev_inds)
+
+
+def _seed_order(seeds, num_rows, itype):
+    # Seed order buffer, holding the user supplied seeds if any.
+    if seeds is None:
+        return np.empty(num_rows, dtype=itype)
+    # The BFS indexes by the seeds without bounds checks, so they must be
+    # a permutation.  They are checked before the cast, which could wrap them.
+    seeds = np.asarray(seeds)
+    if seeds.ndim != 1 or seeds.shape[0] != num_rows or num_rows and (
+            seeds.min() < 0 or seeds.max() >= num_rows or
+            np.count_nonzero(np.bincount(seeds, minlength=num_rows)) != num_rows):
+        raise ValueError('Seeds must be an ordering of all nodes.')
+    return np.ascontiguousarray(seeds, dtype=itype)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def bucket_reverse_cuthill_mckee(index_t[::1] ind, index_t[::1] ptr, int64_t num_rows,
+                                 seeds=None):
+    """
+    Reverse Cuthill-McKee ordering of a sparse csr or csc matrix in
+    O(num_rows + nnz) time, using counting sorts on the node degrees.
+
+    If given, seeds is an ordering of all nodes from which the BFS seeds
+    are taken, in place of the lowest degree first order.  Raises
+    ValueError if seeds is not an ordering of range(num_rows).
+    """
+    itype = _index_dtype(ind)
+    _order = np.zeros(num_rows, dtype=itype)
+    cdef index_t[::1] order = _order
+    cdef index_t[::1] degree = _node_degrees(ind, ptr, num_rows)
+    cdef index_t[::1] nodes = np.arange(num_rows, dtype=itype)
+    cdef index_t[::1] children = np.empty(num_rows, dtype=itype)
+    cdef index_t[::1] _seeds = _seed_order(seeds, num_rows, itype)
+    cdef bint has_seeds = seeds is not None
+    cdef index_t[::1] sorted_ind = np.empty(ind.shape[0], dtype=itype)
+    cdef char[::1] visited = np.zeros(num_rows, dtype=np.int8)
+    cdef index_t max_degree = np.max(degree) if num_rows else 0
+
+    if num_rows == 0:
+        return _order
+    with nogil:
+        _counting_argsort(&degree[0], &nodes[0], <index_t>num_rows, max_degree,
+                          &children[0])
+        _bucket_cuthill_mckee(&ind[0], &ptr[0], <index_t>num_rows,
+                              &_seeds[0] if has_seeds else &children[0],
+                              &children[0],
+                              &sorted_ind[0], &visited[0], &order[0])
+    # return reversed order for RCM ordering
+    return _order[::-1]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def weighted_bucket_reverse_cuthill_mckee(weight_t[::1] data,
+                                          index_t[::1] ind,
+                                          index_t[::1] ptr,
+                                          int64_t num_rows,
+                                          seeds=None):
+    """
+    Weighted reverse Cuthill-McKee ordering of a sparse csr or csc matrix
+    in O(num_rows + nnz + max(data)) time, using counting sorts.
+
+    Ties in degree are broken by the largest weight in each row, low to
+    high when picking seeds, and high to low when ordering the neighbors
+    of a node.  If given, seeds is an ordering of all nodes from which
+    the BFS seeds are taken instead, and ValueError is raised if it is
+    not an ordering of range(num_rows).  Float weights are first replaced
+    by their rank, at O(num_rows log num_rows) cost.
+    """
+    itype = _index_dtype(ind)
+    _order = np.zeros(num_rows, dtype=itype)
+    cdef index_t[::1] order = _order
+    cdef index_t[::1] degree = _node_degrees(ind, ptr, num_rows)
+    cdef index_t[::1] nodes = np.arange(num_rows, dtype=itype)
+    cdef weight_t[::1] row_weights = np.zeros(num_rows, dtype=np.asarray(data).dtype)
+    cdef index_t[::1] weights
+    cdef index_t[::1] rev_weights = np.empty(num_rows, dtype=itype)
+    cdef index_t[::1] temp = np.empty(num_rows, dtype=itype)
+    cdef index_t[::1] _seeds = _seed_order(seeds, num_rows, itype)
+    cdef bint has_seeds = seeds is not None
+    cdef index_t[::1] children = np.empty(num_rows, dtype=itype)
+    cdef index_t[::1] sorted_ind = np.empty(ind.shape[0], dtype=itype)
+    cdef char[::1] visited = np.zeros(num_rows, dtype=np.int8)
+    cdef index_t max_degree = np.max(degree) if num_rows else 0
+    cdef index_t max_weight = 0
+    cdef index_t ii, jj
+
+    if num_rows == 0:
+        return _order
+    with nogil:
+        for ii in range(num_rows):
+            for jj in range(ptr[ii], ptr[ii+1]):
+                if data[jj] > row_weights[ii]:
+                    row_weights[ii] = data[jj]
+    if weight_t is int:
+        weights = np.asarray(row_weights).astype(itype)
+    else:
+        weights = np.unique(row_weights, return_inverse=True)[1].astype(itype)
+    with nogil:
+        for ii in range(num_rows):
+            max_weight = int_max(max_weight, weights[ii])
+        for ii in range(num_rows):
+            rev_weights[ii] = max_weight - weights[ii]
+        # Radix sorts: by weight first, then stably by degree.
+        if not has_seeds:
+            _counting_argsort(&weights[0], &nodes[0], <index_t>num_rows, max_weight,
+                              &temp[0])
+            _counting_argsort(&degree[0], &temp[0], <index_t>num_rows, max_degree,
+                              &_seeds[0])
+        _counting_argsort(&rev_weights[0], &nodes[0], <index_t>num_rows, max_weight,
+                          &temp[0])
+        _counting_argsort(&degree[0], &temp[0], <index_t>num_rows, max_degree,
+                          &children[0])
+        _bucket_cuthill_mckee(&ind[0], &ptr[0], <index_t>num_rows,
+                              &_seeds[0], &children[0],
+                              &sorted_ind[0], &visited[0], &order[0])
     # return reversed order for RCM ordering
-    return order[::-1]
+    return _order[::-1]
@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+#cython: language_level = 3
+#distutils: language = c++
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Multilevel graph coarsening kernels"""
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.stdint cimport int64_t
+cnp.import_array()
+
+# Index types of the CSR index and pointer arrays
+ctypedef fused index_t:
+    int
+    int64_t
+
+# Types of the CSR data (edge weights)
+ctypedef fused weight_t:
+    int
+    double
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def heavy_edge_matching(weight_t[::1] data,
+                        index_t[::1] ind,
+                        index_t[::1] ptr,
+                        int64_t num_rows,
+                        int64_t[::1] vwgt,
+                        index_t[::1] visit,
+                        int64_t max_vwgt):
+    """
+    Heavy edge matching of a symmetric csr_matrix.
+
+    Nodes are visited in the order given by visit, and each unmatched
+    node is matched with the unmatched neighbor joined by the heaviest
+    edge, provided their combined node weight is at most max_vwgt.
+
+    Returns:
+        tuple: coarse node of each node, number of coarse nodes
+    """
+    _cmap = np.full(num_rows, -1, dtype=np.asarray(ind).dtype)
+    cdef index_t[::1] cmap = _cmap
+    cdef index_t kk, jj, node, other, best
+    cdef index_t num_coarse = 0
+    cdef double best_weight
+
+    with nogil:
+        for kk in range(num_rows):
+            node = visit[kk]
+            if cmap[node] != -1:
+                continue
+            best = -1
+            best_weight = -1
+            for jj in range(ptr[node], ptr[node + 1]):
+                other = ind[jj]
+                if (other != node and cmap[other] == -1
+                        and data[jj] > best_weight
+                        and vwgt[node] + vwgt[other] <= max_vwgt):
+                    best = other
+                    best_weight = data[jj]
+            cmap[node] = num_coarse
+            if best != -1:
+                cmap[best] = num_coarse
+            num_coarse += 1
+
+    return _cmap, num_coarse
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def contract_graph(weight_t[::1] data,
+                   index_t[::1] ind,
+                   index_t[::1] ptr,
+                   int64_t num_rows,
+                   int64_t[::1] vwgt,
+                   index_t[::1] cmap,
+                   int64_t num_coarse):
+    """
+    Contracts a symmetric csr_matrix by merging the nodes mapped to the
+    same coarse node by cmap.
+
+    Parallel edges are summed into a single edge and edges inside a
+    coarse node are dropped.  The column indices of the coarse graph
+    are not sorted.
+
+    Returns:
+        tuple: data, ind, ptr of the coarse graph, coarse node weights
+    """
+    itype = np.asarray(ind).dtype
+    cdef index_t[::1] members = np.empty(num_rows, dtype=itype)
+    cdef index_t[::1] start = np.zeros(num_coarse+1, dtype=itype)
+    cdef index_t[::1] mark = np.full(num_coarse, -1, dtype=itype)
+    cdef index_t[::1] slot = np.empty(num_coarse, dtype=itype)
+    _cdata = np.empty(ind.shape[0], dtype=np.asarray(data).dtype)
+    _cind = np.empty(ind.shape[0], dtype=itype)
+    _cptr = np.zeros(num_coarse+1, dtype=itype)
+    _cvwgt = np.zeros(num_coarse, dtype=np.int64)
+    cdef weight_t[::1] cdata = _cdata
+    cdef index_t[::1] cind = _cind
+    cdef index_t[::1] cptr = _cptr
+    cdef int64_t[::1] cvwgt = _cvwgt
+    cdef index_t ii, jj, kk, cc, other, nnz = 0
+
+    with nogil:
+        # Group the nodes of each coarse node by a counting sort.
+        for ii in range(num_rows):
+            start[cmap[ii] + 1] += 1
+            cvwgt[cmap[ii]] += vwgt[ii]
+        for cc in range(num_coarse):
+            start[cc + 1] += start[cc]
+        for ii in range(num_rows):
+            members[start[cmap[ii]]] = ii
+            start[cmap[ii]] += 1
+        for cc in range(num_coarse, 0, -1):
+            start[cc] = start[cc - 1]
+        start[0] = 0
+
+        for cc in range(num_coarse):
+            for kk in range(start[cc], start[cc + 1]):
+                ii = members[kk]
+                for jj in range(ptr[ii], ptr[ii + 1]):
+                    other = cmap[ind[jj]]
+                    if other == cc:
+                        continue
+                    if mark[other] == cc:
+                        cdata[slot[other]] += data[jj]
+                    else:
+                        mark[other] = cc
+                        slot[other] = nnz
+                        cind[nnz] = other
+                        cdata[nnz] = data[jj]
+                        nnz += 1
+            cptr[cc + 1] = nnz
+
+    return _cdata[:nnz].copy(), _cind[:nnz].copy(), _cptr, _cvwgt
+
@@ -19,83 +19,158 @@
 import numpy as np
 cimport numpy as cnp
 cimport cython
+from libc.stdint cimport int64_t
 cnp.import_array()
 
+# Index types of the CSR index and pointer arrays
+ctypedef fused index_t:
+    int
+    int64_t
+
 @cython.boundscheck(False)
 @cython.wraparound(False)
 def sparse_permute(
         cnp.ndarray[cython.numeric, ndim=1] data,
-        int[::1] idx,
-        int[::1] ptr,
-        int nrows,
-        int ncols,
-        cnp.ndarray[int, ndim=1] rperm,
-        cnp.ndarray[int, ndim=1] cperm,
+        index_t[::1] idx,
+        index_t[::1] ptr,
+        int64_t nrows,
+        int64_t ncols,
+        rperm,
+        cperm,
         int flag):
     """
     Permutes the rows and columns of a sparse CSR or CSC matrix according to
     the permutation arrays rperm and cperm, respectively.
     Here, the permutation arrays specify the new order of the rows and columns.
     i.e. [0,1,2,3,4] -> [3,0,4,1,2].
+
+    The index arrays may be int32 or int64, and the output index arrays
+    have the same type.
     """
-    cdef size_t ii, jj, kk, k0, nnz
+    itype = np.asarray(idx).dtype
     cdef cnp.ndarray[cython.numeric] new_data = np.zeros_like(data)
-    cdef cnp.ndarray[int] new_idx = np.zeros_like(idx)
-    cdef cnp.ndarray[int] new_ptr = np.zeros_like(ptr)
-    cdef cnp.ndarray[int] perm_r
-    cdef cnp.ndarray[int] perm_c
-    cdef cnp.ndarray[int] inds
+    new_idx = np.zeros_like(np.asarray(idx))
+    new_ptr = np.zeros_like(np.asarray(ptr))
+    cdef int64_t nmajor
 
     if flag == 0:  # CSR matrix
-        if rperm.shape[0] != 0:
-            inds = np.argsort(rperm).astype(np.int32)
-            perm_r = np.arange(rperm.shape[0], dtype=np.int32)[inds]
-
-            for jj in range(nrows):
-                ii = perm_r[jj]
-                new_ptr[ii + 1] = ptr[jj + 1] - ptr[jj]
-
-            for jj in range(nrows):
-                new_ptr[jj + 1] = new_ptr[jj+1] + new_ptr[jj]
-
-            for jj in range(nrows):
-                k0 = new_ptr[perm_r[jj]]
-                for kk in range(ptr[jj], ptr[jj + 1]):
-                    new_idx[k0] = idx[kk]
-                    new_data[k0] = data[kk]
-                    k0 = k0 + 1
-
-        if cperm.shape[0] != 0:
-            inds = np.argsort(cperm).astype(np.int32)
-            perm_c = np.arange(cperm.shape[0], dtype=np.int32)[inds]
-            nnz = new_ptr[new_ptr.shape[0] - 1]
-            for jj in range(nnz):
-                new_idx[jj] = perm_c[new_idx[jj]]
-
+        major_perm, minor_perm, nmajor = rperm, cperm, nrows
     elif flag == 1:  # CSC matrix
-        if cperm.shape[0] != 0:
-            inds = np.argsort(cperm).astype(np.int32)
-            perm_c = np.arange(cperm.shape[0], dtype=np.int32)[inds]
-
-            for jj in range(ncols):
-                ii = perm_c[jj]
-                new_ptr[ii + 1] = ptr[jj + 1] - ptr[jj]
-
-            for jj in range(ncols):
-                new_ptr[jj + 1] = new_ptr[jj + 1] + new_ptr[jj]
-
-            for jj in range(ncols):
-                k0 = new_ptr[perm_c[jj]]
-                for kk in range(ptr[jj], ptr[jj + 1]):
-                    new_idx[k0] = idx[kk]
-                    new_data[k0] = data[kk]
-                    k0 = k0 + 1
-
-        if rperm.shape[0] != 0:
-            inds = np.argsort(rperm).astype(np.int32)
-            perm_r = np.arange(rperm.shape[0], dtype=np.int32)[inds]
-            nnz = new_ptr[new_ptr.shape[0] - 1]
-            for jj in range(nnz):
-                new_idx[jj] = perm_r[new_idx[jj]]
+        major_perm, minor_perm, nmajor = cperm, rperm, ncols
+    else:
+        return new_data, new_idx, new_ptr
+
+    cdef cython.numeric[::1] data_view = data
+    cdef cython.numeric[::1] new_data_view = new_data
+    cdef index_t[::1] new_idx_view = new_idx
+    cdef index_t[::1] new_ptr_view = new_ptr
+    cdef index_t[::1] perm
+
+    if len(major_perm) != 0:
+        perm = np.argsort(major_perm).astype(itype)
+        with nogil:
+            _permute_major(data_view, idx, ptr, nmajor, perm,
+                           new_data_view, new_idx_view, new_ptr_view)
+
+    if len(minor_perm) != 0:
+        perm = np.argsort(minor_perm).astype(itype)
+        with nogil:
+            _permute_minor(new_idx_view, perm, new_ptr_view[nmajor])
 
     return new_data, new_idx, new_ptr
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _permute_major(cython.numeric[::1] data,
+                         index_t[::1] idx,
+                         index_t[::1] ptr,
+                         int64_t nmajor,
+                         index_t[::1] perm,
+                         cython.numeric[::1] new_data,
+                         index_t[::1] new_idx,
+                         index_t[::1] new_ptr) noexcept nogil:
+    """
+    Moves the rows (CSR) or columns (CSC) of a matrix to
+    the positions given by the inverse permutation perm.
+    """
+    cdef size_t jj, kk, k0
+
+    for jj in range(nmajor):
+        new_ptr[perm[jj] + 1] = ptr[jj + 1] - ptr[jj]
+
+    for jj in range(nmajor):
+        new_ptr[jj + 1] = new_ptr[jj + 1] + new_ptr[jj]
+
+    for jj in range(nmajor):
+        k0 = new_ptr[perm[jj]]
+        for kk in range(ptr[jj], ptr[jj + 1]):
+            new_idx[k0] = idx[kk]
+            new_data[k0] = data[kk]
+            k0 = k0 + 1
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef void _permute_minor(index_t[::1] new_idx,
+                         index_t[::1] perm,
+                         index_t nnz) noexcept nogil:
+    """
+    Relabels the column (CSR) or row (CSC) indices of a matrix
+    according to the inverse permutation perm.
+    """
+    cdef size_t jj
+    for jj in range(nnz):
+        new_idx[jj] = perm[new_idx[jj]]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def adjacent_swaps(int64_t[::1] perm0, int64_t[::1] perm1):
+    """
+    Number of swaps of neighboring positions that turn the ordering
+    perm0 into perm1, i.e. the number of pairs of nodes whose relative
+    order differs.  Counted by merge sort in O(n log n).
+    """
+    cdef int64_t n = perm0.shape[0]
+    cdef int64_t kk, width, lo, mid, hi, ii, jj, out
+    cdef int64_t swaps = 0
+    cdef cnp.ndarray[int64_t, ndim=1] pos = np.empty(n, dtype=np.int64)
+    cdef int64_t[::1] seq = np.empty(n, dtype=np.int64)
+    cdef int64_t[::1] tmp = np.empty(n, dtype=np.int64)
+    if perm1.shape[0] != n:
+        raise ValueError('Permutations must have the same length.')
+    for kk in range(n):
+        pos[perm1[kk]] = kk
+    # Position in perm1 of each node in the order of perm0
+    for kk in range(n):
+        seq[kk] = pos[perm0[kk]]
+
+    width = 1
+    while width < n:
+        lo = 0
+        while lo < n:
+            mid = min(lo + width, n)
+            hi = min(lo + 2*width, n)
+            ii, jj, out = lo, mid, lo
+            while ii < mid and jj < hi:
+                if seq[jj] < seq[ii]:
+                    swaps += mid - ii
+                    tmp[out] = seq[jj]
+                    jj += 1
+                else:
+                    tmp[out] = seq[ii]
+                    ii += 1
+                out += 1
+            while ii < mid:
+                tmp[out] = seq[ii]
+                ii += 1
+                out += 1
+            while jj < hi:
+                tmp[out] = seq[jj]
+                jj += 1
+                out += 1
+            lo = hi
+        seq, tmp = tmp, seq
+        width *= 2
+    return swaps
@@ -0,0 +1,230 @@
+# -*- coding: utf-8 -*-
+#cython: language_level = 3
+#distutils: language = c++
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Local search refinement of orderings"""
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.stdint cimport int64_t
+from .clock cimport monotonic_seconds
+cnp.import_array()
+
+# Index types of the CSR index and pointer arrays
+ctypedef fused index_t:
+    int
+    int64_t
+
+# Types of the CSR data (edge weights)
+ctypedef fused weight_t:
+    int
+    double
+
+# Returned by _swap_delta for moves that would increase the bandwidth
+cdef double INVALID_MOVE = 1
+
+
+cdef inline index_t int_abs(index_t x) noexcept nogil:
+    return x if x >= 0 else -x
+
+
+cdef inline index_t _new_pos(index_t node, index_t u, index_t v, index_t pu,
+                             index_t * pos) noexcept nogil:
+    # Position of node after swapping u (at pu) and v (at pu+1).
+    if node == u:
+        return pu + 1
+    if node == v:
+        return pu
+    return pos[node]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double _row_max(weight_t * data, index_t * ind, index_t * ptr, index_t row,
+                     index_t u, index_t v, index_t pu, index_t * pos) noexcept nogil:
+    # Weighted row extent after swapping u and v.
+    cdef index_t jj, prow = _new_pos(row, u, v, pu, pos)
+    cdef double out = 0, term
+    for jj in range(ptr[row], ptr[row + 1]):
+        term = int_abs(_new_pos(ind[jj], u, v, pu, pos) - prow)*<double>data[jj]
+        if term > out:
+            out = term
+    return out
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+cdef double _swap_delta(weight_t * data, index_t * ind, index_t * ptr,
+                        index_t u, index_t v, index_t pu, index_t bandwidth,
+                        index_t * pos, double * row_max,
+                        index_t * mark, index_t stamp, index_t * slot,
+                        index_t * touched, double * new_max, char * full,
+                        index_t * num_touched) noexcept nogil:
+    """
+    Change in the weighted profile from swapping the adjacent nodes u and
+    v, where u is at position pu.  Only rows u, v and their neighbors
+    are visited, and the row of a neighbor is rescanned only if its
+    current maximum came from u or v.  The new row maxima are left in
+    touched / new_max so that an accepted move can be committed.
+    Returns INVALID_MOVE if the swap would increase the bandwidth.
+    """
+    cdef index_t kk, jj, node, pnew, ss, endpoint
+    cdef double term_old, term_new, delta = 0
+    num_touched[0] = 0
+
+    for endpoint in range(2):
+        node = u if endpoint == 0 else v
+        pnew = pu + 1 if endpoint == 0 else pu
+        for jj in range(ptr[node], ptr[node + 1]):
+            kk = ind[jj]
+            if kk == u or kk == v:
+                continue
+            if int_abs(pos[kk] - pnew) > bandwidth:
+                return INVALID_MOVE
+            term_old = int_abs(pos[kk] - pos[node])*<double>data[jj]
+            term_new = int_abs(pos[kk] - pnew)*<double>data[jj]
+            if mark[kk] != stamp:
+                mark[kk] = stamp
+                ss = num_touched[0]
+                num_touched[0] += 1
+                slot[kk] = ss
+                touched[ss] = kk
+                new_max[ss] = row_max[kk]
+                full[ss] = 0
+            ss = slot[kk]
+            if term_new > new_max[ss]:
+                new_max[ss] = term_new
+            if term_old == row_max[kk]:
+                full[ss] = 1
+
+    for ss in range(num_touched[0]):
+        if full[ss]:
+            new_max[ss] = _row_max(data, ind, ptr, touched[ss], u, v, pu, pos)
+        delta += new_max[ss] - row_max[touched[ss]]
+
+    for endpoint in range(2):
+        node = u if endpoint == 0 else v
+        ss = num_touched[0]
+        num_touched[0] += 1
+        touched[ss] = node
+        new_max[ss] = _row_max(data, ind, ptr, node, u, v, pu, pos)
+        delta += new_max[ss] - row_max[node]
+
+    return delta
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def refine_ordering(weight_t[::1] data,
+                    index_t[::1] ind,
+                    index_t[::1] ptr,
+                    int64_t num_rows,
+                    perm,
+                    int max_passes=10,
+                    double max_time=0):
+    """
+    Refines an ordering of a symmetric csr_matrix by adjacent-swap local
+    search on the weighted profile.
+
+    Each pass sweeps over the ordering and swaps neighboring nodes
+    whenever that lowers the weighted profile without increasing the
+    bandwidth.  The change from each move is evaluated from the rows of
+    the two nodes and their neighbors only.  The search stops after a
+    pass with no improvement, after max_passes passes, or once
+    max_time seconds (if > 0) of wall-clock time have elapsed.
+
+    Here perm gives the new order of the rows and columns, as for
+    sparse_permute.  Raises ValueError if perm is not an ordering of
+    range(num_rows).
+    The index arrays may be int32 or int64, and the data int32 or
+    float64.
+
+    Returns:
+        tuple: refined permutation, number of swaps made, and whether
+               the time budget ran out
+    """
+    itype = np.int64 if np.asarray(ind).dtype == np.int64 else np.int32
+    _order = np.array(perm, dtype=itype)
+    cdef index_t[::1] order = _order
+    cdef index_t[::1] pos = np.empty(num_rows, dtype=itype)
+    cdef double[::1] row_max = np.zeros(num_rows, dtype=float)
+    cdef index_t[::1] mark = np.zeros(num_rows, dtype=itype)
+    cdef index_t[::1] slot = np.zeros(num_rows, dtype=itype)
+    cdef index_t[::1] touched = np.zeros(num_rows+2, dtype=itype)
+    cdef double[::1] new_max = np.zeros(num_rows+2, dtype=float)
+    cdef char[::1] full = np.zeros(num_rows+2, dtype=np.int8)
+    cdef index_t ii, jj, pp, npass, u, v, num_touched, term
+    cdef index_t bandwidth = 0, stamp = 0, improved
+    cdef size_t swaps = 0
+    cdef double delta
+    cdef double stop = monotonic_seconds() + max_time
+    cdef bint timed_out = 0
+    cdef bint valid = True
+
+    if _order.shape[0] != num_rows:
+        raise ValueError('Permutation must have length num_rows.')
+    with nogil:
+        # Invert the permutation, checking that it is one.
+        for ii in range(num_rows):
+            pos[ii] = -1
+        for ii in range(num_rows):
+            u = order[ii]
+            if u < 0 or u >= num_rows or pos[u] >= 0:
+                valid = False
+                break
+            pos[u] = ii
+    if not valid:
+        raise ValueError('Permutation must be an ordering of range(num_rows).')
+    if num_rows < 2:
+        return _order, 0, False
+
+    with nogil:
+        for ii in range(num_rows):
+            for jj in range(ptr[ii], ptr[ii + 1]):
+                term = int_abs(pos[ind[jj]] - pos[ii])
+                if term > bandwidth:
+                    bandwidth = term
+                if term*<double>data[jj] > row_max[ii]:
+                    row_max[ii] = term*<double>data[jj]
+
+        for npass in range(max_passes):
+            improved = 0
+            for pp in range(num_rows - 1):
+                if max_time > 0 and (pp & 1023) == 0 and monotonic_seconds() > stop:
+                    timed_out = 1
+                    break
+                u = order[pp]
+                v = order[pp + 1]
+                stamp += 1
+                delta = _swap_delta(&data[0], &ind[0], &ptr[0],
+                                    u, v, pp, bandwidth,
+                                    &pos[0], &row_max[0],
+                                    &mark[0], stamp, &slot[0],
+                                    &touched[0], &new_max[0], &full[0],
+                                    &num_touched)
+                if delta < 0:
+                    order[pp] = v
+                    order[pp + 1] = u
+                    pos[u] = pp + 1
+                    pos[v] = pp
+                    for ii in range(num_touched):
+                        row_max[touched[ii]] = new_max[ii]
+                    swaps += 1
+                    improved = 1
+            if timed_out or not improved:
+                break
+
+    return _order, swaps, bool(timed_out)
@@ -0,0 +1,74 @@
+# -*- coding: utf-8 -*-
+#cython: language_level = 3
+#distutils: language = c++
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Sparse matrix binning routines"""
+
+import numpy as np
+cimport numpy as cnp
+cimport cython
+from libc.stdint cimport int64_t
+cnp.import_array()
+
+
+ctypedef fused index_t:
+    int
+    int64_t
+
+
+ctypedef fused weight_t:
+    int
+    double
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def binned_max(weight_t[::1] data, index_t[::1] ind, index_t[::1] ptr,
+               int64_t row_start, int64_t row_stop,
+               int64_t col_start, int64_t col_stop,
+               int64_t row_bin, int64_t col_bin):
+    """
+    Bins the block of a CSR matrix with rows row_start to row_stop-1 and
+    columns col_start to col_stop-1 into row_bin x col_bin blocks, and
+    returns the largest weight in each block as a 2D float64 array.
+    Blocks without elements are NaN.
+
+    Only the rows of the block are visited, so the cost is
+    O(nnz of those rows + number of blocks).
+    """
+    if row_bin < 1 or col_bin < 1:
+        raise ValueError('Bin sizes must be positive.')
+    if row_start < row_stop and (row_start < 0 or row_stop > ptr.shape[0] - 1):
+        raise ValueError('Rows row_start to row_stop-1 must exist.')
+    cdef int64_t height = (row_stop - row_start + row_bin - 1) // row_bin
+    cdef int64_t width = (col_stop - col_start + col_bin - 1) // col_bin
+    _image = np.full((max(height, 0), max(width, 0)), np.nan)
+    cdef double[:, ::1] image = _image
+    cdef int64_t ii, jj, col, pixel_row, pixel_col
+    cdef double value
+
+    with nogil:
+        for ii in range(row_start, row_stop):
+            pixel_row = (ii - row_start) // row_bin
+            for jj in range(ptr[ii], ptr[ii+1]):
+                col = ind[jj]
+                if col < col_start or col >= col_stop:
+                    continue
+                pixel_col = (col - col_start) // col_bin
+                value = data[jj]
+                # NaN marks a block without elements so far.
+                if not value <= image[pixel_row, pixel_col]:
+                    image[pixel_row, pixel_col] = value
+    return _image
@@ -15,8 +15,10 @@
 """Module for constructing backend widgets.
 """
 
+import numpy as np
 import ipywidgets as wid
 from ..visualization import iplot_gate_map
+from ..visualization.backend_properties import properties_table
 from .provider_buttons import provider_buttons
 
 def make_backend_widget(backend_item):
@@ -34,7 +36,7 @@ def make_backend_widget(backend_item):
 
     status = backend.status()
     config = backend.configuration()
-    props = backend.properties().to_dict()
+    table = properties_table(backend)
 
     name_str = "<font size='5' face='monospace'>%s</font>"
     backend_name = wid.HTML(value=name_str % backend.name())
@@ -120,29 +122,16 @@ def make_backend_widget(backend_item):
                   )
 
     # Get basic device stats
-    t1_units = props['qubits'][0][0]['unit']
-    avg_t1 = round(sum([q[0]['value'] for q in props['qubits']])/n_qubits, 1)
-    avg_t2 = round(sum([q[1]['value'] for q in props['qubits']])/n_qubits, 1)
+    t1_units = table.units['T1']
+    avg_t1 = round(float(np.nanmean(table.t1)), 1)
+    avg_t2 = round(float(np.nanmean(table.t2)), 1)
 
     if n_qubits != 1:
-        sum_cx_err = 0
-        num_cx = 0
-        for gate in props['gates']:
-            if gate['gate'] == 'cx':
-                for param in gate['parameters']:
-                    if param['name'] == 'gate_error':
-                        # Value == 1.0 means gate effectively off
-                        if param['value'] != 1.0:
-                            sum_cx_err += param['value']
-                            num_cx += 1
-        avg_cx_err = round(sum_cx_err/(num_cx)*100, 2)
-
-    avg_meas_err = 0
-    for qub in props['qubits']:
-        for item in qub:
-            if item['name'] == 'readout_error':
-                avg_meas_err += item['value']
-    avg_meas_err = round(avg_meas_err/n_qubits*100, 2)
+        # Value == 1.0 means gate effectively off
+        cx_errors = table.cx_error[table.cx_error != 1.0]
+        avg_cx_err = round(float(np.nanmean(cx_errors))*100, 2)
+
+    avg_meas_err = round(float(np.nanmean(table.readout_error))*100, 2)
 
     t12_label = wid.HTML(value="<font size='2'>Avg. T<sub>1</sub> / T<sub>2</sub></font>:")
     t12_str = "<font size='3' face='monospace'>{t1}/{t2}</font><font size='2'> {units}</font>"
@@ -12,4 +12,7 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-from .loco import local_ordering
\ No newline at end of file
+from .loco import local_ordering, local_ordering_batch, windowed_ordering
+from .mapping import coupling_ordering
+from .cache import OrderingCache, ORDERING_CACHE
+from .relabel import permute_circuit
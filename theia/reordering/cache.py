@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Ordering result cache"""
+import os
+import re
+import hashlib
+import tempfile
+from collections import OrderedDict, namedtuple
+import numpy as np
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+# Names of the result files written by OrderingCache.put.
+_RESULT_FILE = re.compile(r'[0-9a-f]{40}\.npz')
+
+
+class OrderingCache:
+    """LRU cache of ordering results, keyed by the bytes of the canonical
+    CSR entangling graph and the ordering options.
+
+    If a path is given, results are also written to that directory as
+    .npz files, and looked up there on a miss in memory.  The directory
+    can be shared between processes and sessions.  Only the size and
+    path of a cache are pickled, so worker processes start with an empty
+    in-memory cache and their own counters.
+
+    Parameters:
+        maxsize (int): Max. number of results kept in memory.
+        path (str): Optional directory of the on-disk store.
+    """
+    def __init__(self, maxsize=1024, path=None):
+        self.maxsize = maxsize
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._store = OrderedDict()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+
+    def __getstate__(self):
+        return {'maxsize': self.maxsize, 'path': self.path}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __len__(self):
+        return len(self._store)
+
+    @staticmethod
+    def key(G, **options):
+        """Hash of a graph and the options used to order it.
+
+        Parameters:
+            G (csr_matrix): Input graph.
+            **options: Ordering options.
+
+        Returns:
+            str: Hex digest.
+        """
+        if not G.has_canonical_format:
+            G = G.copy()
+            G.sum_duplicates()
+        digest = hashlib.sha1()
+        digest.update(repr((G.shape, G.indptr.dtype.str, G.indices.dtype.str,
+                            G.data.dtype.str, sorted(options.items()))).encode())
+        for array in (G.indptr, G.indices, G.data):
+            digest.update(np.ascontiguousarray(array).tobytes())
+        return digest.hexdigest()
+
+    def get(self, key):
+        """Looks up a result, first in memory and then on disk.
+
+        Parameters:
+            key (str): Key from OrderingCache.key.
+
+        Returns:
+            tuple: permutation, (bandwidth, new bandwidth),
+                   (weighted profile, new weighted profile),
+                   or None if not found.
+        """
+        if key in self._store:
+            self._store.move_to_end(key)
+            self.hits += 1
+            return _copy(self._store[key])
+        value = self._load(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self._insert(key, value)
+        return _copy(value)
+
+    def put(self, key, value):
+        """Stores a result, in memory and on disk if a path is set.
+
+        Parameters:
+            key (str): Key from OrderingCache.key.
+            value (tuple): Result as returned by get.
+        """
+        value = _copy(value)
+        self._insert(key, value)
+        if self.path is not None:
+            perm, bandwidths, profiles = value
+            fd, tmp = tempfile.mkstemp(suffix='.npz', dir=self.path)
+            with os.fdopen(fd, 'wb') as tmp_file:
+                np.savez(tmp_file, perm=perm, bandwidths=np.asarray(bandwidths),
+                         profiles=np.asarray(profiles))
+            os.replace(tmp, self._file(key))
+
+    def info(self):
+        """Hit and miss counts and size of the in-memory cache.
+
+        Returns:
+            CacheInfo: hits, misses, maxsize, currsize
+        """
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._store))
+
+    def clear(self, disk=False):
+        """Empties the in-memory cache and resets the counters.
+
+        Parameters:
+            disk (bool): Also delete the results stored on disk.  Other
+                         files in the directory are kept.
+        """
+        self._store.clear()
+        self.hits = 0
+        self.misses = 0
+        if disk and self.path is not None:
+            for name in os.listdir(self.path):
+                if _RESULT_FILE.fullmatch(name):
+                    os.remove(os.path.join(self.path, name))
+
+    def _insert(self, key, value):
+        self._store[key] = value
+        self._store.move_to_end(key)
+        while len(self._store) > self.maxsize:
+            self._store.popitem(last=False)
+
+    def _file(self, key):
+        return os.path.join(self.path, key + '.npz')
+
+    def _load(self, key):
+        if self.path is None or not os.path.exists(self._file(key)):
+            return None
+        with np.load(self._file(key)) as data:
+            bandwidths = tuple(data['bandwidths'].tolist())
+            profiles = tuple(data['profiles'].tolist())
+            return data['perm'], bandwidths, profiles
+
+
+def _copy(value):
+    perm, bandwidths, profiles = value
+    return perm.copy(), bandwidths, profiles
+
+
+# Cache shared by the ordering functions when called with cache=True.
+ORDERING_CACHE = OrderingCache()
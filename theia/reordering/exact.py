@@ -0,0 +1,164 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Exact minimum bandwidth ordering"""
+import time
+from collections import OrderedDict
+import numpy as np
+from scipy.sparse.csgraph import connected_components, shortest_path
+from ..cython.loco import (sparse_bandwidth, reverse_cuthill_mckee,
+                           weighted_reverse_cuthill_mckee)
+from ..cython.permute import sparse_permute
+from ..cython.exact import bandwidth_layout, MAX_NODES
+
+# Graphs with more nodes than this are ordered by RCM, at most MAX_NODES.
+EXACT_MAX_NODES = 20
+
+# Default time budget of the search in seconds.
+EXACT_TIME_LIMIT = 1.0
+
+# Max. number of optimal orderings kept.
+MAX_EXACT_CACHE = 256
+
+# Optimal orderings keyed by graph structure, least recently used first.
+_EXACT_CACHE = OrderedDict()
+
+
+class _Timeout(Exception):
+    pass
+
+
+def exact_ordering(G, weighted=True, time_limit=EXACT_TIME_LIMIT):
+    """Minimum bandwidth ordering of a small symmetric graph.
+
+    Each connected component is laid out by depth first search over
+    partial orderings for increasing bandwidths, starting from a lower
+    bound, with partial orderings that are known to fail skipped (see
+    theia.cython.exact.bandwidth_layout).  The
+    edge weights do not change the bandwidth, and only select the RCM
+    variant used as a starting point and as the fallback when the graph
+    has more than EXACT_MAX_NODES nodes or the time limit is reached.
+    Optimal orderings are cached by the edge structure of the graph, so
+    circuits that differ only in their gate counts share entries.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+        weighted (bool): Use weighted RCM as the fallback.
+        time_limit (float): Time budget of the search in seconds.
+
+    Returns:
+        ndarray: Permutation giving the new order of the nodes.
+    """
+    return _exact_ordering(G, weighted, time_limit)[0]
+
+
+def _exact_ordering(G, weighted=True, time_limit=EXACT_TIME_LIMIT):
+    """exact_ordering, also returning False if the time limit was
+    reached.
+    """
+    num_nodes = G.shape[0]
+    if weighted:
+        rcm = weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                             num_nodes)
+    else:
+        rcm = reverse_cuthill_mckee(G.indices, G.indptr, num_nodes)
+    if num_nodes > min(EXACT_MAX_NODES, MAX_NODES):
+        return rcm, True
+
+    key = _structure_key(G)
+    if key in _EXACT_CACHE:
+        _EXACT_CACHE.move_to_end(key)
+        return _EXACT_CACHE[key].astype(G.indices.dtype), True
+
+    stop = time.perf_counter() + time_limit
+    num_comps, labels = connected_components(G, directed=False)
+    order = []
+    try:
+        for comp in range(num_comps):
+            nodes = np.flatnonzero(labels == comp)
+            if nodes.shape[0] <= 2:
+                order.extend(nodes)
+                continue
+            sub = G[nodes][:, nodes]
+            sub_rcm = np.argsort(np.argsort(rcm)[nodes], kind='stable')
+            order.extend(nodes[_component_layout(sub, sub_rcm, stop)])
+    except _Timeout:
+        return rcm, False
+
+    perm = np.asarray(order, dtype=G.indices.dtype)
+    if _bandwidth(G, perm) > _bandwidth(G, rcm):
+        return rcm, True
+    _EXACT_CACHE[key] = perm
+    while len(_EXACT_CACHE) > MAX_EXACT_CACHE:
+        _EXACT_CACHE.popitem(last=False)
+    return perm.copy(), True
+
+
+def _structure_key(G):
+    rows = np.repeat(np.arange(G.shape[0]), np.diff(G.indptr))
+    upper = rows < G.indices
+    edges = np.stack([rows[upper], G.indices[upper]]).astype(np.int64)
+    edges = edges[:, np.lexsort(edges[::-1])]
+    return G.shape[0], edges.tobytes()
+
+
+def _bandwidth(G, perm):
+    _, ind, ptr = sparse_permute(G.data, G.indices, G.indptr, G.shape[0],
+                                 G.shape[1], perm, perm, 0)
+    return sparse_bandwidth(ind, ptr, G.shape[0])[2]
+
+
+def bandwidth_lower_bound(G):
+    """Lower bound on the bandwidth of a connected graph.
+
+    A node with r nodes within distance d has them within d*k positions
+    on either side of it in a layout of bandwidth k.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+
+    Returns:
+        int: Lower bound.
+    """
+    return _lower_bound(shortest_path(G, directed=False, unweighted=True))
+
+
+def _lower_bound(dist):
+    bound = 1
+    for d in range(1, int(np.max(dist)) + 1):
+        within = np.max(np.sum(dist <= d, axis=1)) - 1
+        bound = max(bound, -(-within // (2*d)))
+    return int(bound)
+
+
+def _component_layout(G, rcm, stop):
+    """Min. bandwidth layout of a connected graph, given the RCM layout.
+    """
+    num_nodes = G.shape[0]
+    dist = shortest_path(G, directed=False, unweighted=True).astype(int)
+    ecc = dist.max(axis=1).astype(np.int32)
+    bits = np.uint64(1) << np.arange(num_nodes, dtype=np.uint64)
+    # balls[node, d-1] holds the nodes within distance d of node.
+    balls = np.stack([((dist <= d)*bits).sum(axis=1, dtype=np.uint64)
+                      for d in range(1, int(ecc.max()) + 1)], axis=1)
+    degree = np.diff(G.indptr).astype(np.int32)
+    for k in range(_lower_bound(dist), _bandwidth(G, rcm)):
+        status, layout = bandwidth_layout(balls, ecc, degree, k,
+                                          stop - time.perf_counter())
+        if status < 0:
+            raise _Timeout
+        if status:
+            return layout
+    return np.asarray(rcm)
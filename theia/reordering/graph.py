@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Entangling graph extraction"""
+import os
+import numpy as np
+import scipy.sparse as sp
+from ..cython.graph import symmetric_csr, clique_csr
+
+# Instructions that do not entangle qubits.
+NON_ENTANGLING = frozenset(['barrier', 'measure', 'snapshot'])
+
+
+def _is_dag(circuit):
+    return hasattr(circuit, 'op_nodes')
+
+
+def _qregs(circuit):
+    if _is_dag(circuit):
+        return list(circuit.qregs.values())
+    return list(circuit.qregs)
+
+
+def qubit_registers(circuit):
+    """Names and sizes of the quantum registers of a circuit, in the
+    order in which their qubits are numbered in the entangling graph.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): Input circuit.
+
+    Returns:
+        list: (name, size) of each register.
+    """
+    return [(reg.name, reg.size) for reg in _qregs(circuit)]
+
+
+def _entangling_qargs(circuit, ordered=False):
+    """Returns the qargs of every multi-qubit entangling operation,
+    in topological order if ordered is True.
+    """
+    if _is_dag(circuit):
+        nodes = circuit.topological_op_nodes() if ordered else circuit.op_nodes()
+        return [node.qargs for node in nodes
+                if len(node.qargs) > 1 and node.name not in NON_ENTANGLING]
+    return [qargs for inst, qargs, _ in circuit.data
+            if len(qargs) > 1 and inst.name not in NON_ENTANGLING]
+
+
+def _qubit_indices(qargs, qregs):
+    """Global indices of the qubits in a list of qargs, where the qubits
+    of each register follow those of the registers before it.
+    """
+    count = sum(len(qarg) for qarg in qargs)
+    if len(qregs) == 1:
+        return np.fromiter((qubit.index for qarg in qargs for qubit in qarg),
+                           dtype=np.int32, count=count)
+    offsets = {}
+    offset = 0
+    for reg in qregs:
+        offsets[reg] = offset
+        offset += reg.size
+    return np.fromiter((offsets[qubit.register] + qubit.index
+                        for qarg in qargs for qubit in qarg),
+                       dtype=np.int32, count=count)
+
+
+def entangling_pairs(circuit):
+    """Qubit index pairs of all two-qubit gates in a circuit.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): Input circuit.
+
+    Returns:
+        ndarray: Flat int32 array of pairs [a0, b0, a1, b1, ...].
+
+    Raises:
+        ValueError: Circuit must have no >2Q gates.
+    """
+    qargs = _entangling_qargs(circuit)
+    if any(len(qarg) > 2 for qarg in qargs):
+        raise ValueError('Entangling gates must be 2Q gates only.')
+    return _qubit_indices(qargs, _qregs(circuit))
+
+
+def entangling_graph(circuit):
+    """The symmetric, weighted entangling graph of a circuit, where the
+    weight of each edge is the number of gates acting on the pair of
+    qubits.
+
+    Gates on k > 2 qubits add one to every edge of the k-clique of their
+    qubits.  The qubits of multiple registers are numbered register by
+    register, in the order given by qubit_registers.  OpenQASM files are
+    streamed by qasm_entangling_graph, without building a circuit.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit or str or file): Input
+            circuit, or path to or open OpenQASM file.
+
+    Returns:
+        csr_matrix: Entangling graph.
+    """
+    return _entangling_graph(circuit)[0]
+
+
+def _entangling_graph(circuit):
+    """Entangling graph and (name, size) of each register of a circuit.
+    """
+    if isinstance(circuit, (str, os.PathLike)) or hasattr(circuit, 'read'):
+        # pylint: disable=import-outside-toplevel
+        from .qasm import _qasm_entangling_graph
+        return _qasm_entangling_graph(circuit)
+    qubits, gates, qregs = entangling_gates(circuit)
+    num_qubits = sum(reg.size for reg in qregs)
+    if np.all(np.diff(gates) == 2):
+        data, ind, ptr = symmetric_csr(qubits, num_qubits)
+    else:
+        data, ind, ptr = clique_csr(qubits, gates, num_qubits)
+    G = sp.csr_matrix((data, ind, ptr), shape=(num_qubits, num_qubits))
+    return G, [(reg.name, reg.size) for reg in qregs]
+
+
+def entangling_gates(circuit, ordered=False):
+    """Qubits of the entangling gates of a circuit, numbered as in
+    entangling_graph.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): Input circuit.
+        ordered (bool): List the gates of a DAGCircuit in topological
+                        order, rather than in the order they were added.
+
+    Returns:
+        tuple: qubits, gates, registers where gate k acts on the int32
+               qubits[gates[k]:gates[k+1]], and registers are the
+               quantum registers of the circuit.
+    """
+    qregs = _qregs(circuit)
+    qargs = _entangling_qargs(circuit, ordered)
+    qubits = _qubit_indices(qargs, qregs)
+    gates = np.zeros(len(qargs)+1, dtype=np.int32)
+    gates[1:] = np.cumsum(np.fromiter((len(qarg) for qarg in qargs),
+                                      dtype=np.int32, count=len(qargs)))
+    return qubits, gates, qregs
+
+
+def register_permutations(perm, registers):
+    """Splits a permutation of all qubits into one per register.
+
+    The permutation of a register gives the new order of its qubits,
+    by their index in the register, as they appear in perm.
+
+    Parameters:
+        perm (ndarray): Permutation of the qubits numbered as in
+                        entangling_graph.
+        registers (list): (name, size) of each register.
+
+    Returns:
+        dict: Permutation keyed by register name.
+    """
+    perm = np.asarray(perm)
+    sizes = np.array([size for _, size in registers], dtype=np.int64)
+    offsets = np.concatenate([[0], np.cumsum(sizes)])
+    owner = np.searchsorted(offsets, perm, side='right') - 1
+    return {name: (perm[owner == kk] - offsets[kk]).astype(perm.dtype)
+            for kk, (name, _) in enumerate(registers)}
+
+
+def cx_error_weights(backend):
+    """CX error rates of the coupled qubit pairs of a device, relative
+    to the lowest error rate on the device.
+
+    Parameters:
+        backend (BaseBackend): A device backend with properties.
+
+    Returns:
+        dict: Relative error keyed by (low, high) qubit pair.
+    """
+    # pylint: disable=import-outside-toplevel
+    from ..visualization.backend_properties import properties_table
+
+    table = properties_table(backend)
+    errors = {}
+    for (ctrl, tgt), err in zip(table.edges.tolist(), table.cx_error.tolist()):
+        # Edges without calibration data get no weight.
+        if np.isnan(err):
+            continue
+        pair = (min(ctrl, tgt), max(ctrl, tgt))
+        errors[pair] = max(errors.get(pair, 0), err)
+    positive = [err for err in errors.values() if err > 0]
+    if not positive:
+        return {pair: 1.0 for pair in errors}
+    scale = min(positive)
+    return {pair: max(err, scale)/scale for pair, err in errors.items()}
+
+
+def weight_graph(G, edge_weights):
+    """Scales the gate counts of an entangling graph by per-edge weights.
+
+    Parameters:
+        G (csr_matrix): Symmetric entangling graph.
+        edge_weights (BaseBackend or dict): Weights keyed by qubit pair,
+            or a backend whose relative CX error rates are used.
+            Edges without a weight get the largest weight given.
+
+    Returns:
+        csr_matrix: Graph with float64 weights.
+    """
+    if hasattr(edge_weights, 'properties'):
+        edge_weights = cx_error_weights(edge_weights)
+    num_nodes = G.shape[0]
+    rows = np.repeat(np.arange(num_nodes, dtype=np.int64), np.diff(G.indptr))
+    cols = G.indices.astype(np.int64)
+    keys = np.minimum(rows, cols)*num_nodes + np.maximum(rows, cols)
+    weights = np.full(keys.shape[0], max(edge_weights.values(), default=1.0))
+    if edge_weights:
+        pairs = np.array([(min(pair), max(pair)) for pair in edge_weights],
+                         dtype=np.int64)
+        values = np.fromiter(edge_weights.values(), dtype=float,
+                             count=len(edge_weights))
+        inside = pairs[:, 1] < num_nodes
+        pair_keys = pairs[inside, 0]*num_nodes + pairs[inside, 1]
+        values = values[inside]
+        order = np.argsort(pair_keys)
+        pair_keys, values = pair_keys[order], values[order]
+        if pair_keys.shape[0]:
+            loc = np.minimum(np.searchsorted(pair_keys, keys), pair_keys.shape[0]-1)
+            found = pair_keys[loc] == keys
+            weights[found] = values[loc[found]]
+    return sp.csr_matrix((G.data*weights, G.indices, G.indptr), shape=G.shape)
@@ -14,103 +14,400 @@
 # pylint: disable=invalid-name
 
 """Local ordering"""
+import os
+import functools
+import threading
+from concurrent.futures import ProcessPoolExecutor
 import numpy as np
 import scipy.sparse as sp
-import matplotlib as mpl
-import matplotlib.pyplot as plt
-from matplotlib import ticker
-from matplotlib import cm
-from ..cython.loco import (sparse_bandwidth, weighted_profile,
+from ..cython.loco import (ordering_metrics, OrderingWorkspace,
                            reverse_cuthill_mckee,
-                           weighted_reverse_cuthill_mckee)
-from ..cython.permute import sparse_permute
-from ..visualization.spy import wspy
+                           weighted_reverse_cuthill_mckee,
+                           bucket_reverse_cuthill_mckee,
+                           weighted_bucket_reverse_cuthill_mckee)
+from ..cython.permute import sparse_permute, adjacent_swaps
+from ..cython.refine import refine_ordering
+from .graph import (_entangling_graph, cx_error_weights, weight_graph,
+                    register_permutations, qubit_registers)
+from .spectral import spectral_ordering
+from .multilevel import multilevel_ordering
+from .exact import _exact_ordering
+from .cache import ORDERING_CACHE
+from .relabel import permute_circuit
+from .windowed import window_graphs
 
+# Per-thread scratch buffers of the RCM kernels.
+_WORKSPACES = threading.local()
 
-def local_ordering(circuit, weighted=True, verbose=False):
+
+def local_ordering(circuit, weighted=True, verbose=False, method='rcm',
+                   peripheral=False, refine_passes=0, refine_time=None,
+                   edge_weights=None, cache=False, relabel=False, window=None,
+                   stride=None):
     """Permute qubit labels so that two-qubit gates are
     as local as possible.
 
+    Gates on more than two qubits are expanded into cliques of their
+    qubits, and the registers of the circuit are ordered together.
+
     Parameters:
-        circuit (qiskit.QuantumCircuit): An input quantum circuit.
+        circuit (QuantumCircuit or DAGCircuit or str): An input quantum circuit,
+            or path to an OpenQASM file.
         weighted (bool): Using weighting method.
         verbose (bool): Print values and plot results.
+        method (str): Ordering engine, 'rcm', 'bucket_rcm', 'spectral',
+                      'spectral_rcm' (RCM seeded by the spectral order),
+                      'multilevel', or 'exact' (min. bandwidth for up to
+                      20 qubits, RCM otherwise).
+        peripheral (bool): Seed the 'rcm' engine with pseudo-peripheral
+                           nodes.
+        refine_passes (int): Max. number of adjacent-swap passes used to
+                             refine the ordering, 0 disables refinement.
+        refine_time (float): Time budget for refinement in seconds.
+        edge_weights (BaseBackend or dict): Scale the gate counts by
+                                            per-edge weights keyed by qubit
+                                            pair, or by the relative CX error
+                                            rates of a backend.
+        cache (bool or OrderingCache): Reuse the results for identical
+                                       graphs and options, from the shared
+                                       ORDERING_CACHE if True.  Results
+                                       cut short by a time budget are not
+                                       cached.  Off by default.
+        relabel (bool): Also return the circuit with its qubits relabelled
+                        by the permutation, see permute_circuit.
+        window (int): Order each window of this many layers of entangling
+                      gates separately, see windowed_ordering.
+        stride (int): Number of layers between windows, defaults to window.
 
     Returns:
-        tuple: permutation, bandwidth_reduction, profile_reduction
+        tuple: permutation, bandwidth_reduction, profile_reduction, where
+               the permutation is a dict of permutations keyed by register
+               name if the circuit has more than one register, followed
+               by the relabelled circuit if relabel is True.  If window
+               is given, the result of windowed_ordering is returned.
 
     Raises:
-        ValueError: Circuit must have no >2Q gates and only a
-                    single register.
+        ValueError: Invalid method, or relabel or window is given and the
+                    input is not a circuit.
     """
-    rows = []
-    cols = []
-    data = []
-    num_qubits = circuit.n_qubits
-    num_regs = len(circuit.qregs)
-    if num_regs != 1:
-        raise ValueError('Circuit must have a single register.')
-
-    for item in circuit.data:
-        if item[0].name not in ['barrier', 'measure', 'snapshot']:
-            nargs = len(item[1])
-            if nargs == 2:
-                rows.append(item[1][0].index)
-                cols.append(item[1][1].index)
-                data.append(1)
-            elif nargs > 2:
-                raise ValueError('Entangling gates must be 2Q gates only.')
-
-    circ_graph = sp.coo_matrix((data, (rows, cols)), dtype=np.int32,
-                               shape=(num_qubits, num_qubits)).tocsr()
-    G = circ_graph + circ_graph.T
-
-    _, _, ub = sparse_bandwidth(G.indices, G.indptr, G.shape[0])
-    pro = weighted_profile(G.data, G.indices, G.indptr, G.shape[0])
+    is_file = isinstance(circuit, (str, os.PathLike)) or hasattr(circuit, 'read')
+    if (relabel or window is not None) and is_file:
+        raise ValueError('Only circuits can be relabelled or windowed.')
+    if window is not None:
+        if relabel:
+            raise ValueError('Windowed orderings cannot be relabelled.')
+        return windowed_ordering(circuit, window, stride, weighted=weighted,
+                                 verbose=verbose, method=method,
+                                 peripheral=peripheral,
+                                 refine_passes=refine_passes,
+                                 refine_time=refine_time,
+                                 edge_weights=edge_weights, cache=cache)
+    G, registers = _entangling_graph(circuit)
+    if edge_weights is not None:
+        G = weight_graph(G, edge_weights)
+    perm, (ub, new_ub), (pro, new_pro) = _cached_order_graph(
+        G, cache, weighted=weighted, method=method, peripheral=peripheral,
+        refine_passes=refine_passes, refine_time=refine_time)
 
+    band_reduction = _reduction(ub, new_ub)
+    pro_reduction = _reduction(pro, new_pro)
     if verbose:
-        fig, axes = plt.subplots(1, 2, figsize=(9, 4))
-        wspy(G, ax=axes[0])
         print('Orig. bandwidth:', ub)
         print('Orig. weighted profile:', pro)
-
-    if weighted:
-        perm = weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr, G.shape[0])
-    else:
-        perm = reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0])
-
-    new_data, new_ind, new_ptr = sparse_permute(G.data,
-                                                G.indices,
-                                                G.indptr,
-                                                G.shape[0],
-                                                G.shape[1],
-                                                perm, perm, 0)
-
-    _, _, new_ub = sparse_bandwidth(new_ind, new_ptr, G.shape[0])
-    F = sp.csr_matrix((new_data, new_ind, new_ptr), shape=G.shape)
-    new_pro = weighted_profile(F.data, F.indices, F.indptr, F.shape[0])
-
-    band_reduction = np.round((ub-new_ub)/ub*100, 2)
-    pro_reduction = np.round((pro-new_pro)/pro*100, 2)
-    if verbose:
-        wspy(F, ax=axes[1], return_plot=False)
-        cbaxes = fig.add_axes([0.95, 0.15, 0.02, 0.7])
-        cmap = cm.magma
-        norm = mpl.colors.Normalize(1, np.max(F.data.real))
-        scmap = cm.ScalarMappable(norm=norm, cmap=cmap)
-        cb = plt.colorbar(scmap, cax=cbaxes)
-        _data_len = np.unique(F.data.real).shape[0]
-        if _data_len > 11:
-            _data_len = 11
-        tick_locator = ticker.MaxNLocator(nbins=_data_len+1)
-        cb.locator = tick_locator
-        cb.update_ticks()
-        axes[0].set_title("Input entangling graph", fontsize=16)
-        axes[1].set_title("Permuted entangling graph", fontsize=16)
         print('New bandwidth:', new_ub)
         print('Bandwidth reduction', band_reduction, '%')
         print('New weighted profile:', new_pro)
         print('Profile reduction', pro_reduction, '%')
-        plt.show(fig)
+        new_data, new_ind, new_ptr = sparse_permute(G.data,
+                                                    G.indices,
+                                                    G.indptr,
+                                                    G.shape[0],
+                                                    G.shape[1],
+                                                    perm, perm, 0)
+        F = sp.csr_matrix((new_data, new_ind, new_ptr), shape=G.shape)
+        _plot_ordering(G, F)
 
+    if len(registers) > 1:
+        perm = register_permutations(perm, registers)
+    if relabel:
+        return perm, band_reduction, pro_reduction, permute_circuit(circuit, perm)
     return perm, band_reduction, pro_reduction
+
+
+def windowed_ordering(circuit, window, stride=None, weighted=True, verbose=False,
+                      method='rcm', peripheral=False, refine_passes=0,
+                      refine_time=None, edge_weights=None, cache=False):
+    """Orders the qubits of each window of consecutive layers of a
+    circuit, giving a schedule of permutations for circuits whose
+    interaction pattern drifts.
+
+    The window graphs are updated incrementally as the window slides,
+    see window_graphs.  Since the reverse of an ordering is equally
+    good, each permutation is reversed if that needs fewer swaps from
+    the previous one.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): An input quantum circuit.
+        window (int): Number of layers of entangling gates per window.
+        stride (int): Number of layers between windows, defaults to window.
+        weighted (bool): Using weighting method.
+        verbose (bool): Print the values of each window.
+        method (str): Ordering engine, as for local_ordering.
+        peripheral (bool): Seed the 'rcm' engine with pseudo-peripheral
+                           nodes.
+        refine_passes (int): Max. number of refinement passes per window.
+        refine_time (float): Refinement time budget per window in seconds.
+        edge_weights (BaseBackend or dict): Per-edge weights, as for
+                                            local_ordering.
+        cache (bool or OrderingCache): Reuse results, as for local_ordering.
+
+    Returns:
+        tuple: schedule, bandwidth_reductions, profile_reductions, swaps
+               where schedule is a list of (first layer, permutation) of
+               each window, with permutations split by register as for
+               local_ordering, the reductions are arrays per window, and
+               swaps[k] is the number of swaps of neighboring qubits that
+               take the ordering of window k to that of window k+1.
+
+    Raises:
+        ValueError: Invalid method, window or stride.
+    """
+    if hasattr(edge_weights, 'properties'):
+        edge_weights = cx_error_weights(edge_weights)
+    registers = qubit_registers(circuit)
+    schedule = []
+    band_reductions = []
+    pro_reductions = []
+    swaps = []
+    prev = None
+    for start, stop, G in window_graphs(circuit, window, stride):
+        if edge_weights is not None:
+            G = weight_graph(G, edge_weights)
+        perm, (ub, new_ub), (pro, new_pro) = _cached_order_graph(
+            G, cache, weighted=weighted, method=method, peripheral=peripheral,
+            refine_passes=refine_passes, refine_time=refine_time)
+        perm = perm.astype(np.int64)
+        if prev is not None:
+            forward = adjacent_swaps(prev, perm)
+            backward = adjacent_swaps(prev, perm[::-1].copy())
+            if backward < forward:
+                perm = perm[::-1].copy()
+            swaps.append(min(forward, backward))
+        prev = perm
+        schedule.append((start, perm.astype(G.indices.dtype)))
+        band_reductions.append(_reduction(ub, new_ub))
+        pro_reductions.append(_reduction(pro, new_pro))
+        if verbose:
+            print('Layers {}-{}:'.format(start, stop-1),
+                  'bandwidth', ub, '->', new_ub, 'weighted profile', pro,
+                  '->', new_pro, 'swaps', swaps[-1] if swaps else 0)
+
+    if len(registers) > 1:
+        schedule = [(start, register_permutations(perm, registers))
+                    for start, perm in schedule]
+    return (schedule, np.asarray(band_reductions), np.asarray(pro_reductions),
+            np.asarray(swaps, dtype=np.int64))
+
+
+def local_ordering_batch(circuits, weighted=True, workers=None, method='rcm',
+                         peripheral=False, refine_passes=0, refine_time=None,
+                         edge_weights=None, cache=False):
+    """Local ordering of many circuits in parallel.
+
+    Graph extraction and ordering are done in a pool of worker
+    processes, and no plotting or printing is performed.
+
+    Parameters:
+        circuits (list): Input QuantumCircuits or DAGCircuits, or paths
+                         to OpenQASM files.
+        weighted (bool): Using weighting method.
+        workers (int): Number of worker processes, defaults
+                       to the number of CPUs.
+        method (str): Ordering engine, 'rcm', 'bucket_rcm', 'spectral',
+                      'spectral_rcm' (RCM seeded by the spectral order),
+                      'multilevel', or 'exact' (min. bandwidth for up to
+                      20 qubits, RCM otherwise).
+        peripheral (bool): Seed the 'rcm' engine with pseudo-peripheral
+                           nodes.
+        refine_passes (int): Max. number of adjacent-swap passes used to
+                             refine each ordering, 0 disables refinement.
+        refine_time (float): Time budget for refining each ordering
+                             in seconds.
+        edge_weights (BaseBackend or dict): Per-edge weights, as for
+                                            local_ordering.
+        cache (bool or OrderingCache): Reuse results, as for local_ordering.
+                                       Worker processes share only the
+                                       on-disk store of the cache.
+
+    Returns:
+        list: (permutation, bandwidth_reduction, profile_reduction)
+              tuples in the same order as the input circuits, with
+              permutations split by register as for local_ordering.
+
+    Raises:
+        ValueError: Invalid method.
+    """
+    circuits = list(circuits)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(circuits)))
+    if hasattr(edge_weights, 'properties'):
+        # Ship the error rates, not the backend, to the workers.
+        edge_weights = cx_error_weights(edge_weights)
+    task = functools.partial(_batch_task, weighted=weighted, method=method,
+                             peripheral=peripheral, refine_passes=refine_passes,
+                             refine_time=refine_time, edge_weights=edge_weights,
+                             cache=_ordering_cache(cache))
+    if workers == 1:
+        return list(map(task, circuits))
+
+    chunksize = max(1, len(circuits) // (4*workers))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(task, circuits, chunksize=chunksize))
+
+
+def _batch_task(circuit, edge_weights=None, cache=None, **kwargs):
+    G, registers = _entangling_graph(circuit)
+    if edge_weights is not None:
+        G = weight_graph(G, edge_weights)
+    perm, (ub, new_ub), (pro, new_pro) = _cached_order_graph(G, cache, **kwargs)
+    if len(registers) > 1:
+        perm = register_permutations(perm, registers)
+    return perm, _reduction(ub, new_ub), _reduction(pro, new_pro)
+
+
+def _reduction(old, new):
+    # Graphs without edges have a zero profile and a nonpositive
+    # bandwidth, and nothing to reduce.
+    if old <= 0:
+        return 0.0
+    return np.round((old-new)/old*100, 2)
+
+
+def _ordering_cache(cache):
+    if cache is True:
+        return ORDERING_CACHE
+    if cache is False:
+        return None
+    return cache
+
+
+def _cached_order_graph(G, cache, **options):
+    """Orders a graph with _order_graph, reusing cached results.
+    """
+    cache = _ordering_cache(cache)
+    if cache is None:
+        return _order_graph(G, **options)[0]
+    key = cache.key(G, **options)
+    result = cache.get(key)
+    if result is None:
+        result, complete = _order_graph(G, **options)
+        # A result cut short by a time budget depends on the load of the
+        # machine, and is recomputed next time.
+        if complete:
+            cache.put(key, result)
+    return result
+
+
+def _order_graph(G, weighted=True, method='rcm', peripheral=False,
+                 refine_passes=0, refine_time=None):
+    """Orders the nodes of a symmetric graph.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+        weighted (bool): Using weighting method.
+        method (str): Ordering engine.
+        peripheral (bool): Use pseudo-peripheral seeds.
+        refine_passes (int): Max. number of refinement passes.
+        refine_time (float): Refinement time budget in seconds.
+
+    Returns:
+        tuple: (permutation, (bandwidth, new bandwidth),
+               (weighted profile, new weighted profile)), and False if a
+               time budget ran out
+    """
+    perm, complete = _permutation(G, weighted, method, peripheral)
+    if refine_passes:
+        perm, _, timed_out = refine_ordering(G.data, G.indices, G.indptr,
+                                             G.shape[0], perm, refine_passes,
+                                             refine_time or 0)
+        complete = complete and not timed_out
+    # Score the input and new orderings in a single call
+    perms = np.vstack([np.arange(G.shape[0], dtype=np.int32), perm])
+    ub, _, pro, _ = ordering_metrics(G.data, G.indices, G.indptr,
+                                     G.shape[0], perms)
+    return (perm, (int(ub[0]), int(ub[1])), (pro[0].item(), pro[1].item())), complete
+
+
+def _permutation(G, weighted=True, method='rcm', peripheral=False):
+    """Computes the node ordering of a graph with the selected engine.
+
+    Returns:
+        tuple: permutation, and False if the time budget of the engine
+               ran out
+
+    Raises:
+        ValueError: Invalid method.
+    """
+    if method == 'rcm':
+        if weighted:
+            return weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                                  G.shape[0], peripheral,
+                                                  _workspace()), True
+        return reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0], peripheral,
+                                     _workspace()), True
+    if method in ['bucket_rcm', 'spectral_rcm']:
+        seeds = None
+        if method == 'spectral_rcm':
+            seeds = spectral_ordering(G, weighted)
+        if weighted:
+            return weighted_bucket_reverse_cuthill_mckee(G.data, G.indices,
+                                                         G.indptr, G.shape[0],
+                                                         seeds), True
+        return bucket_reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0], seeds), True
+    if method == 'spectral':
+        return spectral_ordering(G, weighted), True
+    if method == 'multilevel':
+        return multilevel_ordering(G, weighted), True
+    if method == 'exact':
+        return _exact_ordering(G, weighted)
+    raise ValueError("Invalid ordering method '{}'.".format(method))
+
+
+def _workspace():
+    """Ordering workspace of the calling thread, reused by every
+    ordering done in that thread.
+    """
+    workspace = getattr(_WORKSPACES, 'workspace', None)
+    if workspace is None:
+        workspace = _WORKSPACES.workspace = OrderingWorkspace()
+    return workspace
+
+
+def _plot_ordering(G, F):
+    """Plots the input and permuted entangling graphs.
+    """
+    # pylint: disable=import-outside-toplevel
+    import matplotlib as mpl
+    import matplotlib.pyplot as plt
+    from matplotlib import ticker
+    from matplotlib import cm
+    from ..visualization.spy import wspy
+
+    fig, axes = plt.subplots(1, 2, figsize=(9, 4))
+    wspy(G, ax=axes[0])
+    wspy(F, ax=axes[1], return_plot=False)
+    cbaxes = fig.add_axes([0.95, 0.15, 0.02, 0.7])
+    cmap = cm.magma
+    norm = mpl.colors.Normalize(1, np.max(F.data.real))
+    scmap = cm.ScalarMappable(norm=norm, cmap=cmap)
+    cb = plt.colorbar(scmap, cax=cbaxes)
+    _data_len = np.unique(F.data.real).shape[0]
+    if _data_len > 11:
+        _data_len = 11
+    tick_locator = ticker.MaxNLocator(nbins=_data_len+1)
+    cb.locator = tick_locator
+    cb.update_ticks()
+    axes[0].set_title("Input entangling graph", fontsize=16)
+    axes[1].set_title("Permuted entangling graph", fontsize=16)
+    plt.show(fig)
@@ -0,0 +1,194 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Coupling map aware ordering"""
+import functools
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import shortest_path
+from .graph import entangling_graph
+
+
+def coupling_ordering(circuit, backend, weighted=True, max_iter=None):
+    """Map the qubits of a circuit onto the coupling map of a device
+    so that the total weighted distance between interacting qubits,
+    and hence the number of SWAPs needed, is as small as possible.
+
+    The qubits of multiple registers are numbered register by register,
+    as in entangling_graph.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): An input quantum circuit.
+        backend (BaseBackend or list): A device backend, or its coupling map.
+        weighted (bool): Weight distances by the number of two-qubit gates.
+        max_iter (int): Max. number of local search moves, defaults to
+                        four times the number of qubits.
+
+    Returns:
+        tuple: layout, cost_reduction where layout[i] is the physical
+               qubit assigned to circuit qubit i, and the reduction is
+               relative to the trivial layout.
+
+    Raises:
+        ValueError: Circuit must fit on the device.
+    """
+    G = entangling_graph(circuit)
+    if not weighted:
+        G.data[:] = 1
+    cmap, num_physical = _coupling_map(backend)
+    D = coupling_distances(cmap, num_physical)
+    if G.shape[0] > num_physical:
+        raise ValueError('Circuit has more qubits than the device.')
+
+    layout = map_graph(G, D, max_iter)
+    cost = mapping_cost(G, D, np.vstack([np.arange(G.shape[0]), layout]))
+    reduction = np.round((cost[0]-cost[1])/cost[0]*100, 2) if cost[0] else 0.0
+    return layout, reduction
+
+
+def _coupling_map(backend):
+    if hasattr(backend, 'configuration'):
+        config = backend.configuration()
+        return config.coupling_map or [], config.n_qubits
+    cmap = list(backend)
+    num_qubits = max(max(edge) for edge in cmap) + 1 if cmap else 0
+    return cmap, num_qubits
+
+
+def coupling_distances(coupling_map, num_qubits):
+    """All-pairs shortest path distances on a coupling map.
+
+    Results are cached per coupling map, so repeated calls for the same
+    device are free.  Qubits in disconnected parts of the map are given
+    a distance of num_qubits.
+
+    Parameters:
+        coupling_map (list): Coupling map edges.
+        num_qubits (int): Number of physical qubits.
+
+    Returns:
+        ndarray: Read-only (num_qubits, num_qubits) distance matrix.
+    """
+    edges = tuple(sorted(set((min(edge), max(edge)) for edge in coupling_map)))
+    return _coupling_distances(edges, num_qubits)
+
+
+@functools.lru_cache(maxsize=32)
+def _coupling_distances(edges, num_qubits):
+    rows = [edge[0] for edge in edges]
+    cols = [edge[1] for edge in edges]
+    adj = sp.csr_matrix((np.ones(len(edges)), (rows, cols)),
+                        shape=(num_qubits, num_qubits))
+    D = shortest_path(adj, directed=False, unweighted=True)
+    D[np.isinf(D)] = num_qubits
+    D.flags.writeable = False
+    return D
+
+
+def mapping_cost(G, D, layout):
+    """Total weighted distance of an entangling graph under one or
+    more layouts.
+
+    Parameters:
+        G (csr_matrix): Symmetric entangling graph.
+        D (ndarray): Physical qubit distance matrix.
+        layout (ndarray): Layout, or 2D array with one layout per row.
+
+    Returns:
+        float or ndarray: Cost of each layout.
+    """
+    rows = np.repeat(np.arange(G.shape[0]), np.diff(G.indptr))
+    layout = np.asarray(layout)
+    # Each edge appears twice in a symmetric matrix.
+    dists = D[layout[..., rows], layout[..., G.indices]]
+    return (dists*G.data).sum(axis=-1) / 2
+
+
+def map_graph(G, D, max_iter=None):
+    """Finds a low cost layout of a symmetric entangling graph onto
+    physical qubits with distance matrix D.
+
+    A greedy placement, that puts each qubit next to the already placed
+    qubits it interacts with most, is followed by steepest descent over
+    all pairwise swaps and moves to unused physical qubits.  The cost
+    change of every candidate move is evaluated at once from the matrix
+    A[l, p] = sum_x w[l, x] D[p, layout[x]].
+
+    Parameters:
+        G (csr_matrix): Symmetric entangling graph.
+        D (ndarray): Physical qubit distance matrix.
+        max_iter (int): Max. number of local search moves.
+
+    Returns:
+        ndarray: layout[i] is the physical qubit of graph node i.
+    """
+    num_nodes = G.shape[0]
+    if max_iter is None:
+        max_iter = 4*num_nodes
+    W = sp.csr_matrix(G, dtype=float)
+    layout = _greedy_layout(W, D)
+    nodes = np.arange(num_nodes)
+    for _ in range(max_iter):
+        A = W @ D[layout, :]
+        own = A[nodes, layout]
+        # Swap logical qubits l and m.
+        S = A[:, layout]
+        swap = S - own[:, None] + S.T - own[None, :]
+        swap += 2*W.multiply(D[np.ix_(layout, layout)]).toarray()
+        swap[nodes, nodes] = 0
+        best_swap = np.unravel_index(np.argmin(swap), swap.shape)
+        # Move logical qubit l to an unused physical qubit.
+        free = np.setdiff1d(np.arange(D.shape[0]), layout)
+        best_move = None
+        if free.shape[0]:
+            move = A[:, free] - own[:, None]
+            best_move = np.unravel_index(np.argmin(move), move.shape)
+        if best_move is not None and move[best_move] < min(swap[best_swap], 0):
+            layout[best_move[0]] = free[best_move[1]]
+        elif swap[best_swap] < 0:
+            l, m = best_swap
+            layout[l], layout[m] = layout[m], layout[l]
+        else:
+            break
+    return layout
+
+
+def _greedy_layout(W, D):
+    num_nodes = W.shape[0]
+    layout = np.full(num_nodes, -1, dtype=np.int64)
+    if not num_nodes:
+        return layout
+    free = np.ones(D.shape[0], dtype=bool)
+    strength = np.asarray(W.sum(axis=1)).ravel()
+    # Weight of the connections from each node to the placed nodes.
+    attached = np.zeros(num_nodes)
+    placed = np.zeros(num_nodes, dtype=bool)
+    for _ in range(num_nodes):
+        score = np.where(placed, -1, attached + 1e-9*strength)
+        node = int(np.argmax(score))
+        cols = W.indices[W.indptr[node]:W.indptr[node+1]]
+        wts = W.data[W.indptr[node]:W.indptr[node+1]]
+        done = placed[cols]
+        if done.any():
+            cost = D[:, layout[cols[done]]] @ wts[done]
+        else:
+            # Start from the most central free physical qubit.
+            cost = D[:, free].sum(axis=1)
+        cost = np.where(free, cost, np.inf)
+        layout[node] = int(np.argmin(cost))
+        free[layout[node]] = False
+        placed[node] = True
+        attached[cols] += wts
+    return layout
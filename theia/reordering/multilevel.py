@@ -0,0 +1,135 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Multilevel ordering"""
+import numpy as np
+import scipy.sparse as sp
+from ..cython.loco import (ordering_metrics, reverse_cuthill_mckee,
+                           weighted_reverse_cuthill_mckee)
+from ..cython.multilevel import heavy_edge_matching, contract_graph
+
+# Coarsening stops at this many nodes.
+COARSEN_TO = 100
+
+# Max. total number of nonzeros of the coarse graphs, as a multiple
+# of the nonzeros of the input graph.
+MAX_COARSE_MEMORY = 2.0
+
+# Coarsening stops once a level removes less than this fraction of nodes.
+MIN_COARSEN_RATE = 0.1
+
+# Number of smoothing sweeps per level.
+SMOOTHING_SWEEPS = 6
+
+
+def coarsen(G, rng=None):
+    """Heavy edge matching coarsening of a symmetric graph.
+
+    Coarsening stops once the graph has at most COARSEN_TO nodes, once
+    a level no longer shrinks the graph by MIN_COARSEN_RATE, or before
+    the total number of nonzeros of the coarse graphs would exceed
+    MAX_COARSE_MEMORY times that of G.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+        rng (RandomState): Random state used for the matching order.
+
+    Returns:
+        tuple: levels, coarsest graph, coarsest node weights, where
+               levels is a list of (graph, node weights, coarse map)
+               from the finest level down.
+    """
+    if rng is None:
+        rng = np.random.RandomState(G.shape[0])
+    graph = G
+    vwgt = np.ones(G.shape[0], dtype=np.int64)
+    max_vwgt = max(1, int(1.5*G.shape[0]/COARSEN_TO))
+    budget = MAX_COARSE_MEMORY*G.nnz
+    used = 0
+    levels = []
+    # The next coarse graph has at most as many nonzeros as graph.
+    while graph.shape[0] > COARSEN_TO and used + graph.nnz <= budget:
+        num_rows = graph.shape[0]
+        visit = rng.permutation(num_rows).astype(graph.indices.dtype)
+        cmap, num_coarse = heavy_edge_matching(graph.data, graph.indices,
+                                               graph.indptr, num_rows, vwgt,
+                                               visit, max_vwgt)
+        if num_coarse > (1-MIN_COARSEN_RATE)*num_rows:
+            break
+        data, ind, ptr, coarse_vwgt = contract_graph(graph.data, graph.indices,
+                                                     graph.indptr, num_rows,
+                                                     vwgt, cmap, num_coarse)
+        levels.append((graph, vwgt, cmap))
+        graph = sp.csr_matrix((data, ind, ptr), shape=(num_coarse, num_coarse))
+        vwgt = coarse_vwgt
+        used += graph.nnz
+    return levels, graph, vwgt
+
+
+def multilevel_ordering(G, weighted=True, sweeps=SMOOTHING_SWEEPS):
+    """Orders the nodes of a symmetric graph by coarsening, ordering the
+    coarsest graph, and refining the ordering level by level.
+
+    The coarsest graph is ordered by RCM, with each coarse node
+    spanning as many positions as the nodes it contains.  At each finer
+    level, nodes start at the position of their coarse node and are
+    moved towards the weighted mean position of their neighbors for a
+    number of smoothing sweeps, before being ranked.  The RCM ordering
+    of G is returned instead if it has the lower weighted profile.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+        weighted (bool): Use the edge weights.
+        sweeps (int): Number of smoothing sweeps per level.
+
+    Returns:
+        ndarray: Permutation giving the new order of the nodes.
+    """
+    num_nodes = G.shape[0]
+    W = sp.csr_matrix(G, copy=True)
+    if not weighted:
+        W.data[:] = 1
+    rng = np.random.RandomState(num_nodes)
+    levels, graph, vwgt = coarsen(W, rng)
+
+    order = np.asarray(_rcm(graph, weighted), dtype=np.int64)
+    span = vwgt[order]
+    pos = np.empty(graph.shape[0])
+    pos[order] = np.cumsum(span) - span/2
+    for graph, vwgt, cmap in reversed(levels):
+        # Break ties between the nodes of a coarse node at random.
+        pos = pos[cmap] + 0.1*rng.random_sample(graph.shape[0])
+        A = sp.csr_matrix(graph, dtype=float)
+        degree = np.asarray(A.sum(axis=1)).ravel()
+        degree[degree == 0] = 1
+        for _ in range(sweeps):
+            pos = 0.5*pos + 0.5*(A @ pos)/degree
+        order = np.argsort(pos, kind='stable')
+        pos[order] = np.arange(graph.shape[0])
+    order = np.argsort(pos, kind='stable').astype(G.indices.dtype)
+
+    rcm = _rcm(W, weighted)
+    wpro = ordering_metrics(W.data, W.indices, W.indptr, num_nodes,
+                            np.vstack([order, rcm]))[2]
+    if wpro[1] < wpro[0]:
+        return rcm
+    return order
+
+
+def _rcm(G, weighted):
+    if weighted:
+        return weighted_reverse_cuthill_mckee(G.data, G.indices, G.indptr,
+                                              G.shape[0])
+    return reverse_cuthill_mckee(G.indices, G.indptr, G.shape[0])
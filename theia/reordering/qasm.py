@@ -0,0 +1,244 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Streaming OpenQASM entangling graph extraction"""
+import os
+import re
+from array import array
+import numpy as np
+import scipy.sparse as sp
+from .graph import NON_ENTANGLING
+
+# Number of lines parsed at a time.
+BLOCK_LINES = 8192
+
+# Number of buffered edges before they are merged into the counts.
+EDGE_BUFFER = 1 << 20
+
+_CONDITION = re.compile(r'^if\s*\([^)]*\)\s*')
+_QREG = re.compile(r'^qreg\s+([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]$')
+_GATE_2Q = re.compile(r'\s*([A-Za-z_]\w*)\s*(?:\(.*\))?\s*([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]\s*,'
+                      r'\s*([A-Za-z_]\w*)\s*\[\s*(\d+)\s*\]\s*$', re.S)
+_STATEMENT = re.compile(r'^([A-Za-z_]\w*)\s*(\(.*\))?\s*(.*)$', re.S)
+_ARG = re.compile(r'^([A-Za-z_]\w*)\s*(?:\[\s*(\d+)\s*\])?$')
+
+# Statements that do not apply gates.
+_DECLARATIONS = frozenset(['OPENQASM', 'include', 'creg', 'opaque'])
+
+
+def qasm_entangling_graph(source):
+    """The symmetric, weighted entangling graph of an OpenQASM 2 program,
+    built without forming a circuit.
+
+    The program is read line by line and the gates are counted per qubit
+    pair, so memory use is O(qubits + distinct edges) rather than
+    O(gates).  Gates applied to whole registers are expanded, gates on
+    k > 2 qubits add one to every edge of the k-clique of their qubits,
+    and the qubits of multiple registers are numbered register by
+    register, in the order of declaration.
+
+    Parameters:
+        source (str or file or iterable): Path of an OpenQASM file, an
+            open file, or an iterable of program lines.
+
+    Returns:
+        csr_matrix: Entangling graph.
+
+    Raises:
+        ValueError: Invalid or incomplete program.
+    """
+    return _qasm_entangling_graph(source)[0]
+
+
+def _qasm_entangling_graph(source):
+    """Entangling graph and (name, size) of each register of a program.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        with open(source) as qasm_file:
+            return _qasm_entangling_graph(qasm_file)
+    parser = _QasmGraphParser()
+    block = []
+    for line in source:
+        # Comments end with their line, so they are removed before the
+        # lines, which may not end in a newline, are joined.
+        comment = line.find('//')
+        if comment >= 0:
+            line = line[:comment]
+        block.append(line)
+        if len(block) >= BLOCK_LINES:
+            parser.feed('\n'.join(block) + '\n')
+            block = []
+    parser.feed('\n'.join(block) + '\n')
+    return parser.graph(), [(name, size) for name, (_, size) in parser.qregs.items()]
+
+
+class _QasmGraphParser:
+    """Splits OpenQASM text into statements, skipping gate bodies, and
+    accumulates the qubit pairs of the gates.  A pair (a, b) with a < b
+    is stored as the key a*2**32 + b, which stays valid as registers
+    are added.
+    """
+
+    def __init__(self):
+        self.pending = ''
+        self.in_body = False
+        self.qregs = {}
+        self.num_qubits = 0
+        self.buffer = array('q')
+        self.keys = np.zeros(0, dtype=np.int64)
+        self.counts = np.zeros(0, dtype=np.int64)
+
+    def feed(self, text):
+        """Parses all complete statements in the text seen so far, which
+        must not contain comments.
+        """
+        text = self.pending + text
+        pos = 0
+        while True:
+            if self.in_body:
+                end = text.find('}', pos)
+                if end < 0:
+                    pos = len(text)
+                    break
+                self.in_body = False
+                pos = end + 1
+            brace = text.find('{', pos)
+            if brace < 0:
+                end = text.rfind(';', pos)
+                if end >= 0:
+                    self._statements(text[pos:end].split(';'))
+                    pos = end + 1
+                break
+            self._statements(text[pos:brace].split(';')[:-1])
+            # What is left before the brace is a gate definition header.
+            self.in_body = True
+            pos = brace + 1
+        self.pending = text[pos:]
+
+    def graph(self):
+        """The entangling graph of the statements parsed."""
+        if self.pending.strip():
+            raise ValueError('Incomplete OpenQASM statement.')
+        self._flush()
+        num_qubits = self.num_qubits
+        rows = self.keys >> 32
+        cols = self.keys & 0xFFFFFFFF
+        data = self.counts.astype(np.int32)
+        graph = sp.coo_matrix((np.concatenate([data, data]),
+                               (np.concatenate([rows, cols]),
+                                np.concatenate([cols, rows]))),
+                              shape=(num_qubits, num_qubits)).tocsr()
+        graph.indices = graph.indices.astype(np.int32)
+        graph.indptr = graph.indptr.astype(np.int32)
+        return graph
+
+    def _statements(self, statements):
+        # Fast path for two-qubit gates on single qubits.
+        match_2q = _GATE_2Q.match
+        append = self.buffer.append
+        qregs = self.qregs
+        for statement in statements:
+            match = match_2q(statement)
+            if match is not None:
+                name, reg0, idx0, reg1, idx1 = match.groups()
+                if reg0 in qregs and reg1 in qregs and name not in NON_ENTANGLING:
+                    offset0, size0 = qregs[reg0]
+                    offset1, size1 = qregs[reg1]
+                    idx0 = int(idx0)
+                    idx1 = int(idx1)
+                    if idx0 < size0 and idx1 < size1:
+                        qubit0 = offset0 + idx0
+                        qubit1 = offset1 + idx1
+                        if qubit0 < qubit1:
+                            append(qubit0 << 32 | qubit1)
+                        elif qubit1 < qubit0:
+                            append(qubit1 << 32 | qubit0)
+                        continue
+            self._statement(statement.strip())
+        if len(self.buffer) >= EDGE_BUFFER:
+            self._flush()
+
+    def _statement(self, statement):
+        if not statement:
+            return
+        match = _GATE_2Q.match(statement)
+        if match is not None:
+            name, reg0, idx0, reg1, idx1 = match.groups()
+            if name not in NON_ENTANGLING:
+                self._add_pair(self._qubit(reg0, int(idx0)),
+                               self._qubit(reg1, int(idx1)))
+            return
+        if statement.startswith('if'):
+            self._statement(_CONDITION.sub('', statement))
+            return
+        match = _QREG.match(statement)
+        if match is not None:
+            name, size = match.group(1), int(match.group(2))
+            if name in self.qregs:
+                raise ValueError("Register '{}' already declared.".format(name))
+            self.qregs[name] = (self.num_qubits, size)
+            self.num_qubits += size
+            return
+        name, _, args = _STATEMENT.match(statement).groups()
+        if name in _DECLARATIONS or name in NON_ENTANGLING or name == 'gate':
+            return
+        qargs = [self._register(arg) for arg in args.split(',')]
+        if len(qargs) > 1:
+            self._add_broadcast(qargs)
+
+    def _register(self, arg):
+        match = _ARG.match(arg.strip())
+        if match is None or match.group(1) not in self.qregs:
+            raise ValueError("Invalid qubit argument '{}'.".format(arg.strip()))
+        reg, idx = match.groups()
+        offset, size = self.qregs[reg]
+        if idx is None:
+            return np.arange(offset, offset + size)
+        return np.array([self._qubit(reg, int(idx))])
+
+    def _qubit(self, reg, idx):
+        if reg not in self.qregs or idx >= self.qregs[reg][1]:
+            raise ValueError("Invalid qubit '{}[{}]'.".format(reg, idx))
+        return self.qregs[reg][0] + idx
+
+    def _add_pair(self, qubit0, qubit1):
+        if qubit0 == qubit1:
+            return
+        if qubit0 > qubit1:
+            qubit0, qubit1 = qubit1, qubit0
+        self.buffer.append(qubit0 << 32 | qubit1)
+        if len(self.buffer) >= EDGE_BUFFER:
+            self._flush()
+
+    def _add_broadcast(self, qargs):
+        sizes = set(qarg.shape[0] for qarg in qargs if qarg.shape[0] > 1)
+        if len(sizes) > 1:
+            raise ValueError('Register sizes do not match.')
+        # One gate per row, expanded into the clique of its qubits.
+        gates = np.stack(np.broadcast_arrays(*qargs), axis=1).tolist()
+        for qubits in gates:
+            for ii, qubit0 in enumerate(qubits):
+                for qubit1 in qubits[ii+1:]:
+                    self._add_pair(qubit0, qubit1)
+
+    def _flush(self):
+        if not self.buffer:
+            return
+        keys = np.concatenate([self.keys, np.frombuffer(self.buffer, dtype=np.int64)])
+        counts = np.concatenate([self.counts,
+                                 np.ones(len(self.buffer), dtype=np.int64)])
+        self.keys, inverse = np.unique(keys, return_inverse=True)
+        self.counts = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+        del self.buffer[:]
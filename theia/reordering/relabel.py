@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name,protected-access
+
+"""Circuit relabelling"""
+import contextlib
+import copy
+import gc
+import numpy as np
+from .graph import _is_dag, _qregs
+
+_BIT_CONTAINERS = ('_qubits', '_clbits', '_ancillas', '_qubit_set',
+                   '_clbit_set', '_qubit_indices', '_clbit_indices')
+
+
+def permute_circuit(circuit, perm):
+    """Relabels the qubits of a circuit so that new qubit i is the
+    qubit perm[i] of the input circuit.
+
+    Only the qubit arguments are remapped.  Instructions, including
+    measurements, keep their classical bits and conditions, and are
+    shared with the input circuit rather than copied, so the new circuit
+    costs one list of arguments per instruction.  The input circuit is
+    not modified.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): Input circuit.
+        perm (ndarray or dict): Permutation of all qubits, numbered as in
+            entangling_graph, or permutations within each register keyed
+            by register name, as returned by local_ordering.
+
+    Returns:
+        QuantumCircuit or DAGCircuit: Relabelled circuit.
+
+    Raises:
+        ValueError: Invalid permutation.
+    """
+    qregs = _qregs(circuit)
+    qubits = [reg[idx] for reg in qregs for idx in range(reg.size)]
+    perm = _global_permutation(perm, qregs)
+    if perm.shape[0] != len(qubits) or \
+            not np.array_equal(np.sort(perm), np.arange(len(qubits))):
+        raise ValueError('Permutation must contain every qubit once.')
+    # Old qubit perm[i] becomes new qubit i.
+    qubit_map = {qubits[old]: qubits[new] for new, old in enumerate(perm.tolist())}
+    if _is_dag(circuit):
+        return _permute_dag(circuit, qubit_map)
+
+    new_circuit = copy.copy(circuit)
+    new_circuit.qregs = list(circuit.qregs)
+    new_circuit.cregs = list(circuit.cregs)
+    # Bit containers of newer Terra versions are copied like the registers.
+    for attr in _BIT_CONTAINERS:
+        if hasattr(circuit, attr):
+            setattr(new_circuit, attr, getattr(circuit, attr).copy())
+    remap = qubit_map.__getitem__
+    with _gc_paused():
+        new_circuit._data = [(inst, list(map(remap, qargs)), list(cargs))
+                             for inst, qargs, cargs in circuit._data]
+    # The table refers to the shared instructions, but must not be
+    # shared itself.
+    table = circuit._parameter_table
+    new_circuit._parameter_table = type(table)(
+        {param: type(refs)(refs) for param, refs in table.items()})
+    return new_circuit
+
+
+@contextlib.contextmanager
+def _gc_paused():
+    """Pauses garbage collection, which would otherwise traverse the
+    circuit repeatedly while its argument lists are allocated.
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def _permute_dag(dag, qubit_map):
+    new_dag = dag._copy_circuit_metadata()
+    remap = qubit_map.__getitem__
+    for node in dag.topological_op_nodes():
+        qargs = list(map(remap, node.qargs))
+        if getattr(node, 'condition', None):
+            new_dag.apply_operation_back(node.op, qargs, node.cargs,
+                                         condition=node.condition)
+        else:
+            new_dag.apply_operation_back(node.op, qargs, node.cargs)
+    return new_dag
+
+
+def _global_permutation(perm, qregs):
+    if not isinstance(perm, dict):
+        return np.asarray(perm)
+    parts = []
+    offset = 0
+    for reg in qregs:
+        parts.append(np.asarray(perm[reg.name]) + offset)
+        offset += reg.size
+    return np.concatenate(parts) if parts else np.zeros(0, dtype=int)
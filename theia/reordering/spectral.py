@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Spectral ordering"""
+from collections import OrderedDict
+import numpy as np
+import scipy.sparse as sp
+import scipy.linalg as la
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import lobpcg
+from .cache import OrderingCache
+
+# Components up to this size use a dense eigensolver.
+DENSE_LIMIT = 200
+
+# Max. number of warm start vectors kept.
+MAX_WARM_STARTS = 32
+
+# Fiedler vectors of the last components ordered by the iterative
+# solver, keyed by the hash of the component graph and weighting, least
+# recently used first.
+_WARM_STARTS = OrderedDict()
+
+
+def laplacian(G, weighted=True):
+    """Graph Laplacian of a symmetric graph.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+        weighted (bool): Use the edge weights, otherwise unit weights.
+
+    Returns:
+        csr_matrix: Laplacian matrix.
+    """
+    W = sp.csr_matrix(G, dtype=float, copy=True)
+    if not weighted:
+        W.data[:] = 1
+    W.setdiag(0)
+    W.eliminate_zeros()
+    degree = np.asarray(W.sum(axis=1)).ravel()
+    return (sp.diags(degree) - W).tocsr()
+
+
+def fiedler_vector(G, weighted=True, x0=None, tol=1e-6, maxiter=500):
+    """Fiedler vector of a connected graph, i.e. the eigenvector of the
+    graph Laplacian with the second smallest eigenvalue.
+
+    Parameters:
+        G (csr_matrix): Input graph, assumed connected.
+        weighted (bool): Use the edge weights.
+        x0 (ndarray): Initial guess used to warm start the eigensolver.
+        tol (float): Eigensolver tolerance.
+        maxiter (int): Max. number of eigensolver iterations.
+
+    Returns:
+        ndarray: Fiedler vector.
+    """
+    num_nodes = G.shape[0]
+    L = laplacian(G, weighted)
+    if num_nodes <= DENSE_LIMIT:
+        _, vecs = la.eigh(L.toarray())
+        return vecs[:, 1]
+
+    if x0 is None:
+        x0 = np.random.RandomState(num_nodes).standard_normal(num_nodes)
+    # The constant vector is the null space of L, so constrain against it.
+    ones = np.full((num_nodes, 1), 1/np.sqrt(num_nodes))
+    X = np.asarray(x0, dtype=float).reshape(num_nodes, 1)
+    X = X - ones*(ones.T @ X)
+    M = sp.diags(1/L.diagonal())
+    _, vecs = lobpcg(L, X, Y=ones, M=M, tol=tol, maxiter=maxiter,
+                     largest=False)
+    return vecs[:, 0]
+
+
+def spectral_ordering(G, weighted=True, warm_start=True):
+    """Orders the nodes of a symmetric graph by the Fiedler vector of
+    each connected component.
+
+    Components are placed in order of their lowest numbered node.
+
+    Parameters:
+        G (csr_matrix): Input graph.
+        weighted (bool): Use the edge weights.
+        warm_start (bool): Start the eigensolver from the Fiedler vector
+                           found when the same component graph was last
+                           ordered, if any.
+
+    Returns:
+        ndarray: Permutation giving the new order of the nodes.
+    """
+    num_comps, labels = connected_components(G, directed=False)
+    nodes = np.argsort(labels, kind='stable')
+    splits = np.cumsum(np.bincount(labels, minlength=num_comps))[:-1]
+    order = []
+    for comp in np.split(nodes, splits):
+        if comp.shape[0] <= 2:
+            order.append(comp)
+            continue
+        sub = G[comp][:, comp]
+        if not warm_start or comp.shape[0] <= DENSE_LIMIT:
+            vec = fiedler_vector(sub, weighted)
+        else:
+            key = OrderingCache.key(sub, weighted=weighted)
+            vec = fiedler_vector(sub, weighted, _WARM_STARTS.get(key))
+            _WARM_STARTS[key] = vec
+            _WARM_STARTS.move_to_end(key)
+            while len(_WARM_STARTS) > MAX_WARM_STARTS:
+                _WARM_STARTS.popitem(last=False)
+        order.append(comp[np.argsort(vec, kind='stable')])
+    if not order:
+        return np.zeros(0, dtype=np.int32)
+    return np.concatenate(order).astype(np.int32)
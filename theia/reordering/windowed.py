@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Entangling graphs of windows of circuit layers"""
+import numpy as np
+import scipy.sparse as sp
+from ..cython.graph import (clique_csr, group_layers, add_clique_weights,
+                            nonzero_csr)
+from .graph import entangling_gates
+
+
+def layered_gates(circuit):
+    """Entangling gates of a circuit sorted by layer, where a gate is
+    placed one layer after the last earlier entangling gate that shares
+    a qubit with it.  Single-qubit gates do not start new layers.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): Input circuit.
+
+    Returns:
+        tuple: qubits, gates, layers, num_qubits where gate k acts on
+               qubits[gates[k]:gates[k+1]] in layer layers[k].
+    """
+    qubits, gates, qregs = entangling_gates(circuit, ordered=True)
+    num_qubits = sum(reg.size for reg in qregs)
+    layers = group_layers(qubits, gates, num_qubits)
+    order = np.argsort(layers, kind='stable')
+    sizes = np.diff(gates)[order]
+    new_gates = np.zeros_like(gates)
+    np.cumsum(sizes, out=new_gates[1:])
+    # Each gate's qubits move from gates[k] to new_gates[position of k].
+    shift = np.repeat(gates[:-1][order] - new_gates[:-1], sizes)
+    qubits = qubits[np.arange(qubits.shape[0], dtype=np.int32) + shift]
+    return qubits, new_gates, layers[order], num_qubits
+
+
+def window_starts(num_layers, window, stride):
+    """First layer of each window, with the last window ending at the
+    last layer.
+    """
+    starts = list(range(0, max(num_layers - window, 0) + 1, stride))
+    if num_layers and starts[-1] + window < num_layers:
+        starts.append(num_layers - window)
+    return starts if num_layers else []
+
+
+def window_graphs(circuit, window, stride=None):
+    """Entangling graphs of windows of consecutive layers of a circuit.
+
+    All windows share the sparsity pattern of the entangling graph of the
+    whole circuit.  As the window slides, only the gates that leave or
+    enter it change the weights of that pattern, and each graph is the
+    pattern with its zero weights removed.  Since that costs the size of
+    the whole pattern, windows with fewer graph entries than the pattern
+    are instead built directly from their gates.
+
+    Parameters:
+        circuit (QuantumCircuit or DAGCircuit): Input circuit.
+        window (int): Number of layers per window.
+        stride (int): Number of layers between window starts, defaults
+                      to the window size.
+
+    Yields:
+        tuple: first layer, end layer, csr_matrix graph of each window.
+
+    Raises:
+        ValueError: Window and stride must be positive.
+    """
+    stride = window if stride is None else stride
+    if window < 1 or stride < 1:
+        raise ValueError('Window and stride must be positive.')
+    qubits, gates, layers, num_qubits = layered_gates(circuit)
+    num_layers = int(layers[-1]) + 1 if layers.shape[0] else 0
+    shape = (num_qubits, num_qubits)
+    _, ind, ptr = clique_csr(qubits, gates, num_qubits)
+    data = np.zeros(ind.shape[0], dtype=np.int32)
+    # Number of graph entries added by the gates before each gate.
+    sizes = np.diff(gates).astype(np.int64)
+    entries = np.zeros(gates.shape[0], dtype=np.int64)
+    np.cumsum(sizes*(sizes-1), out=entries[1:])
+
+    # The weights in data are those of the gates lo to hi-1, and the
+    # previous window holds the gates prev_lo to prev_hi-1.
+    lo = hi = nnz = prev_lo = prev_hi = 0
+    starts = np.asarray(window_starts(num_layers, window, stride), dtype=np.int64)
+    stops = np.minimum(starts + window, num_layers)
+    bounds = np.searchsorted(layers, np.stack([starts, stops], axis=1))
+    for start, stop, (new_lo, new_hi) in zip(starts.tolist(), stops.tolist(),
+                                             bounds.tolist()):
+        changed = entries[min(prev_hi, new_lo)] - entries[prev_lo] + \
+            entries[new_hi] - entries[max(prev_hi, new_lo)]
+        prev_lo, prev_hi = new_lo, new_hi
+        if changed + ind.shape[0] > entries[new_hi] - entries[new_lo]:
+            offset = gates[new_lo]
+            G = sp.csr_matrix(clique_csr(qubits[offset:gates[new_hi]],
+                                         gates[new_lo:new_hi+1] - offset,
+                                         num_qubits), shape=shape)
+        else:
+            nnz += add_clique_weights(data, ind, ptr, qubits, gates,
+                                      lo, min(hi, new_lo), -1)
+            nnz += add_clique_weights(data, ind, ptr, qubits, gates,
+                                      max(hi, new_lo), new_hi, 1)
+            lo, hi = new_lo, new_hi
+            G = sp.csr_matrix(nonzero_csr(data, ind, ptr, num_qubits, nnz),
+                              shape=shape)
+        yield start, stop, G
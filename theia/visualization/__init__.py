@@ -30,9 +30,22 @@ Functions
    iplot_error_map
    job_summary
    wspy
+   iplot_spy
+   properties_table
+   device_layout
+
+Classes
+=======
+
+.. autosummary::
+   :toctree: ../stubs/
+
+   BackendPropertiesTable
 """
 from .counts_visualization import iplot_histogram
 from .gate_map import iplot_gate_map
 from .error_map import iplot_error_map
 from .jobs import job_summary
-from .spy import wspy
+from .spy import wspy, iplot_spy
+from .backend_properties import BackendPropertiesTable, properties_table
+from .layout_engine import device_layout
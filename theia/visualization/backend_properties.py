@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Columnar device calibration data"""
+
+from collections import OrderedDict
+import numpy as np
+
+# Qubit properties kept by the table, keyed by their name in the
+# backend properties.
+QUBIT_PROPERTIES = {'T1': 't1', 'T2': 't2', 'readout_error': 'readout_error'}
+
+# Max. number of tables kept by properties_table.
+MAX_TABLES = 32
+
+_TABLES = OrderedDict()
+
+
+class BackendPropertiesTable:
+    """Calibration data of a device as NumPy arrays, parsed from the
+    backend properties in a single pass.
+
+    Qubit values are indexed by qubit, and CX values by edge in the order
+    the gates are listed, with edge_index giving the edge of each
+    (control, target) pair.  Missing values are NaN.
+
+    Parameters:
+        properties (BackendProperties or dict): Device properties, or
+            their dict form.
+
+    Attributes:
+        num_qubits (int): Number of qubits.
+        t1 (ndarray): T1 time of each qubit.
+        t2 (ndarray): T2 time of each qubit.
+        readout_error (ndarray): Readout error of each qubit.
+        units (dict): Unit of each qubit property, keyed by name.
+        edges (ndarray): CX (control, target) pairs, of shape (E, 2).
+        cx_error (ndarray): CX gate error of each edge.
+        edge_index (dict): Edge of each (control, target) pair.
+    """
+    def __init__(self, properties):
+        qubits = _field(properties, 'qubits')
+        self.num_qubits = len(qubits)
+        self.units = {}
+        values = {name: np.full(self.num_qubits, np.nan) for name in QUBIT_PROPERTIES}
+        for qubit, items in enumerate(qubits):
+            for item in items:
+                name = _field(item, 'name')
+                if name in values:
+                    values[name][qubit] = _field(item, 'value')
+                    self.units.setdefault(name, _field(item, 'unit'))
+        for name, attr in QUBIT_PROPERTIES.items():
+            setattr(self, attr, values[name])
+
+        self._gate_errors = {}
+        edges = []
+        cx_error = []
+        self.edge_index = {}
+        for gate in _field(properties, 'gates'):
+            name = _field(gate, 'gate')
+            gate_qubits = _field(gate, 'qubits')
+            error = _gate_error(gate)
+            if len(gate_qubits) == 1:
+                if name not in self._gate_errors:
+                    self._gate_errors[name] = np.full(self.num_qubits, np.nan)
+                self._gate_errors[name][gate_qubits[0]] = error
+            elif name == 'cx' and len(gate_qubits) == 2:
+                pair = tuple(gate_qubits)
+                if pair not in self.edge_index:
+                    self.edge_index[pair] = len(edges)
+                    edges.append(pair)
+                    cx_error.append(error)
+        self.edges = np.array(edges, dtype=int).reshape(len(edges), 2)
+        self.cx_error = np.array(cx_error, dtype=float)
+
+    def gate_error(self, gate):
+        """Error of a single-qubit gate on each qubit.
+
+        Parameters:
+            gate (str): Gate name, e.g. 'u2'.
+
+        Returns:
+            ndarray: Gate error of each qubit, NaN where not calibrated.
+        """
+        if gate in self._gate_errors:
+            return self._gate_errors[gate].copy()
+        return np.full(self.num_qubits, np.nan)
+
+    def cx_errors(self, pairs):
+        """CX errors of a list of qubit pairs, e.g. a coupling map.
+
+        Parameters:
+            pairs (list): (control, target) pairs.
+
+        Returns:
+            ndarray: CX error of each pair, NaN where not calibrated.
+        """
+        index = np.fromiter((self.edge_index.get(tuple(pair), -1) for pair in pairs),
+                            dtype=int, count=len(pairs))
+        errors = np.append(self.cx_error, np.nan)
+        return errors[index]
+
+
+def properties_table(backend):
+    """The properties table of a device, parsed once per calibration.
+
+    Tables are cached by backend name, version and last update date of
+    the properties, so the visualizations and dashboard cards of a
+    device share one table until it is recalibrated.
+
+    Parameters:
+        backend (BaseBackend): A device backend with properties.
+
+    Returns:
+        BackendPropertiesTable: Calibration data of the device.
+    """
+    properties = backend.properties()
+    key = (properties.backend_name, properties.backend_version,
+           str(properties.last_update_date))
+    table = _TABLES.get(key)
+    if table is None:
+        table = BackendPropertiesTable(properties)
+        _TABLES[key] = table
+        while len(_TABLES) > MAX_TABLES:
+            _TABLES.popitem(last=False)
+    else:
+        _TABLES.move_to_end(key)
+    return table
+
+
+def _field(item, name):
+    if isinstance(item, dict):
+        return item[name]
+    return getattr(item, name)
+
+
+def _gate_error(gate):
+    for param in _field(gate, 'parameters'):
+        if _field(param, 'name') == 'gate_error':
+            return _field(param, 'value')
+    return np.nan
@@ -12,39 +12,134 @@
 # copyright notice, and modified files need to carry a notice indicating
 # that they have been altered from the originals.
 
-"""An interactive backend error map.
+"""HELIX colormaps as lookup tables.
+
+The tables hold the 256 colors of the seaborn palettes
+
+    cubehelix_palette(start=2.5, rot=0.6, hue=2, gamma=1, light=0.9,
+                      dark=0.15, reverse=True, as_cmap=True)
+
+for HELIX_LIGHT, and of the same palette with gamma=0.95, light=0.95
+and dark=0.25 for HELIX_DARK, so neither seaborn nor matplotlib is
+needed to color a figure.
 """
 import numpy as np
-import seaborn as sns
-
-
-HELIX_LIGHT_CMAP = sns.cubehelix_palette(start=2.5,
-                                         rot=0.6,
-                                         hue=2,
-                                         gamma=1,
-                                         light=0.9,
-                                         dark=0.15,
-                                         reverse=True,
-                                         as_cmap=True)
-
-HELIX_DARK_CMAP = sns.cubehelix_palette(start=2.5,
-                                        rot=0.6,
-                                        hue=2,
-                                        gamma=0.95,
-                                        light=0.95,
-                                        dark=0.25,
-                                        reverse=True,
-                                        as_cmap=True)
-
-def _sns_to_plotly(cmap, pl_entries=255):
-    hgt = 1.0/(pl_entries-1)
-    pl_colorscale = []
-
-    for k in range(pl_entries):
-        clr = list(map(np.uint8, np.array(cmap(k*hgt)[:3])*255))
-        pl_colorscale.append([k*hgt, 'rgb'+str((clr[0], clr[1], clr[2]))])
-
-    return pl_colorscale
-
-HELIX_LIGHT = _sns_to_plotly(HELIX_LIGHT_CMAP)
-HELIX_DARK = _sns_to_plotly(HELIX_DARK_CMAP)
+
+# Low to high colors of the light background colormap.
+HELIX_LIGHT_HEX = (
+    '#072b5e', '#082c61', '#082c61', '#092d64', '#0a2d66', '#0b2e69', '#0b2e69', '#0d2e6c',
+    '#0e2f6e', '#0f2f71', '#0f2f71', '#113073', '#123076', '#143179', '#143179', '#15317b',
+    '#17327e', '#183280', '#183280', '#1a3383', '#1b3385', '#1d3387', '#1d3387', '#1f348a',
+    '#21348c', '#23348f', '#23348f', '#243591', '#263593', '#283595', '#283595', '#2a3698',
+    '#2c369a', '#2e369c', '#30369e', '#30369e', '#3237a0', '#3537a2', '#3737a4', '#3737a4',
+    '#3937a6', '#3b38a8', '#3d38aa', '#3d38aa', '#4038ac', '#4238ae', '#4438b0', '#4438b0',
+    '#4738b2', '#4939b3', '#4b39b5', '#4b39b5', '#4e39b7', '#5039b8', '#5339ba', '#5339ba',
+    '#5539bb', '#583abd', '#5a3abe', '#5a3abe', '#5d3ac0', '#5f3ac1', '#623ac2', '#623ac2',
+    '#643ac4', '#673ac5', '#6a3bc6', '#6a3bc6', '#6c3bc7', '#6f3bc8', '#713bc9', '#713bc9',
+    '#743bca', '#773bcb', '#793ccc', '#793ccc', '#7c3ccd', '#7f3cce', '#813ccf', '#813ccf',
+    '#843cd0', '#863dd0', '#893dd1', '#893dd1', '#8c3dd2', '#8e3dd2', '#913ed3', '#913ed3',
+    '#943ed3', '#963ed4', '#993ed4', '#993ed4', '#9b3fd4', '#9e3fd5', '#a13fd5', '#a13fd5',
+    '#a340d5', '#a640d5', '#a840d6', '#a840d6', '#ab41d6', '#ad41d6', '#b042d6', '#b042d6',
+    '#b242d6', '#b542d6', '#b743d6', '#b743d6', '#ba43d6', '#bc44d6', '#bf44d5', '#bf44d5',
+    '#c145d5', '#c345d5', '#c646d5', '#c646d5', '#c847d5', '#ca47d4', '#cd48d4', '#cf48d3',
+    '#cf48d3', '#d149d3', '#d34ad3', '#d54ad2', '#d54ad2', '#d74bd2', '#d94cd1', '#dc4dd1',
+    '#dc4dd1', '#de4dd0', '#e04ecf', '#e14fcf', '#e14fcf', '#e350ce', '#e551ce', '#e752cd',
+    '#e752cd', '#e952cc', '#eb53cc', '#ed54cb', '#ed54cb', '#ee55ca', '#f056c9', '#f257c9',
+    '#f257c9', '#f358c8', '#f559c7', '#f65ac6', '#f65ac6', '#f85bc5', '#f95dc5', '#fb5ec4',
+    '#fb5ec4', '#fc5fc3', '#fd60c2', '#ff61c1', '#ff61c1', '#ff62c1', '#ff64c0', '#ff65bf',
+    '#ff65bf', '#ff66be', '#ff67bd', '#ff69bd', '#ff69bd', '#ff6abc', '#ff6bbb', '#ff6dba',
+    '#ff6dba', '#ff6eb9', '#ff6fb9', '#ff71b8', '#ff71b8', '#ff72b7', '#ff74b6', '#ff75b6',
+    '#ff75b6', '#ff77b5', '#ff78b4', '#ff7ab4', '#ff7ab4', '#ff7bb3', '#ff7db2', '#ff7eb2',
+    '#ff7eb2', '#ff80b1', '#ff81b1', '#ff83b0', '#ff83b0', '#ff85af', '#ff86af', '#ff88af',
+    '#ff88af', '#ff8aae', '#ff8bae', '#ff8dad', '#ff8dad', '#ff8fad', '#ff90ad', '#ff92ac',
+    '#ff92ac', '#ff94ac', '#ff96ac', '#ff97ac', '#ff99ac', '#ff99ac', '#ff9bab', '#ff9dab',
+    '#ff9eab', '#ff9eab', '#ffa0ab', '#ffa2ab', '#ffa4ab', '#ffa4ab', '#ffa6ac', '#ffa7ac',
+    '#ffa9ac', '#ffa9ac', '#ffabac', '#ffadac', '#ffafad', '#ffafad', '#ffb0ad', '#ffb2ae',
+    '#ffb4ae', '#ffb4ae', '#ffb6af', '#ffb8af', '#ffb9b0', '#ffb9b0', '#ffbbb0', '#ffbdb1',
+    '#ffbfb2', '#ffbfb2', '#ffc1b3', '#ffc2b4', '#ffc4b5', '#ffc4b5', '#ffc6b5', '#ffc8b7',
+    '#ffc9b8', '#ffc9b8', '#ffcbb9', '#ffcdba', '#ffcfbb', '#ffcfbb', '#ffd0bc', '#ffd2be',
+    '#ffd4bf', '#ffd4bf', '#ffd6c0', '#ffd7c2', '#ffd9c3', '#ffd9c3', '#ffdbc5', '#ffdcc7',
+)
+
+# Low to high colors of the dark background colormap.
+HELIX_DARK_HEX = (
+    '#343ba7', '#343ba7', '#363ba9', '#393bab', '#393bab', '#3b3bad', '#3d3baf', '#3d3baf',
+    '#3f3cb1', '#423cb3', '#443cb5', '#443cb5', '#463cb6', '#493cb8', '#493cb8', '#4b3dba',
+    '#4e3dbc', '#4e3dbc', '#503dbd', '#533dbf', '#553dc0', '#553dc0', '#583dc2', '#5a3dc3',
+    '#5a3dc3', '#5d3ec5', '#5f3ec6', '#5f3ec6', '#623ec8', '#643ec9', '#673eca', '#673eca',
+    '#6a3ecb', '#6c3fcc', '#6c3fcc', '#6f3fce', '#713fcf', '#743fd0', '#743fd0', '#773fd1',
+    '#793fd2', '#793fd2', '#7c40d2', '#7f40d3', '#7f40d3', '#8140d4', '#8440d5', '#8740d6',
+    '#8740d6', '#8941d6', '#8c41d7', '#8c41d7', '#8e41d7', '#9141d8', '#9141d8', '#9442d8',
+    '#9642d9', '#9942d9', '#9942d9', '#9c42da', '#9e43da', '#9e43da', '#a143da', '#a343db',
+    '#a343db', '#a644db', '#a844db', '#ab44db', '#ab44db', '#ad45db', '#b045db', '#b045db',
+    '#b246db', '#b546db', '#b746db', '#b746db', '#ba47db', '#bc47db', '#bc47db', '#bf48db',
+    '#c148db', '#c148db', '#c349da', '#c649da', '#c84ada', '#c84ada', '#ca4bd9', '#cd4bd9',
+    '#cd4bd9', '#cf4cd9', '#d14cd8', '#d14cd8', '#d34dd8', '#d54ed7', '#d74ed7', '#d74ed7',
+    '#d94fd6', '#db50d6', '#db50d6', '#de50d5', '#df51d5', '#df51d5', '#e152d4', '#e353d3',
+    '#e554d3', '#e554d3', '#e755d2', '#e955d1', '#e955d1', '#eb56d1', '#ec57d0', '#ee58cf',
+    '#ee58cf', '#f059ce', '#f25ace', '#f25ace', '#f35bcd', '#f55ccc', '#f55ccc', '#f65dcb',
+    '#f85ecb', '#f95fca', '#f95fca', '#fb60c9', '#fc61c8', '#fc61c8', '#fd62c7', '#ff64c6',
+    '#ff64c6', '#ff65c6', '#ff66c5', '#ff67c4', '#ff67c4', '#ff68c3', '#ff6ac2', '#ff6ac2',
+    '#ff6bc1', '#ff6cc1', '#ff6cc1', '#ff6dc0', '#ff6fbf', '#ff70be', '#ff70be', '#ff71bd',
+    '#ff73bd', '#ff73bd', '#ff74bc', '#ff75bb', '#ff77ba', '#ff77ba', '#ff78ba', '#ff7ab9',
+    '#ff7ab9', '#ff7bb8', '#ff7db8', '#ff7db8', '#ff7eb7', '#ff80b6', '#ff81b6', '#ff81b6',
+    '#ff83b5', '#ff84b4', '#ff84b4', '#ff86b4', '#ff87b3', '#ff87b3', '#ff89b3', '#ff8bb2',
+    '#ff8cb2', '#ff8cb2', '#ff8eb1', '#ff90b1', '#ff90b1', '#ff91b1', '#ff93b0', '#ff93b0',
+    '#ff95b0', '#ff96b0', '#ff98af', '#ff98af', '#ff9aaf', '#ff9baf', '#ff9baf', '#ff9daf',
+    '#ff9faf', '#ffa0af', '#ffa0af', '#ffa2af', '#ffa4af', '#ffa4af', '#ffa6af', '#ffa7af',
+    '#ffa7af', '#ffa9af', '#ffabaf', '#ffadaf', '#ffadaf', '#ffaeb0', '#ffb0b0', '#ffb0b0',
+    '#ffb2b0', '#ffb4b1', '#ffb4b1', '#ffb5b1', '#ffb7b1', '#ffb9b2', '#ffb9b2', '#ffbbb2',
+    '#ffbcb3', '#ffbcb3', '#ffbeb4', '#ffc0b4', '#ffc0b4', '#ffc2b5', '#ffc3b6', '#ffc5b7',
+    '#ffc5b7', '#ffc7b8', '#ffc8b9', '#ffc8b9', '#ffcaba', '#ffccbb', '#ffcdbc', '#ffcdbc',
+    '#ffcfbd', '#ffd1be', '#ffd1be', '#ffd2bf', '#ffd4c1', '#ffd4c1', '#ffd6c2', '#ffd7c3',
+    '#ffd9c5', '#ffd9c5', '#ffdbc6', '#ffdcc8', '#ffdcc8', '#ffdec9', '#ffdfcb', '#ffdfcb',
+    '#ffe1cc', '#ffe2ce', '#ffe4d0', '#ffe4d0', '#ffe5d2', '#ffe7d4', '#ffe7d4', '#ffe8d5',
+    '#ffead7', '#ffead7', '#ffebd9', '#ffeddb', '#ffeedd', '#ffeedd', '#ffefe0', '#fff1e2',
+)
+
+
+def _hex_to_rgb(colors):
+    return np.array([[int(color[kk:kk+2], 16) for kk in (1, 3, 5)]
+                     for color in colors], dtype=np.uint8)
+
+
+HELIX_LIGHT_RGB = _hex_to_rgb(HELIX_LIGHT_HEX)
+HELIX_DARK_RGB = _hex_to_rgb(HELIX_DARK_HEX)
+
+
+def _plotly_colorscale(rgb):
+    scale = np.linspace(0, 1, rgb.shape[0])
+    return [[float(x), 'rgb({}, {}, {})'.format(*color)]
+            for x, color in zip(scale, rgb.tolist())]
+
+
+# Plotly colorscales of the colormaps.
+HELIX_LIGHT = _plotly_colorscale(HELIX_LIGHT_RGB)
+HELIX_DARK = _plotly_colorscale(HELIX_DARK_RGB)
+
+
+def map_to_hex(values, vmin, vmax, colors=HELIX_LIGHT_HEX):
+    """Colors of an array of values, scaled linearly from vmin to vmax.
+
+    Matches matplotlib's Normalize and colormap lookup: values outside
+    the range get the first or last color, as do all values if
+    vmin == vmax.  NaN values get the first color.
+
+    Parameters:
+        values (array_like): Input values.
+        vmin (float): Value of the first color.
+        vmax (float): Value of the last color.
+        colors (tuple): Lookup table of hex colors.
+
+    Returns:
+        list: Hex color of each value.
+    """
+    values = np.asarray(values, dtype=float)
+    num_colors = len(colors)
+    if vmax > vmin:
+        scaled = (values - vmin) / (vmax - vmin) * num_colors
+        scaled[np.isnan(scaled)] = 0
+    else:
+        scaled = np.zeros_like(values)
+    index = np.clip(np.floor(scaled), 0, num_colors-1).astype(int)
+    return np.asarray(colors)[index].tolist()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+
+"""Coupling map drawing geometry"""
+
+import functools
+from collections import namedtuple
+import numpy as np
+
+# Max. number of geometries kept by coupling_geometry.
+MAX_GEOMETRIES = 64
+
+CouplingGeometry = namedtuple('CouplingGeometry',
+                              ['qubit_x', 'qubit_y', 'symmetric', 'line_x', 'line_y'])
+
+
+def coupling_geometry(coupling_map, layout, offset=0):
+    """Plot coordinates of the qubits and coupling lines of a device.
+
+    A coupling (a, b) is drawn from qubit a through the midpoint of the
+    line to qubit b or, if (b, a) is also coupled, from qubit a to the
+    midpoint only, so that each direction draws half of the line.  Grid
+    rows are drawn downwards, shifted by offset.
+
+    Results are cached per coupling map, layout and offset, and their
+    arrays are read-only.
+
+    Parameters:
+        coupling_map (list): Coupled (a, b) qubit pairs, or None.
+        layout (list): (row, column) grid position of each qubit.
+        offset (int): Rows by which the drawing is shifted down.
+
+    Returns:
+        CouplingGeometry: qubit_x and qubit_y coordinates of each qubit,
+        whether each coupling is symmetric, and line_x and line_y arrays
+        of shape (E, 3) with the start, middle and end of each line.
+    """
+    edges = tuple(tuple(edge) for edge in coupling_map) if coupling_map else ()
+    return _coupling_geometry(edges, tuple(tuple(pos) for pos in layout), offset)
+
+
+@functools.lru_cache(maxsize=MAX_GEOMETRIES)
+def _coupling_geometry(edges, layout, offset):
+    grid = np.array(layout, dtype=float).reshape(len(layout), 2)
+    grid[:, 0] += offset
+    pairs = np.array(edges, dtype=np.int64).reshape(len(edges), 2)
+    symmetric = np.isin(pairs[:, 1]*len(layout) + pairs[:, 0],
+                        pairs[:, 0]*len(layout) + pairs[:, 1])
+
+    start = grid[pairs[:, 0]]
+    end = grid[pairs[:, 1]]
+    mid = (end - start) / 2 + start
+    end = np.where(symmetric[:, None], mid, end)
+    geometry = CouplingGeometry(qubit_x=grid[:, 1].copy(),
+                                qubit_y=-grid[:, 0],
+                                symmetric=symmetric,
+                                line_x=np.stack([start[:, 1], mid[:, 1], end[:, 1]], axis=1),
+                                line_y=-np.stack([start[:, 0], mid[:, 0], end[:, 0]], axis=1))
+    for array in geometry:
+        array.flags.writeable = False
+    return geometry
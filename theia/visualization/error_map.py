@@ -17,13 +17,22 @@
 
 import math
 import numpy as np
-import seaborn as sns
-import matplotlib as mpl
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from .plotly_wrapper import PlotlyWidget, PlotlyFigure
-from.device_layouts import DEVICE_LAYOUTS
-from .colormaps import HELIX_LIGHT, HELIX_LIGHT_CMAP, HELIX_DARK, HELIX_DARK_CMAP
+from .layout_engine import device_layout
+from .coupling_geometry import coupling_geometry
+from .backend_properties import properties_table
+from .colormaps import (HELIX_LIGHT, HELIX_LIGHT_HEX, HELIX_DARK, HELIX_DARK_HEX,
+                        map_to_hex)
+
+# Number of colors of the coupling lines, each drawn as one trace.
+EDGE_COLORS = 32
+
+# Colors of the measurement error bars, and of the full-length bars of
+# qubits without readout calibration data.
+READOUT_COLOR = '#b385e2'
+MISSING_READOUT_COLOR = '#bbbbbb'
 
 
 def iplot_error_map(backend, figsize=(700, 500),
@@ -65,11 +74,11 @@ def iplot_error_map(backend, figsize=(700, 500),
     """
     meas_text_color = '#FFFFFF'
     if background_color == 'white':
-        color_map = HELIX_LIGHT_CMAP
+        color_map = HELIX_LIGHT_HEX
         text_color = '#000000'
         plotly_cmap = HELIX_LIGHT
     elif background_color == 'black':
-        color_map = HELIX_DARK_CMAP
+        color_map = HELIX_DARK_HEX
         text_color = '#FFFFFF'
         plotly_cmap = HELIX_DARK
     else:
@@ -82,94 +91,50 @@ def iplot_error_map(backend, figsize=(700, 500),
     n_qubits = config.n_qubits
     cmap = config.coupling_map
 
-    if n_qubits in DEVICE_LAYOUTS.keys():
-        grid_data = DEVICE_LAYOUTS[n_qubits]
-    else:
-        fig = go.Figure()
-        fig.update_layout(showlegend=False,
-                          plot_bgcolor=background_color,
-                          paper_bgcolor=background_color,
-                          width=figsize[0], height=figsize[1],
-                          margin=dict(t=60, l=0, r=0, b=0)
-                         )
-        out = PlotlyWidget(fig)
-        return out
-
-    props = backend.properties().to_dict()
-
-    t1s = []
-    t2s = []
-    for qubit_props in props['qubits']:
-        count = 0
-        for item in qubit_props:
-            if item['name'] == 'T1':
-                t1s.append(item['value'])
-                count += 1
-            elif item['name'] == 'T2':
-                t2s.append(item['value'])
-                count += 1
-            if count == 2:
-                break
-
-    # U2 error rates
-    single_gate_errors = [0]*n_qubits
-    for gate in props['gates']:
-        if gate['gate'] == 'u2':
-            _qubit = gate['qubits'][0]
-            single_gate_errors[_qubit] = gate['parameters'][0]['value']
-
-    # Convert to percent
-    single_gate_errors = 100 * np.asarray(single_gate_errors)
+    grid_data = device_layout(n_qubits, cmap)
+
+    table = properties_table(backend)
+    t1s = table.t1
+    t2s = table.t2
+
+    # U2 error rates, in percent
+    single_gate_errors = 100 * np.nan_to_num(table.gate_error('u2'))
     avg_1q_err = np.mean(single_gate_errors)
     max_1q_err = max(single_gate_errors)
 
-    single_norm = mpl.colors.Normalize(
-        vmin=min(single_gate_errors), vmax=max_1q_err)
-
-    q_colors = [mpl.colors.rgb2hex(color_map(single_norm(err))) for err in single_gate_errors]
+    q_colors = map_to_hex(single_gate_errors, min(single_gate_errors), max_1q_err,
+                          color_map)
 
     line_colors = []
     if cmap:
-        cx_errors = []
-        for line in cmap:
-            for item in props['gates']:
-                if item['qubits'] == line:
-                    cx_errors.append(item['parameters'][0]['value'])
-                    break
-            else:
-                continue
-
         # Convert to percent
-        cx_errors = 100 * np.asarray(cx_errors)
+        cx_errors = 100 * table.cx_errors(cmap)
 
-        # remove bad cx edges
+        # remove bad cx edges, and edges without calibration data
+        good_edges = ~np.isnan(cx_errors)
         if remove_badcal_edges:
-            cx_idx = np.where(cx_errors != 100.0)[0]
-        else:
-            cx_idx = np.arange(len(cx_errors))
+            good_edges &= cx_errors != 100.0
+        cx_idx = np.where(good_edges)[0]
 
         avg_cx_err = np.mean(cx_errors[cx_idx])
 
-        cx_norm = mpl.colors.Normalize(
-            vmin=min(cx_errors[cx_idx]), vmax=max(cx_errors[cx_idx]))
-
-        for err in cx_errors:
-            if err != 100.0 or not remove_badcal_edges:
-                line_colors.append(mpl.colors.rgb2hex(color_map(cx_norm(err))))
-            else:
-                line_colors.append("#ff0000")
+        palette = [color_map[idx] for idx in
+                   np.linspace(0, len(color_map)-1, EDGE_COLORS).round().astype(int)]
+        line_colors = map_to_hex(cx_errors, min(cx_errors[cx_idx]),
+                                 max(cx_errors[cx_idx]), palette)
+        for ind in np.where(~good_edges)[0]:
+            line_colors[ind] = "#ff0000"
 
     # Measurement errors
-    read_err = []
-
-    for qubit in range(n_qubits):
-        for item in props['qubits'][qubit]:
-            if item['name'] == 'readout_error':
-                read_err.append(item['value'])
-
-    read_err = 100 * np.asarray(read_err)
-    avg_read_err = np.mean(read_err)
-    max_read_err = np.max(read_err)
+    read_err = 100 * table.readout_error
+    missing_read = np.isnan(read_err)
+    if missing_read.all():
+        avg_read_err = max_read_err = 0.0
+    else:
+        avg_read_err = np.nanmean(read_err)
+        max_read_err = np.nanmax(read_err)
+    read_bars = np.where(missing_read, max_read_err, read_err)
+    read_colors = np.where(missing_read, MISSING_READOUT_COLOR, READOUT_COLOR).tolist()
 
     if n_qubits < 10:
         num_left = n_qubits
@@ -216,56 +181,30 @@ def iplot_error_map(backend, figsize=(700, 500),
                                         cx_title)
                         )
 
-    # Add lines for couplings
+    # Add lines for couplings, with one trace per line color
+    geometry = coupling_geometry(cmap, grid_data, offset)
     if cmap:
-        for ind, edge in enumerate(cmap):
-            is_symmetric = False
-            if edge[::-1] in cmap:
-                is_symmetric = True
-            y_start = grid_data[edge[0]][0] + offset
-            x_start = grid_data[edge[0]][1]
-            y_end = grid_data[edge[1]][0] + offset
-            x_end = grid_data[edge[1]][1]
-
-            if is_symmetric:
-                if y_start == y_end:
-                    x_end = (x_end - x_start) / 2 + x_start
-                    x_mid = x_end
-                    y_mid = y_start
-
-                elif x_start == x_end:
-                    y_end = (y_end - y_start) / 2 + y_start
-                    x_mid = x_start
-                    y_mid = y_end
-
-                else:
-                    x_end = (x_end - x_start) / 2 + x_start
-                    y_end = (y_end - y_start) / 2 + y_start
-                    x_mid = x_end
-                    y_mid = y_end
-            else:
-                if y_start == y_end:
-                    x_mid = (x_end - x_start) / 2 + x_start
-                    y_mid = y_end
-
-                elif x_start == x_end:
-                    x_mid = x_end
-                    y_mid = (y_end - y_start) / 2 + y_start
-
-                else:
-                    x_mid = (x_end - x_start) / 2 + x_start
-                    y_mid = (y_end - y_start) / 2 + y_start
-
+        edge_text = ['CX<sub>err</sub>{B}_{A} = {err} %'.format(A=edge[0], B=edge[1], err=err)
+                     for edge, err in zip(cmap, np.round(cx_errors, 3))]
+        # Lines of the same color are separated by NaN
+        gaps = np.full((len(cmap), 1), np.nan)
+        line_x = np.hstack([geometry.line_x, gaps])
+        line_y = np.hstack([geometry.line_y, gaps])
+        color_edges = {}
+        for ind, color in enumerate(line_colors):
+            color_edges.setdefault(color, []).append(ind)
+
+        for color, edges in color_edges.items():
             fig.append_trace(
-                go.Scatter(x=[x_start, x_mid, x_end],
-                           y=[-y_start, -y_mid, -y_end],
+                go.Scatter(x=line_x[edges].ravel(),
+                           y=line_y[edges].ravel(),
                            mode="lines",
                            line=dict(width=6,
-                                     color=line_colors[ind]
+                                     color=color
                                     ),
                            hoverinfo='text',
-                           hovertext='CX<sub>err</sub>{B}_{A} = {err} %'.format(
-                               A=edge[0], B=edge[1], err=np.round(cx_errors[ind], 3))
+                           hovertext=[text for ind in edges
+                                      for text in [edge_text[ind]]*3 + [None]]
                            ), row=1, col=3)
 
     # Add the qubits themselves
@@ -294,8 +233,8 @@ def iplot_error_map(backend, figsize=(700, 500),
             qtext_color.append('white')
 
     fig.append_trace(go.Scatter(
-        x=[d[1] for d in grid_data],
-        y=[-d[0]-offset for d in grid_data],
+        x=geometry.qubit_x,
+        y=geometry.qubit_y,
         mode="markers+text",
         marker=go.scatter.Marker(size=qubit_size,
                                  color=q_colors,
@@ -338,9 +277,9 @@ def iplot_error_map(backend, figsize=(700, 500),
                                np.round(max_1q_err, 3)])
 
     # CX error rate colorbar
-    min_cx_err = min(cx_errors)
-    max_cx_err = max(cx_errors)
     if cmap:
+        min_cx_err = np.nanmin(cx_errors)
+        max_cx_err = np.nanmax(cx_errors)
         fig.append_trace(go.Heatmap(z=[np.linspace(min_cx_err,
                                                    max_cx_err, 100),
                                        np.linspace(min_cx_err,
@@ -360,18 +299,18 @@ def iplot_error_map(backend, figsize=(700, 500),
                                    np.round(max_cx_idx_err, 3)])
 
     hover_text = "<b>Qubit {}</b><br>M<sub>err</sub> = {} %"
+    meas_text = [hover_text.format(kk, 'n/a' if missing else err)
+                 for kk, (err, missing) in enumerate(zip(np.round(read_err, 3),
+                                                         missing_read))]
     # Add the left side meas errors
-    for kk in range(num_left-1, -1, -1):
-        fig.append_trace(go.Bar(x=[read_err[kk]], y=[kk],
-                                orientation='h',
-                                marker=dict(color='#b385e2'),
-                                hoverinfo="text",
-                                hoverlabel=dict(font=dict(color=meas_text_color)),
-                                hovertext=[hover_text.format(kk,
-                                                             np.round(read_err[kk], 3)
-                                                             )]
-                               ),
-                         row=1, col=1)
+    fig.append_trace(go.Bar(x=read_bars[:num_left], y=list(range(num_left)),
+                            orientation='h',
+                            marker=dict(color=read_colors[:num_left]),
+                            hoverinfo="text",
+                            hoverlabel=dict(font=dict(color=meas_text_color)),
+                            hovertext=meas_text[:num_left]
+                           ),
+                     row=1, col=1)
 
     fig.append_trace(go.Scatter(x=[avg_read_err, avg_read_err],
                                 y=[-0.25, num_left-1+0.25],
@@ -397,16 +336,14 @@ def iplot_error_map(backend, figsize=(700, 500),
 
     # Add the right side meas errors, if any
     if num_right:
-        for kk in range(n_qubits-1, num_left-1, -1):
-            fig.append_trace(go.Bar(x=[-read_err[kk]],
-                                    y=[kk],
-                                    orientation='h',
-                                    marker=dict(color='#b385e2'),
-                                    hoverinfo="text",
-                                    hoverlabel=dict(font=dict(color=meas_text_color)),
-                                    hovertext=[hover_text.format(kk,
-                                                                 np.round(read_err[kk], 3))]
-                                   ), row=1, col=9)
+        fig.append_trace(go.Bar(x=-read_bars[num_left:],
+                                y=list(range(num_left, n_qubits)),
+                                orientation='h',
+                                marker=dict(color=read_colors[num_left:]),
+                                hoverinfo="text",
+                                hoverlabel=dict(font=dict(color=meas_text_color)),
+                                hovertext=meas_text[num_left:]
+                               ), row=1, col=9)
 
         fig.append_trace(go.Scatter(x=[-avg_read_err, -avg_read_err],
                                     y=[num_left-0.25, n_qubits-1+0.25],
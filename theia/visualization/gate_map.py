@@ -16,7 +16,8 @@
 
 import plotly.graph_objects as go
 from .plotly_wrapper import PlotlyWidget
-from .device_layouts import DEVICE_LAYOUTS
+from .layout_engine import device_layout
+from .coupling_geometry import coupling_geometry
 
 def iplot_gate_map(backend, figsize=(None, None), label_qubits=True,
                    qubit_size=None, line_width=None, font_size=None,
@@ -65,9 +66,7 @@ def iplot_gate_map(backend, figsize=(None, None), label_qubits=True,
     if isinstance(line_color, str):
         line_color = [line_color] * len(cmap) if cmap else []
 
-    if n_qubits in DEVICE_LAYOUTS.keys():
-        grid_data = DEVICE_LAYOUTS[n_qubits]
-    else:
+    if config.simulator:
         fig = go.Figure()
         fig.update_layout(showlegend=False,
                           plot_bgcolor=background_color,
@@ -78,6 +77,8 @@ def iplot_gate_map(backend, figsize=(None, None), label_qubits=True,
         out = PlotlyWidget(fig)
         return out
 
+    grid_data = device_layout(n_qubits, cmap)
+
     x_max = max([d[1] for d in grid_data])
     y_max = max([d[0] for d in grid_data])
     max_dim = max(x_max, y_max)
@@ -112,48 +113,12 @@ def iplot_gate_map(backend, figsize=(None, None), label_qubits=True,
     fig = go.Figure()
 
     # Add lines for couplings
+    geometry = coupling_geometry(cmap, grid_data, offset)
     if cmap:
-        for ind, edge in enumerate(cmap):
-            is_symmetric = False
-            if edge[::-1] in cmap:
-                is_symmetric = True
-            y_start = grid_data[edge[0]][0] + offset
-            x_start = grid_data[edge[0]][1]
-            y_end = grid_data[edge[1]][0] + offset
-            x_end = grid_data[edge[1]][1]
-
-            if is_symmetric:
-                if y_start == y_end:
-                    x_end = (x_end - x_start) / 2 + x_start
-                    x_mid = x_end
-                    y_mid = y_start
-
-                elif x_start == x_end:
-                    y_end = (y_end - y_start) / 2 + y_start
-                    x_mid = x_start
-                    y_mid = y_end
-
-                else:
-                    x_end = (x_end - x_start) / 2 + x_start
-                    y_end = (y_end - y_start) / 2 + y_start
-                    x_mid = x_end
-                    y_mid = y_end
-            else:
-                if y_start == y_end:
-                    x_mid = (x_end - x_start) / 2 + x_start
-                    y_mid = y_end
-
-                elif x_start == x_end:
-                    x_mid = x_end
-                    y_mid = (y_end - y_start) / 2 + y_start
-
-                else:
-                    x_mid = (x_end - x_start) / 2 + x_start
-                    y_mid = (y_end - y_start) / 2 + y_start
-
+        for ind in range(len(cmap)):
             fig.add_trace(
-                go.Scatter(x=[x_start, x_mid, x_end],
-                           y=[-y_start, -y_mid, -y_end],
+                go.Scatter(x=geometry.line_x[ind],
+                           y=geometry.line_y[ind],
                            mode="lines",
                         hoverinfo='none',
                         line=dict(width=line_width,
@@ -175,8 +140,8 @@ def iplot_gate_map(backend, figsize=(None, None), label_qubits=True,
             font_size = 9
 
     fig.add_trace(go.Scatter(
-        x=[d[1] for d in grid_data],
-        y=[-d[0]-offset for d in grid_data],
+        x=geometry.qubit_x,
+        y=geometry.qubit_y,
         mode="markers+text",
         marker=go.scatter.Marker(size=qubit_size,
                                  color=qubit_color,
@@ -0,0 +1,267 @@
+# -*- coding: utf-8 -*-
+
+# This code is part of Qiskit.
+#
+# (C) Copyright IBM 2020.
+#
+# This code is licensed under the Apache License, Version 2.0. You may
+# obtain a copy of this license in the LICENSE.txt file in the root directory
+# of this source tree or at http://www.apache.org/licenses/LICENSE-2.0.
+#
+# Any modifications or derivative works of this code must retain this
+# copyright notice, and modified files need to carry a notice indicating
+# that they have been altered from the originals.
+# pylint: disable=invalid-name
+
+"""Automatic device layouts"""
+
+import os
+import json
+import hashlib
+import tempfile
+import numpy as np
+import scipy.sparse as sp
+from scipy.sparse.csgraph import shortest_path
+from .device_layouts import DEVICE_LAYOUTS
+
+# Directory of the on-disk layout cache, set by THEIA_LAYOUT_CACHE.
+LAYOUT_CACHE_DIR = os.environ.get('THEIA_LAYOUT_CACHE',
+                                  os.path.join(os.path.expanduser('~'), '.theia', 'layouts'))
+
+# Max. number of stress majorization iterations.
+LAYOUT_ITERATIONS = 300
+
+# Largest move of a qubit, in grid steps, at which the solver stops.
+LAYOUT_TOLERANCE = 1e-4
+
+# Grid shifts, per step, tried when snapping qubits to the grid.
+GRID_SHIFTS = 4
+
+# Longest coupling, in grid steps, of a known layout that fits a device.
+MAX_COUPLING_LENGTH = 1.5
+
+_LAYOUTS = {}
+
+
+def coupling_map_key(n_qubits, coupling_map):
+    """Hash of the number of qubits and undirected couplings of a device.
+
+    Parameters:
+        n_qubits (int): Number of qubits.
+        coupling_map (list): Coupled (a, b) qubit pairs, or None.
+
+    Returns:
+        str: Hex digest.
+    """
+    return _edges_key(n_qubits, _undirected_edges(coupling_map))
+
+
+def device_layout(n_qubits, coupling_map, cache_dir=LAYOUT_CACHE_DIR):
+    """Grid (row, column) position of each qubit of a device.
+
+    The layout in DEVICE_LAYOUTS for the number of qubits is used when
+    it fits the coupling map, i.e. places every qubit in its own cell
+    and every coupling at most MAX_COUPLING_LENGTH steps long.
+    Otherwise a layout is computed: a spectral embedding of the graph
+    distances between the qubits is refined by stress majorization,
+    which places the qubits at distances close to their graph distances,
+    and snapped to distinct grid cells.  Computed layouts are cached by coupling_map_key, in
+    memory and as JSON files in cache_dir, so each topology is only
+    laid out once.
+
+    Parameters:
+        n_qubits (int): Number of qubits.
+        coupling_map (list): Coupled (a, b) qubit pairs, or None.
+        cache_dir (str): Directory of the on-disk cache, or None to
+                         keep computed layouts in memory only.
+
+    Returns:
+        list: [row, column] of each qubit.
+    """
+    edges = _undirected_edges(coupling_map)
+    known = DEVICE_LAYOUTS.get(n_qubits)
+    if known is not None and _fits(np.asarray(known, dtype=float), edges):
+        return known
+
+    key = _edges_key(n_qubits, edges)
+    if key in _LAYOUTS:
+        return _LAYOUTS[key]
+    layout = _load(cache_dir, key, n_qubits)
+    if layout is None:
+        layout = _grid_layout(n_qubits, edges)
+        _save(cache_dir, key, layout)
+    _LAYOUTS[key] = layout
+    return layout
+
+
+def _undirected_edges(coupling_map):
+    """Sorted, unique (low, high) pairs of the couplings."""
+    if not coupling_map:
+        return np.zeros((0, 2), dtype=np.int64)
+    pairs = np.sort(np.asarray(coupling_map, dtype=np.int64).reshape(-1, 2), axis=1)
+    pairs = pairs[pairs[:, 0] != pairs[:, 1]]
+    num_nodes = pairs.max() + 1 if pairs.size else 1
+    codes = np.unique(pairs[:, 0] * num_nodes + pairs[:, 1])
+    return np.stack([codes // num_nodes, codes % num_nodes], axis=1)
+
+
+def _edges_key(n_qubits, edges):
+    digest = hashlib.sha1()
+    digest.update(repr(n_qubits).encode())
+    digest.update(edges.astype(np.int64).tobytes())
+    return digest.hexdigest()
+
+
+def _fits(positions, edges):
+    if positions.shape[0] != np.unique(positions, axis=0).shape[0]:
+        return False
+    if edges.shape[0] and edges.max() >= positions.shape[0]:
+        return False
+    lengths = np.linalg.norm(positions[edges[:, 0]] - positions[edges[:, 1]], axis=1)
+    return bool(np.all(lengths <= MAX_COUPLING_LENGTH))
+
+
+def _grid_layout(n_qubits, edges):
+    if not edges.shape[0]:
+        # Without couplings the qubits fill a near-square grid.
+        width = int(np.ceil(np.sqrt(n_qubits)))
+        return [[kk // width, kk % width] for kk in range(n_qubits)]
+    dist = _graph_distances(n_qubits, edges)
+    positions = _stress_majorization(_classical_scaling(dist), dist, edges)
+    return _snap_to_grid(positions)
+
+
+def _graph_distances(n_qubits, edges):
+    """Couplings between each pair of qubits, with disconnected pairs
+    one coupling further apart than any connected pair.
+    """
+    adjacency = sp.csr_matrix((np.ones(edges.shape[0]), (edges[:, 0], edges[:, 1])),
+                              shape=(n_qubits, n_qubits))
+    dist = shortest_path(adjacency, directed=False, unweighted=True)
+    finite = np.isfinite(dist)
+    dist[~finite] = dist[finite].max() + 1
+    return dist
+
+
+def _classical_scaling(dist):
+    """Coordinates of the qubits along the two leading eigenvectors of
+    the double-centered squared distances.
+    """
+    n_qubits = dist.shape[0]
+    centered = dist**2
+    centered -= centered.mean(axis=0)
+    centered -= centered.mean(axis=1)[:, None]
+    values, vectors = np.linalg.eigh(-0.5 * centered)
+    positions = np.zeros((n_qubits, 2))
+    num_vectors = min(n_qubits, 2)
+    positions[:, :num_vectors] = vectors[:, ::-1][:, :num_vectors] * \
+        np.sqrt(np.maximum(values[::-1][:num_vectors], 0))
+    # Fixed signs and a little jitter keep the result deterministic and
+    # separate qubits the embedding places on top of each other.
+    signs = np.sign(positions[np.abs(positions).argmax(axis=0), [0, 1]])
+    positions *= np.where(signs == 0, 1, signs)
+    positions += 1e-3 * np.random.RandomState(n_qubits).standard_normal(positions.shape)
+    return positions
+
+
+def _stress_majorization(positions, dist, edges):
+    """Moves the qubits so that their distances match the graph
+    distances, weighted by the inverse squared graph distance, by
+    iterated Guttman transforms.
+    """
+    n_qubits = positions.shape[0]
+    dist = dist.copy()
+    dist[np.diag_indices(n_qubits)] = 1
+    weights = dist**-2
+    weights[np.diag_indices(n_qubits)] = 0
+    laplacian = -weights
+    laplacian[np.diag_indices(n_qubits)] = weights.sum(axis=1)
+    laplacian_inv = np.linalg.pinv(laplacian)
+    weighted_dist = weights * dist
+
+    scale = np.linalg.norm(positions[edges[:, 0]] - positions[edges[:, 1]], axis=1).mean()
+    positions = positions / max(scale, 1e-12)
+    for _ in range(LAYOUT_ITERATIONS):
+        delta = positions[:, None, :] - positions[None, :, :]
+        norms = np.maximum(np.sqrt((delta**2).sum(axis=2)), 1e-12)
+        guttman = -weighted_dist / norms
+        guttman[np.diag_indices(n_qubits)] = 0
+        guttman[np.diag_indices(n_qubits)] = -guttman.sum(axis=1)
+        updated = laplacian_inv.dot(guttman.dot(positions))
+        converged = np.abs(updated - positions).max() < LAYOUT_TOLERANCE
+        positions = updated
+        if converged:
+            break
+
+    # Rotate the couplings towards the grid axes, the longer side
+    # along the columns, and scale them to about one grid step.
+    positions -= positions.mean(axis=0)
+    lines = positions[edges[:, 1]] - positions[edges[:, 0]]
+    angle = np.angle(np.exp(4j * np.arctan2(lines[:, 1], lines[:, 0])).sum()) / 4
+    rotation = np.array([[np.cos(angle), -np.sin(angle)],
+                         [np.sin(angle), np.cos(angle)]])
+    positions = positions.dot(rotation)
+    if np.ptp(positions[:, 1]) > np.ptp(positions[:, 0]):
+        positions = positions[:, ::-1]
+    scale = np.median(np.linalg.norm(positions[edges[:, 0]] - positions[edges[:, 1]],
+                                     axis=1))
+    return positions / max(scale, 1e-12)
+
+
+def _snap_to_grid(positions):
+    """Moves each qubit to the nearest free grid cell, starting with the
+    qubits closest to a cell.
+    """
+    # Shift the grid by the fraction of a step that brings the qubits
+    # closest to the cells.
+    shifts = np.linspace(0, 1, GRID_SHIFTS, endpoint=False)
+    residual = positions[:, :, None] - shifts
+    residual = ((residual - np.round(residual))**2).sum(axis=0)
+    positions = positions - shifts[residual.argmin(axis=1)]
+    cells = np.round(positions)
+    order = np.argsort(np.linalg.norm(positions - cells, axis=1), kind='stable')
+    taken = set()
+    layout = [None] * positions.shape[0]
+    for qubit in order.tolist():
+        col, row = cells[qubit].tolist()
+        radius = 0
+        while layout[qubit] is None:
+            ring = [(col + dc, row + dr)
+                    for dc in range(-radius, radius + 1)
+                    for dr in range(-radius, radius + 1)
+                    if max(abs(dc), abs(dr)) == radius and (col + dc, row + dr) not in taken]
+            if ring:
+                best = min(ring, key=lambda cell, q=qubit: (cell[0] - positions[q, 0])**2 +
+                           (cell[1] - positions[q, 1])**2)
+                taken.add(best)
+                layout[qubit] = best
+            radius += 1
+    min_col = min(cell[0] for cell in layout)
+    min_row = min(cell[1] for cell in layout)
+    return [[int(row - min_row), int(col - min_col)] for col, row in layout]
+
+
+def _load(cache_dir, key, n_qubits):
+    if cache_dir is None:
+        return None
+    try:
+        with open(os.path.join(cache_dir, key + '.json')) as layout_file:
+            layout = json.load(layout_file)['layout']
+    except (OSError, ValueError, KeyError):
+        return None
+    return layout if len(layout) == n_qubits else None
+
+
+def _save(cache_dir, key, layout):
+    if cache_dir is None:
+        return
+    # The cache only saves work, so a directory that cannot be written
+    # to is not an error.
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(suffix='.json', dir=cache_dir)
+        with os.fdopen(fd, 'w') as layout_file:
+            json.dump({'layout': layout}, layout_file)
+        os.replace(tmp, os.path.join(cache_dir, key + '.json'))
+    except OSError:
+        pass
@@ -13,18 +13,35 @@
 # that they have been altered from the originals.
 # pylint: disable=invalid-name
 
-"""Weighted sparse matrix plot.
+"""Weighted sparse matrix plots.
 """
 
 import matplotlib as mpl
 import numpy as np
 from matplotlib import cm
-from matplotlib.patches import Rectangle
+from matplotlib.collections import PolyCollection
 import matplotlib.pyplot as plt
+import plotly.graph_objects as go
+from ..cython.spy import binned_max
+from .plotly_wrapper import PlotlyWidget
+
+# Largest number of nonzeros drawn as one polygon per element, rather
+# than as an image.
+MAX_POLYGONS = 10000
+
+# Corners of the unit cell around an element, in draw order.
+_CELL = np.array([[-0.5, -0.5], [0.5, -0.5], [0.5, 0.5], [-0.5, 0.5]])
+
 
 def wspy(M, ax=None, fig_size=(5, 5), return_plot=True):
     """A weighted sparse matrix plotter.
 
+    Matrices with few nonzeros are drawn as a single collection of cells.
+    Other ones are drawn as an image with one pixel per element or, when
+    the matrix has more rows or columns than the axes have pixels, with
+    one pixel per block of elements colored by the largest weight in the
+    block.
+
     Parameters:
         M (csr_matrix): Input sparse matrix.
         ax (Matplotlib.Axes): Optional axes instance.
@@ -38,24 +55,31 @@ def wspy(M, ax=None, fig_size=(5, 5), return_plot=True):
     if ax is None:
         new_ax = True
         fig, ax = plt.subplots(1, 1, figsize=fig_size)
+    M = M.tocsr()
+    nrows, ncols = M.shape
+    data = _weights(M)
     cmap = cm.magma
-    norm = mpl.colors.Normalize(1, np.max(M.data.real))
-    nrows = M.shape[0]
-    ptr = M.indptr
-    ind = M.indices
-    data = M.data
-    for ii in range(nrows):
-        for jj in range(ptr[ii], ptr[ii + 1]):
-            ax.add_artist(Rectangle(xy=(ii-0.5, ind[jj]-0.5),
-                                    width=1,
-                                    height=1,
-                                    color=cmap(norm(data[jj]))
-                                    )
-                         )
-    ax.set_xlim(-0.5, M.shape[1]-0.5)
-    ax.set_ylim(-0.5, M.shape[0]-0.5)
+    norm = mpl.colors.Normalize(1, np.max(data, initial=1))
+    # Elements per pixel along each axis.
+    bbox = ax.get_window_extent()
+    row_bin = _bin_size(nrows, bbox.height)
+    col_bin = _bin_size(ncols, bbox.width)
+    if data.shape[0] <= MAX_POLYGONS and row_bin == col_bin == 1:
+        rows = np.repeat(np.arange(nrows), np.diff(M.indptr))
+        verts = np.stack([M.indices, rows], axis=1)[:, None, :] + _CELL
+        ax.add_collection(PolyCollection(verts, array=data, cmap=cmap, norm=norm,
+                                         edgecolors='none'))
+    else:
+        image = binned_max(data, M.indices, M.indptr, 0, nrows, 0, ncols,
+                           row_bin, col_bin)
+        height, width = image.shape
+        ax.imshow(np.ma.masked_invalid(image), cmap=cmap, norm=norm,
+                  interpolation='nearest', aspect='auto', origin='upper',
+                  extent=(-0.5, width*col_bin-0.5, height*row_bin-0.5, -0.5))
+    ax.set_xlim(-0.5, ncols-0.5)
+    ax.set_ylim(-0.5, nrows-0.5)
     ax.invert_yaxis()
-    ax.set_aspect(float(M.shape[0])/float(M.shape[1]))
+    ax.set_aspect(float(nrows)/float(ncols))
     ax.set_facecolor('#f6f6f6')
     ax.xaxis.tick_top()
     if new_ax:
@@ -63,3 +87,88 @@ def wspy(M, ax=None, fig_size=(5, 5), return_plot=True):
         plt.colorbar(cm.ScalarMappable(norm=norm, cmap=cmap), cax=cbaxes)
     if return_plot:
         return ax
+
+
+def iplot_spy(M, figsize=(500, 500), background_color='#f6f6f6'):
+    """Plots an interactive weighted sparse matrix.
+
+    Only the binned matrix is sent to the browser: the visible elements
+    are binned to the resolution of the figure, each bin showing the
+    largest weight in it.  Zooming re-bins the visible block, down to
+    single elements, so matrices with millions of rows can be inspected.
+
+    Parameters:
+        M (csr_matrix): Input sparse matrix.
+        figsize (tuple): Figure size (W x H) in pixels.
+        background_color (str): Color of the empty elements.
+
+    Returns:
+        PlotlyWidget: The output figure instance.
+
+    Example:
+        .. jupyter-execute::
+
+           from qiskit.circuit.random import random_circuit
+           from theia.reordering.graph import entangling_graph
+           from theia.visualization import iplot_spy
+
+           iplot_spy(entangling_graph(random_circuit(50, 100, seed=1234)))
+    """
+    M = M.tocsr()
+    nrows, ncols = M.shape
+    data = _weights(M)
+
+    def heatmap(row_start, row_stop, col_start, col_stop):
+        row_bin = _bin_size(row_stop-row_start, figsize[1])
+        col_bin = _bin_size(col_stop-col_start, figsize[0])
+        # Bins are centered on the mean index of their elements.
+        return dict(z=binned_max(data, M.indices, M.indptr, row_start, row_stop,
+                                 col_start, col_stop, row_bin, col_bin),
+                    x0=col_start+(col_bin-1)/2, dx=col_bin,
+                    y0=row_start+(row_bin-1)/2, dy=row_bin)
+
+    fig = go.Figure()
+    fig.add_trace(go.Heatmap(colorscale='Magma', zmin=1,
+                             zmax=np.max(data, initial=1),
+                             hoverongaps=False,
+                             hovertemplate='row: %{y}<br>column: %{x}<br>'
+                                           'weight: %{z}<extra></extra>',
+                             **heatmap(0, nrows, 0, ncols)))
+    fig.update_xaxes(range=[-0.5, ncols-0.5], side='top', showgrid=False,
+                     zeroline=False)
+    fig.update_yaxes(range=[nrows-0.5, -0.5], showgrid=False, zeroline=False)
+    fig.update_layout(plot_bgcolor=background_color,
+                      width=figsize[0], height=figsize[1],
+                      margin=dict(t=40, l=40, r=0, b=10))
+    out = PlotlyWidget(fig)
+
+    def rebin(_, x_range, y_range):
+        col_start, col_stop = _visible(x_range, ncols)
+        row_start, row_stop = _visible(y_range, nrows)
+        out.data[0].update(heatmap(row_start, row_stop, col_start, col_stop))
+
+    out.layout.on_change(rebin, 'xaxis.range', 'yaxis.range')
+    return out
+
+
+def _weights(M):
+    """Real weights of a matrix, in a type taken by binned_max."""
+    data = M.data.real
+    if data.dtype not in (np.int32, np.float64):
+        data = data.astype(np.float64)
+    return data
+
+
+def _bin_size(num_elements, pixels):
+    """Number of consecutive elements binned into one pixel."""
+    return max(int(np.ceil(num_elements / max(pixels, 1))), 1)
+
+
+def _visible(axis_range, num_elements):
+    """First and end index of the elements shown by an axis range."""
+    if axis_range is None:
+        return 0, num_elements
+    low, high = sorted(axis_range)
+    start = max(min(int(np.floor(low + 0.5)), num_elements - 1), 0)
+    stop = min(max(int(np.ceil(high + 0.5)), start + 1), num_elements)
+    return start, stop